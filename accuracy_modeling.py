@@ -1,8 +1,14 @@
 import pandas as pd
-import numpy as np
 import os
 import warnings
 
+import threshold_sweep
+import walk_forward
+import intraday_align
+import daily_agg
+import dataset_store
+import run_metrics
+
 # 경고 메시지 제어 (깔끔한 출력을 위해)
 warnings.filterwarnings('ignore')
 
@@ -13,46 +19,62 @@ community_file = 'stock_community_labeled.csv'
 price_file = 'stock_price_data_top80.csv'
 output_detail_file = 'prediction_result_report.csv'   # 상세 내역 저장
 output_summary_file = 'accuracy_summary_report.csv'    # [NEW] 요약 통계 저장
+output_curve_file = 'threshold_curve_report.csv'       # 기준값별 정확도/추천수 곡선
+output_curve_by_stock_file = 'threshold_curve_by_stock.csv'
 
-def load_csv_safe(filepath):
-    encodings = ['utf-8', 'utf-8-sig', 'cp949', 'euc-kr']
-    for enc in encodings:
-        try:
-            return pd.read_csv(filepath, encoding=enc)
-        except (UnicodeDecodeError, FileNotFoundError):
-            continue
-    print(f"❌ 파일을 열 수 없습니다: {filepath}")
-    return None
+# (날짜, 종목) 감성 집계 저장소. 없으면 community_file 로 처음 한 번 생성
+# (새 라벨링 결과는 Labeling 실행 시 자동 반영, 수동: python daily_agg.py stock_community_labeled.csv)
+agg_store_file = daily_agg.STORE_FILE
 
-print(">> 데이터 로드 중...")
-comm_df = load_csv_safe(community_file)
-price_df = load_csv_safe(price_file)
+# data/ 아래 Parquet 저장소가 있으면 CSV 대신 필요한 컬럼만 읽음
+use_dataset_store = True
+
+# 기준값 후보와 종합 점수 함수 (threshold_sweep.SCORE_FUNCTIONS 참고)
+thresholds = threshold_sweep.default_thresholds()   # 더 촘촘하게: np.round(np.arange(0.1, 0.95, 0.001), 3)
+score_function = 'accuracy_log_count'
+
+# 워크포워드 백테스트: 학습 구간에서 고른 기준값을 다음 구간(표본 외)에 적용
+run_walk_forward = True
+walk_forward_train_days = walk_forward.TRAIN_DAYS
+walk_forward_test_days = walk_forward.TEST_DAYS
+walk_forward_horizons = walk_forward.HORIZONS     # 진입 후 1시간 / 1일 / 3일 뒤 종가
+output_walk_forward_file = 'walk_forward_report.csv'
+output_walk_forward_summary_file = 'walk_forward_summary.csv'
+
+# 시간 단위 평가: (종목, 1시간) 감성 묶음 -> 묶음이 끝난 뒤 다음 거래 가능 시간봉의 상승 여부
+run_hourly_eval = True
+output_hourly_curve_file = 'hourly_threshold_curve.csv'
+
+run_metrics.start_run("accuracy_modeling")
 
-if comm_df is None or price_df is None:
+print(">> 데이터 로드 중...")
+run_metrics.section("load")
+agg_df = daily_agg.load_or_build(community_file, agg_store_file)
+if use_dataset_store and dataset_store.exists("price"):
+    # Open: 시간 단위 평가(6번)가 다음 봉 시가에 진입
+    price_df = dataset_store.read_table("price", columns=['Date', 'Code', 'Open', 'Close'])
+else:
+    # 인코딩(utf-8-sig / cp949 / euc-kr)은 dataset_store.read_csv_any 가 판별
+    price_df = dataset_store.read_csv_any(price_file) if os.path.exists(price_file) else None
+
+if agg_df is None:
+    print(f"❌ 파일을 열 수 없습니다: {community_file}")
+if price_df is None:
+    print(f"❌ 파일을 열 수 없습니다: {price_file}")
+if agg_df is None or price_df is None:
+    run_metrics.finish_run()
     exit()
 
 # ==========================================
 # 2. 데이터 전처리 (공통)
 # ==========================================
 print(">> 데이터 전처리 중...")
+run_metrics.section("preprocess", items=len(agg_df) + len(price_df))
 
-# 2.1 커뮤니티 데이터
-comm_df['Date_dt'] = pd.to_datetime(comm_df['Date'], format='%Y.%m.%d %H:%M', errors='coerce')
-comm_df = comm_df.dropna(subset=['Date_dt'])
-comm_df['Analysis_Date'] = comm_df['Date_dt'].dt.date
-comm_df['Code'] = comm_df['Code'].astype(str).str.zfill(6)
-
+# 2.1 커뮤니티 데이터 (집계 저장소의 일별 긍정/부정 건수 사용)
 # 긍정 비율 계산 (중립 제외)
-def calc_pos_ratio(series):
-    labels = series.astype(str).str.lower()
-    pos_cnt = (labels == 'positive').sum()
-    neg_cnt = (labels == 'negative').sum()
-    total = pos_cnt + neg_cnt
-    if total == 0: return 0.0
-    return pos_cnt / total
-
-daily_stats = comm_df.groupby(['Analysis_Date', 'Code', 'Stock', 'Type'])['sentiment_label'].apply(calc_pos_ratio).reset_index()
-daily_stats.rename(columns={'sentiment_label': 'Positive_Ratio'}, inplace=True)
+daily_stats = agg_df[['Date', 'Code', 'Stock', 'Type']].rename(columns={'Date': 'Analysis_Date'})
+daily_stats['Positive_Ratio'] = daily_agg.positive_ratio(agg_df)
 
 # 2.2 주가 데이터 (이전 거래일 비교)
 price_df['Date_dt'] = pd.to_datetime(price_df['Date'], errors='coerce')
@@ -73,9 +95,12 @@ daily_price = daily_price.dropna(subset=['Prev_Close'])
 # 3. 최적 기준값 탐색 (Score = 정확도 x log10(추천수))
 # ==========================================
 print("\n>> 최적 매수 추천 기준값 탐색 시작 (10% ~ 90%)...")
+run_metrics.section("threshold_sweep", items=len(daily_stats))
 print("   (평가 기준: Score = 정확도 x log10(추천수))")
 
-thresholds = np.arange(0.1, 0.95, 0.05) 
+# 주가 데이터와 한 번만 병합한 뒤, 모든 기준값을 누적합으로 한 번에 계산
+merged = threshold_sweep.join_signals(daily_stats, daily_price)
+curve = threshold_sweep.sweep_thresholds(merged, thresholds, score=score_function)
 
 best_threshold = 0.35
 best_score = -1.0
@@ -84,41 +109,24 @@ best_results_df = None
 print(f"{'기준값(%)':<10} {'정확도(%)':<10} {'추천수(건)':<10} {'종합점수':<10}")
 print("-" * 45)
 
-for th in thresholds:
-    th = round(th, 2)
-    
-    # 1. 매수 추천 필터링
-    recs = daily_stats[daily_stats['Positive_Ratio'] > th].copy()
-    if len(recs) == 0: continue
-
-    # 2. 주가 데이터 병합
-    merged = pd.merge(
-        recs, daily_price,
-        left_on=['Code', 'Analysis_Date'], right_on=['Code', 'Price_Date'],
-        how='inner'
-    )
-    
-    count = len(merged)
-    if count == 0: continue
+for row in curve.itertuples():
+    print(f"{int(row.threshold*100):<10} {row.accuracy*100:<10.2f} {row.count:<10} {row.score:.4f}")
 
-    # 3. 지표 산출
-    success_count = merged['Is_Price_Up'].sum()
-    accuracy = success_count / count
-    
-    # 종합 점수 계산
-    score = accuracy * np.log10(count)
-    
-    print(f"{int(th*100):<10} {accuracy*100:<10.2f} {count:<10} {score:.4f}")
-    
-    # 최적값 갱신
-    if score > best_score:
-        best_score = score
-        best_threshold = th
-        best_results_df = merged.copy()
+best = threshold_sweep.best_threshold(curve)
+if best is not None:
+    best_score = best['score']
+    best_threshold = best['threshold']
+    best_results_df = merged[merged['Positive_Ratio'] > best_threshold].copy()
+
+# 기준값별 곡선 / 종목별 곡선 저장
+curve.to_csv(output_curve_file, index=False, encoding='utf-8-sig')
+threshold_sweep.sweep_thresholds_by_stock(merged, thresholds, score=score_function) \
+    .to_csv(output_curve_by_stock_file, index=False, encoding='utf-8-sig')
 
 # ==========================================
 # 4. 결과 저장 및 요약 리포트 생성
 # ==========================================
+run_metrics.section("report", items=len(merged) * len(thresholds))
 if best_results_df is not None:
     # 4.1 최종 선택된 데이터 통계 출력
     final_acc = (best_results_df['Is_Price_Up'].sum() / len(best_results_df)) * 100
@@ -192,4 +200,50 @@ if best_results_df is not None:
     print(final_summary.tail(1))
 
 else:
-    print("\n❌ 유효한 결과를 도출하지 못했습니다.")
\ No newline at end of file
+    print("\n❌ 유효한 결과를 도출하지 못했습니다.")
+
+# ==========================================
+# 5. 워크포워드 백테스트 (표본 외 검증)
+# ==========================================
+run_metrics.section(None)
+if run_walk_forward:
+    run_metrics.section("walk_forward")
+    print(f"\n>> 워크포워드 백테스트 (학습 {walk_forward_train_days}일 -> 평가 {walk_forward_test_days}일)...")
+    events = walk_forward.forward_returns(daily_stats, price_df, walk_forward_horizons)
+    wf_folds, wf_summary = walk_forward.walk_forward(
+        events, walk_forward_horizons, thresholds=thresholds, score=score_function,
+        train_days=walk_forward_train_days, test_days=walk_forward_test_days,
+    )
+    if wf_summary.empty:
+        print("   - 평가 구간이 없습니다 (주가/게시글 기간이 학습 기간보다 짧음)")
+    else:
+        wf_folds.to_csv(output_walk_forward_file, index=False, encoding='utf-8-sig')
+        wf_summary.to_csv(output_walk_forward_summary_file, index=False, encoding='utf-8-sig')
+        print(wf_summary.to_string(index=False))
+        print(f"✅ [3] 워크포워드 결과 저장 완료: {output_walk_forward_file}, {output_walk_forward_summary_file}")
+
+# ==========================================
+# 6. 시간 단위 신호 평가 (게시글 -> 다음 거래 가능 시간봉)
+# ==========================================
+run_metrics.section(None)
+if run_hourly_eval:
+    run_metrics.section("hourly_eval")
+    print("\n>> 시간 단위 신호 평가 (1시간 감성 묶음 -> 다음 시간봉 시가 대비 종가)...")
+    post_cols = ['Date', 'Code', 'sentiment_label']
+    if use_dataset_store and dataset_store.exists("labeled"):
+        posts = dataset_store.read_table("labeled", columns=post_cols)
+    else:
+        posts = pd.read_csv(community_file, usecols=post_cols, dtype={'Code': str}, encoding='utf-8-sig')
+    hourly = intraday_align.hourly_signals(posts, price_df)
+    hourly_curve = threshold_sweep.sweep_thresholds(hourly, thresholds, score=score_function)
+    if hourly_curve.empty:
+        print("   - 시간봉과 맞춰진 묶음이 없습니다")
+    else:
+        hourly_curve.to_csv(output_hourly_curve_file, index=False, encoding='utf-8-sig')
+        hourly_best = threshold_sweep.best_threshold(hourly_curve)
+        print(f"   - 묶음 {len(hourly)}개 (장중 {hourly['in_session'].mean():.1%}) / "
+              f"최적 기준값 {int(hourly_best['threshold']*100)}%: 정확도 {hourly_best['accuracy']*100:.2f}% "
+              f"({int(hourly_best['count'])}건)")
+        print(f"✅ [4] 시간 단위 곡선 저장 완료: {output_hourly_curve_file}")
+
+run_metrics.finish_run()
@@ -0,0 +1,69 @@
+"""
+crawl_kr_community (순차) vs crawl_kr_community_async (비동기) 벤치마크.
+
+로컬 스텁 서버에 게시판 페이지를 띄워두고 두 방식의 수집 시간을 비교하고,
+두 결과 DataFrame 이 완전히 같은지도 확인합니다.
+
+    python benchmarks/bench_async_crawl.py --stocks 10 --latency 0.03
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import data_crawling
+from stub_server import StubServer
+
+
+def make_stock_list(n):
+    codes = ['005930', '000660'] + [f"{100000 + i * 37:06d}" for i in range(n)]
+    return [{'Code': c, 'Name': f"종목{c}"} for c in codes[:n]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.03, help="응답당 인위적 지연(초)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--skip-sync", action="store_true")
+    parser.add_argument("--adaptive", action="store_true", help="속도 조절 켜기 (기본은 꺼서 동시 요청 수 효과만 비교)")
+    args = parser.parse_args()
+    data_crawling.ADAPTIVE_RATE = args.adaptive
+
+    stocks = make_stock_list(args.stocks)
+    n_pages = sum(data_crawling.get_target_pages(s['Code']) for s in stocks)
+
+    with StubServer(latency=args.latency) as srv:
+        base_url = srv.url("/item/board.naver")
+        rows = []
+
+        baseline = None
+        if not args.skip_sync:
+            t0 = time.perf_counter()
+            baseline = data_crawling.crawl_kr_community(stocks, base_url=base_url)
+            elapsed = time.perf_counter() - t0
+            rows.append(("sync", "-", elapsed, n_pages / elapsed, len(baseline), True))
+
+        for c in args.concurrency:
+            t0 = time.perf_counter()
+            df = data_crawling.crawl_kr_community_async(stocks, base_url=base_url, concurrency=c)
+            elapsed = time.perf_counter() - t0
+            if baseline is None:
+                baseline = df
+            same = df.equals(baseline)
+            rows.append(("async", c, elapsed, n_pages / elapsed, len(df), same))
+
+    print(f"\n종목 {len(stocks)}개 / 페이지 {n_pages}장 / 지연 {args.latency * 1000:.0f}ms")
+    report = pd.DataFrame(rows, columns=["mode", "concurrency", "seconds", "pages/sec", "rows", "same_as_sync"])
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+    if not report["same_as_sync"].all():
+        sys.exit("!! 비동기 수집 결과가 순차 수집 결과와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
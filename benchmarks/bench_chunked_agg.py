@@ -0,0 +1,209 @@
+"""
+(날짜, 종목) 집계: 게시글 전체 로드 vs 청크 단위 집계(daily_agg.ChunkedAggregator) 벤치마크.
+
+합성 라벨링 CSV(기본 1000만 행, 준복제 묶음 포함)를 만들고 로드 방식마다 별도 프로세스에서 실행해서
+소요 시간과 최대 메모리(RSS)를 비교합니다.
+
+  topic_legacy : Topic_Modeling load_data + aggregate_daily (전체 컬럼, object 날짜)
+  agg_legacy   : 기존 daily_agg.load_or_build 경로 (필요한 컬럼 전체 read_csv + aggregate_posts)
+  topic_chunked: Topic_Modeling load_daily_chunked (필요한 컬럼만 청크 단위)
+  chunked      : daily_agg.aggregate_csv (감성 건수까지, 청크 단위)
+
+작은 입력(--small-rows)에서도 같은 비교를 해서 청크 방식의 최대 RSS 가 입력 크기(와 도배글 수)와 무관한지 확인하고,
+전체 로드가 끝까지 돈 크기에서는 결과가 같은지도 확인합니다. (전체 로드가 메모리 부족으로 죽으면 OOM 으로 표시)
+
+    python benchmarks/bench_chunked_agg.py --rows 10000000 --small-rows 1000000
+    python benchmarks/bench_chunked_agg.py --rows 4000000 --small-rows 1000000 --spam-rate 0.9
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+import daily_agg
+
+MODES = ["topic_legacy", "agg_legacy", "topic_chunked", "chunked"]
+
+
+def write_labeled_csv(path, n_rows, n_stocks=80, n_days=180, spam_rate=0.3, chunk_rows=1_000_000, seed=0):
+    """
+    합성 라벨링 CSV 를 청크 단위로 씀 (생성도 메모리 상한).
+    Topic_Modeling 의 기존 로더(cp949)로도 읽히도록 문자열은 ASCII 만 사용.
+    준복제 묶음: 도배글 7개씩 같은 dup_cluster (묶음 첫 글의 행 번호, 첫 글만 dup_rep - dedup.annotate 와 같은 규칙)
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"{i * 37:06d}" for i in range(n_stocks)])
+    base = pd.Timestamp("2025-06-01")
+    for lo in range(0, n_rows, chunk_rows):
+        n = min(chunk_rows, n_rows - lo)
+        idx = np.arange(lo, lo + n)
+        code = codes[rng.integers(0, n_stocks, n)]
+        minutes = rng.integers(0, n_days * 24 * 60, n)
+
+        spam = np.flatnonzero(rng.random(n) < spam_rate)
+        k = np.arange(len(spam))
+        cluster = idx.copy()
+        cluster[spam] = idx[spam[(k // 7) * 7]]
+        count = np.ones(n, dtype=np.int64)
+        count[spam] = np.bincount(k // 7)[k // 7]
+
+        df = pd.DataFrame({
+            'Date': (base + pd.to_timedelta(minutes, unit="m")).strftime("%Y.%m.%d %H:%M"),
+            'Stock': np.char.add("STOCK", code),
+            'Code': code,
+            'Type': 'Domestic',
+            'Title': np.char.add("title buy sell ", (idx % 5000).astype(str)),
+            'Good': rng.integers(0, 20, n),
+            'Bad': rng.integers(0, 10, n),
+            'Views': rng.integers(0, 2000, n),
+            'Link': np.char.add(np.char.add(np.char.add(
+                "https://finance.naver.com/item/board_read.naver?code=", code), "&nid="),
+                (300000000 + idx).astype(str)),
+            'sentiment_label': rng.choice(['positive', 'negative', 'neutral'], n),
+            'sentiment_score': rng.random(n).round(4),
+            'dup_cluster': cluster,
+            'dup_count': count,
+            'dup_rep': cluster == idx,
+        })
+        df.to_csv(path, mode="w" if lo == 0 else "a", header=(lo == 0), index=False, encoding="utf-8")
+
+
+def load_topic_module():
+    path = os.path.join(ROOT, "Topic_Modeling", "Version1_Topic_Modeling")
+    loader = importlib.machinery.SourceFileLoader("topic_modeling", path)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader("topic_modeling", loader))
+    loader.exec_module(module)
+    module.USE_DATASET_STORE = False
+    return module
+
+
+def run_mode(mode, csv_path):
+    if mode == "topic_legacy":
+        topic = load_topic_module()
+        return topic.aggregate_daily(topic.load_data(csv_path))
+    if mode == "agg_legacy":
+        df = pd.read_csv(csv_path, usecols=lambda c: c in daily_agg.SOURCE_COLS, dtype={'Code': str},
+                         encoding='utf-8-sig')
+        return daily_agg.aggregate_posts(df)
+    if mode == "topic_chunked":
+        return load_topic_module().load_daily_chunked(csv_path)
+    if mode == "chunked":
+        return daily_agg.aggregate_csv(csv_path).result()
+    raise ValueError(mode)
+
+
+def child(mode, csv_path, out_path):
+    t0 = time.perf_counter()
+    result = run_mode(mode, csv_path)
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result.to_pickle(out_path)
+    print(json.dumps({"mode": mode, "groups": len(result), "seconds": elapsed, "peak_rss_mb": peak_mb}))
+
+
+def same_daily(a, b, cols):
+    """(Date, Code) 순서로 맞춰서 비교 (Topic 기존 로더는 Code 앞자리 0 이 빠지고 날짜가 date)"""
+    def norm(df):
+        df = df.copy()
+        df['Code'] = df['Code'].astype(str).str.zfill(6)
+        df['Date'] = pd.to_datetime(df['Date'].astype(str))
+        return df.sort_values(['Date', 'Code']).reset_index(drop=True)
+    a, b = norm(a), norm(b)
+    if len(a) != len(b) or not a[['Date', 'Code']].equals(b[['Date', 'Code']]):
+        return False
+    counts = [c for c in cols if c != 'engagement']
+    return bool((a[counts].astype('int64').to_numpy() == b[counts].astype('int64').to_numpy()).all()
+                and np.allclose(a['engagement'], b['engagement'], rtol=1e-9))
+
+
+def measure(n_rows, tmp, spam_rate):
+    csv_path = os.path.join(tmp, f"labeled_{n_rows}.csv")
+    print(f">> 합성 라벨링 CSV {n_rows}행 생성 중...")
+    # 생성도 별도 프로세스에서 (부모 프로세스 메모리를 작게 유지)
+    subprocess.run([sys.executable, __file__, "--make", str(n_rows), csv_path, str(spam_rate)], check=True)
+    print(f"   - {os.path.getsize(csv_path) / 1e6:.0f}MB")
+
+    rows, results = [], {}
+    for mode in MODES:
+        out_path = os.path.join(tmp, f"{mode}_{n_rows}.pkl")
+        proc = subprocess.run([sys.executable, __file__, "--child", mode, csv_path, out_path],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            # SIGKILL(-9) = 커널 OOM killer
+            status = "OOM" if proc.returncode in (-9, 137) else f"error {proc.returncode}"
+            print(f"   - {mode}: {status}\n{proc.stderr[-500:]}")
+            rows.append({"rows": n_rows, "mode": mode, "status": status})
+            continue
+        rec = json.loads(proc.stdout.strip().splitlines()[-1])
+        rows.append({"rows": n_rows, "status": "ok", **rec})
+        results[mode] = pd.read_pickle(out_path)
+        os.remove(out_path)
+        print(f"   - {mode}: {rec['seconds']:.1f}초 / 최대 RSS {rec['peak_rss_mb']:.0f}MB")
+    os.remove(csv_path)
+    return rows, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--small-rows", type=int, default=1_000_000)
+    parser.add_argument("--tmp", default=None, help="합성 CSV 를 둘 폴더 (기본: 시스템 임시 폴더)")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    parser.add_argument("--spam-rate", type=float, default=0.3, help="준복제 묶음에 들어가는 글 비율")
+    parser.add_argument("--make", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+    if args.make:
+        write_labeled_csv(args.make[1], int(args.make[0]), spam_rate=float(args.make[2]))
+        return
+
+    rows, checks = [], {}
+    peaks = {}
+    with tempfile.TemporaryDirectory(dir=args.tmp) as tmp:
+        for n in (args.small_rows, args.rows):
+            measured, results = measure(n, tmp, args.spam_rate)
+            rows += measured
+            peaks[n] = {r["mode"]: r.get("peak_rss_mb") for r in measured}
+            if "agg_legacy" in results and "chunked" in results:
+                checks[f"{n}행: chunked == agg_legacy"] = same_daily(
+                    results["chunked"], results["agg_legacy"], daily_agg.COUNT_COLS + ['engagement'])
+            if "topic_legacy" in results and "topic_chunked" in results:
+                checks[f"{n}행: topic_chunked == topic_legacy"] = same_daily(
+                    results["topic_chunked"], results["topic_legacy"], ['mentions', 'engagement'])
+
+    small, large = peaks[args.small_rows], peaks[args.rows]
+    growth = large["chunked"] / small["chunked"] if large.get("chunked") and small.get("chunked") else None
+    checks[f"chunked 최대 RSS 증가 < 1.5배 (행 {args.rows // args.small_rows}배)"] = growth is not None and growth < 1.5
+    for mode in ("topic_legacy", "agg_legacy"):
+        checks[f"{args.rows}행: chunked 최대 RSS < {mode}"] = large.get("chunked") is not None and \
+            (large.get(mode) is None or large["chunked"] < large[mode])
+
+    report = pd.DataFrame(rows)
+    print()
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    print(f"\n   - 청크 {daily_agg.CHUNK_ROWS}행 / chunked 최대 RSS: {small.get('chunked'):.0f}MB -> "
+          f"{large.get('chunked') or float('nan'):.0f}MB")
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+
+    if not all(checks.values()):
+        sys.exit("!! 청크 집계 결과/메모리가 기대와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
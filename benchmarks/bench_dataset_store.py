@@ -0,0 +1,176 @@
+"""
+CSV 로드 vs dataset_store(Parquet) 로드 벤치마크.
+
+합성 라벨링 데이터(기본 100만 행)를 CSV 와 Parquet 저장소에 각각 저장한 뒤,
+각 로드 방식을 별도 프로세스에서 실행해서 소요 시간과 최대 메모리(RSS)를 비교합니다.
+
+  csv         : dataset_store.read_csv_any 로 전체 CSV 를 읽고 날짜/숫자 파싱
+  store       : 전체 컬럼 읽기
+  store_cols  : Topic_Modeling 이 쓰는 컬럼만 읽기
+  store_filter: 위 컬럼 + 최근 7일 + 종목 10개 조건
+
+그리고 data_crawling.run_prices 처럼 최근 7일(PRICE_PERIOD) 시간봉을 매일 받아 price 테이블에
+mode="upsert" 로 넣었을 때 지난 봉이 지워지지 않는지 확인합니다 (가장 오래된 날은 일부 봉만 받아옴).
+
+    python benchmarks/bench_dataset_store.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+
+TOPIC_COLS = ['Date', 'Code', 'Title', 'Good', 'Bad', 'Views']
+
+
+def make_labeled(n_rows, n_stocks=80, n_days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"{i * 37:06d}" for i in range(n_stocks)])
+    base = pd.Timestamp("2025-10-01")
+    minutes = rng.integers(0, n_days * 24 * 60, n_rows)
+    dates = (base + pd.to_timedelta(np.sort(minutes), unit="m")).strftime("%Y.%m.%d %H:%M")
+    code = codes[rng.integers(0, n_stocks, n_rows)]
+    nid = np.arange(n_rows) + 300000000
+    return pd.DataFrame({
+        'Date': dates,
+        'Stock': pd.Series(code).radd("종목"),
+        'Code': code,
+        'Type': 'Domestic',
+        'Title': [f"제목 {i % 5000} 매수 가즈아" for i in range(n_rows)],
+        'Good': rng.integers(0, 20, n_rows).astype(str),
+        'Bad': rng.integers(0, 10, n_rows).astype(str),
+        'Views': rng.integers(0, 2000, n_rows).astype(str),
+        'Link': [f"https://finance.naver.com/item/board_read.naver?code={c}&nid={n}" for c, n in zip(code, nid)],
+        'sentiment_label': rng.choice(['positive', 'negative', 'neutral'], n_rows),
+        'sentiment_score': rng.random(n_rows).round(4),
+    })
+
+
+def make_bars(n_days=14, codes=("005930", "000660", "035420")):
+    """KRX 정규장 시간봉 (09:00~15:00 KST 시작, 하루 7개), Date 는 UTC"""
+    days = pd.bdate_range("2025-11-03", periods=n_days)
+    starts = [d + pd.Timedelta(hours=h) for d in days for h in range(9, 16)]
+    ts = pd.DatetimeIndex(starts).tz_localize("Asia/Seoul").tz_convert("UTC")
+    return pd.concat([pd.DataFrame({
+        'Date': ts, 'Stock': "종목" + c, 'Code': c,
+        'Open': 100.0, 'High': 101.0, 'Low': 99.0, 'Close': 100.5 + np.arange(len(ts)), 'Volume': 1000,
+    }) for c in codes], ignore_index=True)
+
+
+def rolling_price_check(root, window="7D", runs=7):
+    """
+    매 실행마다 "지금부터 window 전" 이후 봉만 받아서 upsert (지금 = 날마다 12:30 KST).
+    반환: (하루 봉 수 최솟값, 전체 봉 수 == 받아온 봉 수 합집합)
+    """
+    bars = make_bars()
+    days = sorted(bars['Date'].dt.tz_convert("Asia/Seoul").dt.normalize().unique())
+    seen = pd.DataFrame()
+    for now in days[-runs:]:
+        now = now + pd.Timedelta(hours=12, minutes=30)
+        fetched = bars[(bars['Date'] > now - pd.Timedelta(window)) & (bars['Date'] <= now)]
+        dataset_store.write_table("price", fetched, mode="upsert", root=root)
+        seen = pd.concat([seen, fetched]).drop_duplicates(['Code', 'Date'])
+    stored = dataset_store.read_table("price", root=root)
+    per_day = stored.groupby([stored['Code'], stored['Date'].dt.tz_convert("Asia/Seoul").dt.date]).size()
+    # 첫 실행의 가장 오래된 날은 처음부터 일부만 받았고, 마지막 날은 12:30 까지만
+    edge = [per_day.index.get_level_values(1).min(), per_day.index.get_level_values(1).max()]
+    full_days = per_day.drop(edge, level=1)
+    return int(full_days.min()), len(stored) == len(seen)
+
+
+def load(mode, csv_path, root):
+    if mode == "csv":
+        df = dataset_store.read_csv_any(csv_path)
+        df['Date'] = pd.to_datetime(df.iloc[:, 0], format='%Y.%m.%d %H:%M', errors='coerce')
+        for c in ['Good', 'Bad', 'Views']:
+            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).astype(int)
+        df['Code'] = df['Code'].astype(str).str.zfill(6)
+        return df
+    if mode == "store":
+        return dataset_store.read_table("labeled", root=root)
+    if mode == "store_cols":
+        return dataset_store.read_table("labeled", columns=TOPIC_COLS, root=root)
+    if mode == "store_filter":
+        codes = [f"{i * 37:06d}" for i in range(10)]
+        return dataset_store.read_table("labeled", columns=TOPIC_COLS, start="2025-11-23", codes=codes, root=root)
+    raise ValueError(mode)
+
+
+def child(mode, csv_path, root):
+    t0 = time.perf_counter()
+    df = load(mode, csv_path, root)
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"mode": mode, "rows": len(df), "seconds": elapsed, "peak_rss_mb": peak_mb,
+                      "frame_mb": df.memory_usage(deep=True).sum() / 1e6}))
+
+
+def make_files(n_rows, csv_path, root):
+    df = make_labeled(n_rows)
+    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    dataset_store.write_table("labeled", df, root=root)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    parser.add_argument("--make", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+    if args.make:
+        make_files(args.rows, *args.make)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "labeled.csv")
+        root = os.path.join(tmp, "data")
+
+        # 데이터 생성도 별도 프로세스에서 (리눅스는 ru_maxrss 가 exec 후에도 유지되므로
+        # 부모 프로세스 메모리를 작게 유지해야 자식 측정값이 오염되지 않음)
+        print(f">> 합성 데이터 {args.rows}행 생성 중...")
+        subprocess.run([sys.executable, __file__, "--rows", str(args.rows), "--make", csv_path, root], check=True)
+
+        csv_mb = os.path.getsize(csv_path) / 1e6
+        store_mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(root) for f in fs) / 1e6
+        print(f"   - 디스크: CSV {csv_mb:.1f}MB / Parquet {store_mb:.1f}MB")
+
+        # 프로세스마다 따로 실행해야 최대 RSS 를 공정하게 비교할 수 있음
+        rows = []
+        for mode in ["csv", "store", "store_cols", "store_filter"]:
+            out = subprocess.run([sys.executable, __file__, "--child", mode, csv_path, root],
+                                 capture_output=True, text=True, check=True)
+            rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+        min_bars, same = rolling_price_check(os.path.join(tmp, "price_data"))
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+    checks = {
+        "price upsert 7회: 지난 날짜의 봉 7개 유지": min_bars == 7,
+        "price upsert 7회: 저장된 봉 == 받아온 봉 합집합": same,
+    }
+    print(f"\n   - 최근 7일 시간봉 upsert 7회 뒤 하루 최소 봉 수: {min_bars}")
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+    if not all(checks.values()):
+        sys.exit("!! price 테이블 upsert 결과가 기대와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+dedup.py 벤치마크: 도배/준복제 묶음이 섞인 합성 게시글(fixtures.make_dup_posts)로
+  1) 정답 묶음(family) 대비 쌍 단위 정밀도/재현율
+  2) 글 수를 늘렸을 때 시간 (행당 시간이 거의 일정한지 = 글끼리 전부 비교하지 않는지)
+  3) 라벨링 때 모델에 들어가는 고유 제목 수 (묶기 전 / 후)
+  4) 작은 표본에서 모든 쌍의 실제 Jaccard 로 만든 묶음과 LSH 묶음 비교
+  5) 게시글을 여러 번에 나눠 수집/라벨링/daily_agg 증분 반영한 결과 == 마지막 파일 전체 재계산
+     (도배글 원본이 먼저 반영되고 재게시 글이 다음 실행에 들어오는 경우 포함)
+  6) 다른 종목/날짜에 올라온 같은 제목은 묶지 않고 각 (날짜, 종목) 감성 건수에 들어가는지
+를 출력합니다.
+
+    python benchmarks/bench_dedup.py --sizes 20000 200000
+    python benchmarks/bench_dedup.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import daily_agg
+import dedup
+import fixtures
+
+LABELS = np.array(["positive", "negative", "neutral"], dtype=object)
+
+
+def same_pairs(*keys):
+    """keys 가 모두 같은 행 쌍의 수 (묶음 크기별 n(n-1)/2 합)"""
+    sizes = pd.DataFrame({i: k for i, k in enumerate(keys)}).value_counts().to_numpy()
+    return int((sizes * (sizes - 1) // 2).sum())
+
+
+def pair_scores(pred, truth):
+    both = same_pairs(pred, truth)
+    p, t = same_pairs(pred), same_pairs(truth)
+    return (both / p if p else 1.0), (both / t if t else 1.0)
+
+
+def exact_clusters(texts, threshold, shingle):
+    """모든 쌍의 실제 Jaccard 로 연결 (O(n^2), 작은 표본 확인용)"""
+    sets = [{t[i:i + shingle] for i in range(max(len(t) - shingle + 1, 1))} if t else set() for t in texts]
+    u, v = [], []
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            a, b = sets[i], sets[j]
+            union = len(a | b)
+            if (a == b) or (union and len(a & b) / union >= threshold):
+                u.append(j)
+                v.append(i)
+    return dedup._components(len(sets), np.array(u, dtype=np.int64), np.array(v, dtype=np.int64))
+
+
+def crawl_posts(n, spam_rate, seed=2):
+    """make_dup_posts + 수집 순서대로의 Date / Code / Stock / Link(nid) (행 순서 = 수집 순서)"""
+    df = fixtures.make_dup_posts(n, spam_rate=spam_rate, seed=seed).drop(columns="family")
+    rng = np.random.default_rng(seed)
+    minutes = np.sort(rng.integers(0, 3 * 24 * 60, len(df)))
+    code = np.array(["005930", "000660", "035420"], dtype=object)[rng.integers(0, 3, len(df))]
+    df["Date"] = (pd.Timestamp("2025-06-01") + pd.to_timedelta(minutes, unit="m")).strftime("%Y.%m.%d %H:%M")
+    df["Code"] = code
+    df["Stock"] = "STOCK" + code
+    df["Link"] = [f"https://finance.naver.com/item/board_read.naver?code={c}&nid={1000 + i}"
+                  for i, c in enumerate(code)]
+    return df
+
+
+def repost_posts():
+    """도배글 원본 하나가 먼저 반영되고 같은 날 재게시 글이 다음 실행마다 하나씩 들어오는 경우"""
+    return pd.DataFrame({
+        "Title": ["무조건 간다 상한가 가즈아"] * 3,
+        "Content": ["지금 안 사면 후회"] * 3,
+        "Date": ["2025.06.02 09:10", "2025.06.02 10:40", "2025.06.02 13:05"],
+        "Code": "005930",
+        "Stock": "삼성전자",
+        "Link": [f"https://finance.naver.com/item/board_read.naver?code=005930&nid={nid}" for nid in (11, 12, 13)],
+    })
+
+
+def cross_group_posts():
+    """같은 제목 "매수" 가 다른 종목/날짜에 (묶이면 000660 의 긍정이 빠져 Positive_Ratio 0.5 -> 0)"""
+    return pd.DataFrame({
+        "Title": ["매수", "매수", "떡락"],
+        "Date": ["2025.12.01 10:00", "2025.12.05 10:00", "2025.12.05 11:00"],
+        "Code": ["005930", "000660", "000660"],
+        "sentiment_label": ["positive", "positive", "negative"],
+    })
+
+
+def label_posts(df, threshold):
+    """Labeling 과 같은 순서: 파일 전체 dedup.annotate -> 대표 글만 (가짜) 라벨 -> 묶음 전체에 복사"""
+    dedup.annotate(df, threshold=threshold)
+    labels = LABELS[[zlib.crc32(t.encode("utf-8")) % 3 for t in df["Title"]]]
+    df["sentiment_label"] = dedup.spread(labels, df)
+    return df
+
+
+def same_store(a, b):
+    a, b = (x.sort_values(daily_agg.KEY_COLS).reset_index(drop=True) for x in (a, b))
+    if len(a) != len(b) or not (a["Date"].astype(str).tolist() == b["Date"].astype(str).tolist()
+                                and a["Code"].tolist() == b["Code"].tolist()):
+        return False
+    counts = daily_agg.COUNT_COLS
+    return bool((a[counts].astype("int64").to_numpy() == b[counts].astype("int64").to_numpy()).all()
+                and np.allclose(a["engagement"], b["engagement"]))
+
+
+def incremental_vs_full(posts, runs, threshold, chunk_rows):
+    """
+    posts 를 runs 번에 나눠 앞에서부터 늘려가며 (매번 파일 전체를 다시 묶고 라벨링)
+    merge_labeled / merge_labeled_csv 로 증분 반영한 저장소 vs 마지막 파일 전체를 한 번에 집계
+    반환: (merge_labeled 일치, merge_labeled_csv 일치, 실행을 넘나드는 묶음 수)
+    """
+    ends = np.linspace(0, len(posts), runs + 1).astype(int)[1:]
+    with tempfile.TemporaryDirectory() as tmp:
+        store_df, store_csv = os.path.join(tmp, "agg_df.csv"), os.path.join(tmp, "agg_csv.csv")
+        csv_path = os.path.join(tmp, "labeled.csv")
+        for end in ends:
+            cur = label_posts(posts.iloc[:end].copy(), threshold)
+            daily_agg.merge_labeled(cur, store_df)
+            cur.to_csv(csv_path, index=False, encoding="utf-8-sig")
+            daily_agg.merge_labeled_csv(csv_path, store_csv, chunk_rows=chunk_rows)
+        full = daily_agg.aggregate_posts(cur)
+        run_of = np.searchsorted(ends, np.arange(len(cur)), side="right")
+        spanning = int((pd.Series(run_of).groupby(cur["dup_cluster"].to_numpy()).nunique() > 1).sum())
+        return (same_store(daily_agg.load_store(store_df), full),
+                same_store(daily_agg.load_store(store_csv), full), spanning)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 200000])
+    parser.add_argument("--spam-rate", type=float, default=0.3, help="도배글 비율")
+    parser.add_argument("--threshold", type=float, default=dedup.THRESHOLD)
+    parser.add_argument("--exact-sample", type=int, default=1000, help="모든 쌍 비교 표본 크기, 0 이면 생략")
+    parser.add_argument("--min-precision", type=float, default=0.99)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--incremental-rows", type=int, default=20000, help="증분 vs 전체 비교 글 수, 0 이면 생략")
+    parser.add_argument("--runs", type=int, default=4, help="증분 비교에서 나눠 반영하는 횟수")
+    args = parser.parse_args()
+
+    rows, checks = [], {}
+    for n in args.sizes:
+        df = fixtures.make_dup_posts(n, spam_rate=args.spam_rate)
+        t0 = time.perf_counter()
+        dedup.annotate(df, threshold=args.threshold)
+        sec = time.perf_counter() - t0
+
+        precision, recall = pair_scores(df["dup_cluster"], df["family"])
+        model_titles = pd.Series(dedup.spread(df["Title"], df)).nunique()
+        rows.append((n, df["family"].nunique(), df["dup_cluster"].nunique(), precision, recall,
+                     df["Title"].nunique(), model_titles, sec, n / sec))
+        checks[f"{n}행: 정밀도 >= {args.min_precision}"] = precision >= args.min_precision
+        checks[f"{n}행: 재현율 >= {args.min_recall}"] = recall >= args.min_recall
+
+    report = pd.DataFrame(rows, columns=["rows", "true_clusters", "clusters", "pair_precision", "pair_recall",
+                                         "titles_before", "titles_after", "seconds", "rows/sec"])
+    if len(rows) > 1:
+        # 글끼리 전부 비교하면 행 수가 10배일 때 행당 시간도 10배
+        per_row = report["seconds"] / report["rows"]
+        checks["행당 시간 증가 < 3배 (선형에 가까움)"] = per_row.iloc[-1] < 3 * per_row.iloc[0]
+
+    if args.exact_sample:
+        df = fixtures.make_dup_posts(args.exact_sample, spam_rate=args.spam_rate, seed=1)
+        texts = list(dedup.normalize_texts(dedup.post_texts(df)))
+        t0 = time.perf_counter()
+        exact = exact_clusters(texts, args.threshold, dedup.SHINGLE)
+        exact_sec = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        lsh = dedup.near_duplicate_clusters(dedup.post_texts(df), threshold=args.threshold)
+        lsh_sec = time.perf_counter() - t0
+        precision, recall = pair_scores(lsh, exact)
+        print(f"\n모든 쌍 비교 표본 {args.exact_sample}건: 전체 비교 {exact_sec:.2f}초 / LSH {lsh_sec:.3f}초, "
+              f"LSH 묶음의 정밀도 {precision:.4f} / 재현율 {recall:.4f} (전체 비교 기준)")
+        checks["표본: 전체 비교 대비 재현율 >= 0.95"] = recall >= 0.95
+
+    if args.incremental_rows:
+        t0 = time.perf_counter()
+        by_df, by_csv, spanning = incremental_vs_full(
+            crawl_posts(args.incremental_rows, args.spam_rate), args.runs, args.threshold,
+            chunk_rows=max(args.incremental_rows // 7, 1))
+        print(f"\n증분 반영 {args.incremental_rows}건 / {args.runs}회: 실행을 넘나드는 묶음 {spanning}개, "
+              f"{time.perf_counter() - t0:.1f}초")
+        checks[f"증분 {args.runs}회 merge_labeled == 전체 재계산"] = by_df
+        checks[f"증분 {args.runs}회 merge_labeled_csv(청크) == 전체 재계산"] = by_csv
+        by_df, by_csv, _ = incremental_vs_full(repost_posts(), 3, args.threshold, chunk_rows=2)
+        checks["도배 원본 뒤 재게시 (3회 반영) == 전체 재계산"] = by_df and by_csv
+
+    cross = dedup.annotate(cross_group_posts(), threshold=args.threshold)
+    agg = daily_agg.aggregate_posts(cross).set_index("Code")
+    ratio = daily_agg.positive_ratio(agg)
+    checks["다른 종목/날짜의 같은 제목은 따로 셈 (000660 Positive_Ratio 0.5)"] = \
+        bool(cross["dup_rep"].all()) and ratio["000660"] == 0.5 and ratio["005930"] == 1.0
+
+    print(f"\n도배글 비율 {args.spam_rate:.0%} / 기준 Jaccard {args.threshold} / "
+          f"MinHash {dedup.NUM_PERM}개, LSH 구간 {dedup.BANDS}개")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+
+    if not all(checks.values()):
+        sys.exit("!! 준복제 묶음 결과가 기준에 못 미칩니다.")
+
+
+if __name__ == "__main__":
+    main()
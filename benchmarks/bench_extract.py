@@ -0,0 +1,103 @@
+"""
+naver_extract 백엔드별 파싱 속도 벤치마크.
+
+benchmarks/html/ 에 저장된 게시판 목록/게시글 HTML 픽스처를 백엔드마다 반복 파싱해서
+초당 처리 페이지 수를 비교하고, 모든 백엔드의 결과가 bs4(html.parser) 와 같은지 확인합니다.
+차단 안내 페이지(post_blocked)는 본문이 "" 가 아니라 None 이어야 합니다. (빈 본문으로 캐시되지 않도록)
+
+    python benchmarks/bench_extract.py --repeat 20
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import naver_extract
+import fixtures
+
+HTML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html")
+
+
+def load_fixtures():
+    if not glob.glob(os.path.join(HTML_DIR, "*.html")):
+        fixtures.save_html_fixtures(HTML_DIR)
+
+    boards, posts = [], []
+    for path in sorted(glob.glob(os.path.join(HTML_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            raw = f.read()
+        name = os.path.basename(path)
+        if name.startswith("board_"):
+            # data_crawling 은 디코딩된 str, crawling 은 bytes 를 넘기므로 둘 다 확인
+            boards.append((name, raw))
+            boards.append((name + ":str", raw.decode("euc-kr")))
+        elif name.startswith("post_"):
+            posts.append((name, raw))
+    return boards, posts
+
+
+def run(extractor, boards, posts, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        board_out = [extractor.board_entries(html) for _, html in boards]
+    board_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        post_out = [extractor.post_content(html) for _, html in posts]
+    post_sec = time.perf_counter() - t0
+
+    return board_out, post_out, board_sec, post_sec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=naver_extract.available_extractors())
+    args = parser.parse_args()
+
+    boards, posts = load_fixtures()
+    print(f"픽스처: 목록 {len(boards)}장 / 게시글 {len(posts)}장 x {args.repeat}회")
+
+    baseline = None
+    rows = []
+    for name in args.backends:
+        extractor = naver_extract.get_extractor(name)
+        board_out, post_out, board_sec, post_sec = run(extractor, boards, posts, args.repeat)
+        if baseline is None:
+            baseline = (board_out, post_out)
+
+        same = (board_out, post_out) == baseline
+        blocked_none = all(out is None for (fname, _), out in zip(posts, post_out) if "blocked" in fname)
+        if not blocked_none:
+            print(f"   !! [{name}] 차단 안내 페이지의 본문이 None 이 아님")
+        if not same:
+            for (fname, _), a, b in zip(boards, board_out, baseline[0]):
+                if a != b:
+                    print(f"   !! [{name}] 목록 결과 불일치: {fname}")
+            for (fname, _), a, b in zip(posts, post_out, baseline[1]):
+                if a != b:
+                    print(f"   !! [{name}] 본문 결과 불일치: {fname}")
+
+        n_board = len(boards) * args.repeat
+        n_post = len(posts) * args.repeat
+        rows.append((name, n_board / board_sec, n_post / post_sec,
+                     (n_board + n_post) / (board_sec + post_sec), same, blocked_none))
+
+    report = pd.DataFrame(rows, columns=["backend", "board pages/sec", "post pages/sec", "total pages/sec", "same_output",
+                                         "blocked_none"])
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+
+    if not report["same_output"].all():
+        sys.exit("!! 백엔드 간 추출 결과가 다릅니다.")
+    if not report["blocked_none"].all():
+        sys.exit("!! 차단 안내 페이지가 빈 본문으로 추출됩니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+intraday_align 벤치마크.
+
+합성 게시글 N건(한국 시간 문자열, 장중/장외/주말 섞임)과 종목별 장중 시간봉으로
+  - align_posts (BarIndex + searchsorted) 시간
+  - pd.merge_asof(by='Code', direction='forward') 기준 구현 시간
+  - 두 결과의 정렬된 봉 시각이 같은지
+  - hourly_signals 시간
+을 잽니다.
+
+    python benchmarks/bench_intraday_align.py --posts 2000000 --stocks 80
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import intraday_align
+from bench_walk_forward import make_data
+
+
+def make_posts(codes, n_posts, start, n_days, seed=1):
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(0, n_days * 1440, size=n_posts)
+    when = pd.Timestamp(start) + pd.to_timedelta(minutes, unit="min")
+    return pd.DataFrame({
+        'Date': when.strftime('%Y.%m.%d %H:%M'),
+        'Code': rng.choice(codes, size=n_posts),
+        'sentiment_label': rng.choice(['positive', 'negative', 'neutral'], size=n_posts),
+    })
+
+
+def merge_asof_baseline(posts, prices, delay=intraday_align.POST_DELAY):
+    left = pd.DataFrame({
+        'Code': posts['Code'].astype(str).str.zfill(6),
+        'ts': pd.to_datetime(posts['Date'], format='%Y.%m.%d %H:%M').dt.tz_localize('Asia/Seoul')
+              .dt.tz_convert('UTC') + pd.Timedelta(delay),
+        'row': np.arange(len(posts)),
+    }).sort_values('ts')
+    right = pd.DataFrame({
+        'Code': prices['Code'].astype(str).str.zfill(6),
+        'ts': pd.to_datetime(prices['Date'], utc=True),
+    })
+    right['bar_ts'] = right['ts']
+    right = right.sort_values('ts')
+    merged = pd.merge_asof(left, right, on='ts', by='Code', direction='forward')
+    return merged.sort_values('row')['bar_ts'].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=2_000_000)
+    parser.add_argument("--stocks", type=int, default=80)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    _, prices = make_data(args.stocks, args.days)
+    # 시가 = 같은 종목 직전 봉 종가 (다음 봉 시가 진입 수익률이 0 이 아니도록)
+    prices['Open'] = prices.groupby('Code')['Close'].shift(1).fillna(prices['Close'])
+    codes = prices['Code'].unique()
+    posts = make_posts(codes, args.posts, "2025-01-01", args.days)
+
+    t0 = time.perf_counter()
+    index = intraday_align.BarIndex(prices)
+    t_index = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    aligned = intraday_align.align_posts(posts, index)
+    t_align = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    baseline = merge_asof_baseline(posts, prices)
+    t_asof = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    hourly = intraday_align.hourly_signals(posts, index)
+    t_hourly = time.perf_counter() - t0
+
+    same = aligned['bar_ts'].reset_index(drop=True).equals(baseline.astype(aligned['bar_ts'].dtype))
+    print(f"\n게시글 {len(posts):,}건 / 종목 {len(codes)}개 / 시간봉 {len(prices):,}개")
+    print(f"  BarIndex 생성       {t_index:.2f}s")
+    print(f"  align_posts         {t_align:.2f}s  ({len(posts) / t_align:,.0f} posts/sec)")
+    print(f"  merge_asof 기준     {t_asof:.2f}s")
+    print(f"  hourly_signals      {t_hourly:.2f}s  ({len(hourly):,} 묶음)")
+    print(f"  장중 글 비율 {aligned['in_session'].mean():.1%} / 평균 대기 {aligned['wait_minutes'].mean():.0f}분")
+    up_rate = hourly['Is_Price_Up'].mean()
+    print(f"  merge_asof 결과와 일치: {same}")
+    print(f"  다음 봉 상승 비율 {up_rate:.3f} (0 이면 시가 대신 종가를 쓴 것)")
+    if not same:
+        sys.exit("!! 정렬 결과가 merge_asof 와 다릅니다.")
+    if not 0 < up_rate < 1:
+        sys.exit("!! 다음 봉 상승 여부가 한쪽으로만 나옵니다.")
+    try:
+        intraday_align.hourly_signals(posts.head(1000), prices.drop(columns='Open'))
+        sys.exit("!! Open 이 없는 시간봉이 오류 없이 통과했습니다.")
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
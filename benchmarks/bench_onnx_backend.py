@@ -0,0 +1,76 @@
+"""
+감성 분류 백엔드 벤치마크: transformers pipeline(torch) vs ONNX Runtime fp32 / int8.
+
+같은 고유 제목 샘플로 백엔드별 titles/sec 와, torch 대비
+  - 라벨 일치율 / 불일치 건수
+  - 점수 차이 (라벨이 같은 문장의 |score 차이| 평균 / 최대)
+를 표로 보여줍니다. --model 을 주지 않으면 fixtures.make_tiny_sentiment_model 로
+같은 구조의 작은 모델을 임시 폴더에 만들어 씁니다 (네트워크 불필요).
+
+    python benchmarks/bench_onnx_backend.py --titles 2000
+    python benchmarks/bench_onnx_backend.py --model snunlp/KR-FinBert-SC --titles 512
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import onnx_backend
+import sentiment
+from fixtures import BASE_NID, make_tiny_sentiment_model, make_title
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None, help="모델 이름/경로 (기본: 작은 합성 모델)")
+    parser.add_argument("--titles", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="int8 라벨 일치율이 이보다 낮으면 실패")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = args.model or make_tiny_sentiment_model(os.path.join(tmp, "tiny-finbert"))
+        # 제목 중복을 빼고 args.titles 개
+        texts = list(dict.fromkeys(make_title(BASE_NID + i) for i in range(args.titles * 4)))[:args.titles]
+
+        reference = sentiment.load_classifier(model, device=-1, num_threads=args.threads)
+        rows, reports = [], {}
+        for backend in ("onnx", "onnx-int8"):
+            candidate = sentiment.load_classifier(model, num_threads=args.threads, backend=backend,
+                                                  onnx_dir=os.path.join(tmp, "onnx"))
+            # 첫 호출(세션 워밍업)은 재지 않음
+            sentiment.predict_batches(candidate, texts[:args.batch_size], args.batch_size)
+            report = onnx_backend.parity_report(reference, candidate, texts, args.batch_size)
+            reports[backend] = report
+            if not rows:
+                rows.append(("torch", report["reference_titles_per_sec"], 1.0, 1.0, 0, 0.0, 0.0))
+            rows.append((backend, report["candidate_titles_per_sec"], report["speedup"],
+                         report["agreement"], report["mismatches"],
+                         report["score_drift_mean"], report["score_drift_max"]))
+
+        out_dir = onnx_backend.model_dir(model, os.path.join(tmp, "onnx"))
+        sizes = {name: os.path.getsize(os.path.join(out_dir, name)) / 1e6
+                 for name in (onnx_backend.FP32_FILE, onnx_backend.INT8_FILE)}
+
+    print(f"\n모델 {args.model or '작은 합성 모델'} / 고유 제목 {len(texts)}건 / batch={args.batch_size}")
+    table = pd.DataFrame(rows, columns=["backend", "titles/sec", "speedup", "agreement",
+                                        "mismatches", "drift_mean", "drift_max"])
+    print(table.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"\n모델 파일 크기: fp32 {sizes[onnx_backend.FP32_FILE]:.2f}MB -> "
+          f"int8 {sizes[onnx_backend.INT8_FILE]:.2f}MB")
+
+    fp32, int8 = reports["onnx"], reports["onnx-int8"]
+    if fp32["agreement"] < 1.0 or fp32["score_drift_max"] > 1e-3:
+        sys.exit("!! ONNX fp32 결과가 torch pipeline 과 다릅니다.")
+    if int8["agreement"] < args.min_agreement:
+        sys.exit(f"!! int8 라벨 일치율 {int8['agreement']:.2%} < {args.min_agreement:.0%}")
+
+
+if __name__ == "__main__":
+    main()
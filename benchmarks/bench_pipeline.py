@@ -0,0 +1,125 @@
+"""
+pipeline.py 벤치마크: 임시 폴더에 실제 단계와 같은 DAG 의 대역 스크립트(잠깐 잠들고 CSV 를 씀)를 만들고
+  1) 처음 실행: 모든 단계 실행, crawl / prices 동시 실행으로 전체 시간 < 단계 합계인지
+  2) 그대로 다시 실행: 수집 단계만 돌고, 출력이 같으니 label / topic / accuracy 는 건너뛰는지
+  3) 수집 결과가 바뀐 뒤 실행: label 과 그 뒤 단계만 다시 도는지
+  4) 스크립트 설정만 바뀐 경우: 그 단계(topic)만 다시 도는지
+  5) --force label 로 CSV 는 같고 집계 저장소/Parquet 테이블만 다시 쓴 경우: topic / accuracy 가 다시 도는지
+  6) 수집 없이 Parquet 시간봉 테이블만 바뀐 경우: accuracy 만 다시 도는지
+를 확인합니다.
+
+    python benchmarks/bench_pipeline.py --seconds 0.5
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+
+SCRIPT = """import sys, time
+time.sleep({seconds})
+{body}
+"""
+
+BODIES = {
+    # 수집: 외부 데이터 흉내 (revision 파일 내용이 바뀌면 수집 결과도 바뀜)
+    "data_crawling.py": """target = sys.argv[1]
+rev = open("revision.txt").read() if target == "community" else "price"
+out = "stock_community_data_top80.csv" if target == "community" else "stock_price_data_top80.csv"
+open(out, "w").write(f"Date,Code,Title\\n2025-12-01,005930,{rev}\\n")""",
+    # 라벨링: CSV 는 입력이 같으면 같지만 집계 저장소/Parquet 테이블은 실행할 때마다 다시 씀
+    "Labeling": """import os
+src = open("stock_community_data_top80.csv").read()
+open("stock_community_labeled.csv", "w").write(src.replace("Title", "Title,sentiment_label") + ",positive\\n")
+open("daily_sentiment_agg.csv", "w").write(f"Date,Code,positive\\n2025-12-01,005930,{time.time()}\\n")
+os.makedirs("data/labeled/day=2025-12-01", exist_ok=True)
+open(f"data/labeled/day=2025-12-01/part-{time.time_ns()}.parquet", "w").write(src)""",
+    "Topic_Modeling/Version1_Topic_Modeling": """TOP_N = 5
+src = open("stock_community_labeled.csv").read()
+open("daily_results.csv", "w").write(src)
+open("top5_last7days.csv", "w").write(src[:TOP_N * 10])""",
+    "accuracy_modeling.py": """a = open("stock_community_labeled.csv").read(); b = open("stock_price_data_top80.csv").read()
+for name in ("prediction_result_report.csv", "accuracy_summary_report.csv",
+             "threshold_curve_report.csv", "threshold_curve_by_stock.csv"):
+    open(name, "w").write(a + b)""",
+}
+
+SOURCES = ["crawl_state.py", "naver_extract.py", "rate_control.py", "price_service.py", "dedup.py", "sentiment.py",
+           "label_stream.py", "sentiment_cache.py", "onnx_backend.py", "daily_agg.py", "popularity.py",
+           "threshold_sweep.py", "walk_forward.py", "intraday_align.py"]
+
+
+def write(root, path, text):
+    full = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w") as f:
+        f.write(text)
+
+
+def make_tree(root, seconds):
+    for path, body in BODIES.items():
+        write(root, path, SCRIPT.format(seconds=seconds, body=body))
+    for path in SOURCES:
+        write(root, path, "# 대역 모듈\n")
+    write(root, "revision.txt", "rev1")
+    write(root, "data/price/day=2025-12-01/part-0.parquet", "price")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=0.5, help="단계마다 잠드는 시간")
+    args = parser.parse_args()
+
+    rows, checks = [], {}
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, args.seconds)
+
+        def run(label, **kwargs):
+            report = pipeline.run_pipeline(root=root, **kwargs)
+            rows.append((label, report))
+            return dict(zip(report["stage"], report["status"])), report
+
+        status, report = run("1) 처음 실행")
+        checks["처음: 모든 단계 실행"] = set(status.values()) == {"ran"}
+        checks["처음: 전체 시간 < 단계 합계 (병렬)"] = report.attrs["wall_seconds"] < report["seconds"].sum()
+
+        status, _ = run("2) 그대로 다시")
+        checks["다시: 수집만 실행, 나머지 건너뜀"] = status == {
+            "crawl": "ran", "prices": "ran", "label": "cached", "topic": "cached", "accuracy": "cached"}
+
+        write(root, "revision.txt", "rev2")
+        status, _ = run("3) 새 게시글")
+        checks["새 게시글: label 이후 다시 실행"] = all(status[s] == "ran" for s in ("label", "topic", "accuracy"))
+
+        script = os.path.join(root, "Topic_Modeling/Version1_Topic_Modeling")
+        write(root, "Topic_Modeling/Version1_Topic_Modeling", open(script).read().replace("TOP_N = 5", "TOP_N = 3"))
+        status, _ = run("4) topic 설정 변경")
+        checks["설정 변경: topic 만 다시 실행"] = (status["topic"] == "ran"
+                                             and status["label"] == status["accuracy"] == "cached")
+
+        labeled_csv = pipeline.file_hash(pipeline.LABELED_CSV, root=root)
+        status, _ = run("5) --force label", skip=["crawl", "prices"], force=["label"])
+        checks["저장소만 바뀜: topic / accuracy 다시 실행"] = (
+            pipeline.file_hash(pipeline.LABELED_CSV, root=root) == labeled_csv
+            and status["label"] == status["topic"] == status["accuracy"] == "ran")
+
+        write(root, "data/price/day=2025-12-02/part-0.parquet", "price")
+        status, _ = run("6) 시간봉 테이블 변경", skip=["crawl", "prices"])
+        checks["시간봉 테이블 변경: accuracy 만 다시 실행"] = (status["accuracy"] == "ran"
+                                                   and status["label"] == status["topic"] == "cached")
+
+    for label, report in rows:
+        print(f"\n{label}: 전체 {report.attrs['wall_seconds']:.2f}초 / 단계 합계 {report['seconds'].sum():.2f}초")
+        print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print()
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+    if not all(checks.values()):
+        sys.exit("!! 파이프라인 캐시/병렬 실행 결과가 기대와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+popularity 엔진 벤치마크 + 기존 Topic_Modeling 계산과의 일치 검증.
+
+합성 (Date, Code) 일별 집계로
+  1) 기존 compute_growth / compute_popularity / apply_valid_filter 결과와 엔진 결과가 비트 단위로 같은지
+  2) 기존 extract_top5_last_7days(날짜 루프)와 top_n_per_day 가 같은지
+  3) 전체 재계산 시간과, 하루치가 새로 들어왔을 때 증분 갱신(update_results / engine.update) 시간
+을 확인하고, 저장소에 올라 있는 Topic_Modeling/daily_results.csv 의 (Date, Code, mentions, engagement) 를
+daily_agg 처럼 6자리 종목코드로 넣었을 때
+  4) Version1_Topic_Modeling 이 저장하는 daily_results.csv 가 기존 파일과 같은지
+     (Date/Code/mentions/valid 와 행 순서는 글자 단위, 실수 컬럼은 상대오차 1e-12 - 기존 파일을 만든 환경과
+      log1p 마지막 자리가 다를 수 있음 / 전체 계산, 기존 파일로 증분 - 변경 없음, 마지막 날이 빠진 기존 파일로 증분)
+도 확인합니다.
+
+    python benchmarks/bench_popularity.py --stocks 2000 --days 365
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+import popularity
+
+
+def make_daily(n_stocks, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = [f"{i * 37:06d}" for i in range(n_stocks)]
+    dates = pd.date_range("2025-01-01", periods=n_days, freq="D").date
+    daily = pd.DataFrame({
+        'Date': np.tile(dates, n_stocks),
+        'Code': np.repeat(codes, n_days),
+        'mentions': rng.poisson(8, n_stocks * n_days),
+    })
+    daily['engagement'] = daily['mentions'] * rng.gamma(2.0, 5.0, len(daily))
+    # 언급 없는 날은 행이 없음
+    daily = daily[daily['mentions'] > 0]
+    return daily.sort_values(['Code', 'Date']).reset_index(drop=True)
+
+
+# 기존 Topic_Modeling/Version1_Topic_Modeling 의 계산 그대로
+def legacy_metrics(daily):
+    daily = daily.copy()
+    daily['mentions_7d_ma'] = daily.groupby('Code')['mentions'] \
+        .transform(lambda s: s.rolling(popularity.ROLL_WINDOW, min_periods=1).mean())
+    prev = daily.groupby('Code')['mentions'].shift(1)
+    daily['daily_growth'] = (daily['mentions'] - prev) / (prev + 1e-9)
+    daily['weekly_growth'] = (daily['mentions'] - daily['mentions_7d_ma']) / (daily['mentions_7d_ma'] + 1e-9)
+    daily['log_weight'] = popularity.safe_log(daily['mentions'])
+    rate_score = popularity.W_DAILY * daily['daily_growth'] + popularity.W_WEEKLY * daily['weekly_growth']
+    daily['popularity'] = (rate_score * daily['log_weight']) + 0.4 * popularity.safe_log(daily['engagement'])
+    daily['valid'] = (daily['mentions'] >= popularity.MIN_POSTS)
+    return daily
+
+
+def legacy_top5(daily):
+    dates = sorted(daily['Date'].unique())
+    rows = []
+    for d in dates[-7:]:
+        df_day = daily[(daily['Date'] == d) & (daily['valid'] == True)]
+        rows.append(df_day.sort_values('popularity', ascending=False, kind='stable').head(5))
+    return pd.concat(rows, ignore_index=True)
+
+
+def load_topic_module():
+    path = os.path.join(ROOT, "Topic_Modeling", "Version1_Topic_Modeling")
+    loader = importlib.machinery.SourceFileLoader("topic_modeling", path)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader("topic_modeling", loader))
+    loader.exec_module(module)
+    return module
+
+
+def same_results_csv(text, expected):
+    """저장한 CSV 문자열 두 개 비교: 실수 컬럼만 상대오차 1e-12 (NaN 끼리는 같음)"""
+    a, b = (pd.read_csv(io.StringIO(t), dtype=str, keep_default_na=False) for t in (text, expected))
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    floats = [c for c in popularity.RESULT_COLS if c not in ('Date', 'Code', 'mentions', 'valid')]
+    exact = [c for c in a.columns if c not in floats]
+    if not a[exact].equals(b[exact]):
+        return False
+    x, y = (df[floats].replace('', 'nan').astype(float).to_numpy() for df in (a, b))
+    return bool(np.allclose(x, y, rtol=1e-12, atol=0, equal_nan=True))
+
+
+def committed_parity(path=os.path.join(ROOT, "Topic_Modeling", "daily_results.csv")):
+    """기존 daily_results.csv 의 입력 컬럼으로 다시 계산해서 저장한 CSV 가 기존 파일과 같은지 (경우별 bool)"""
+    topic = load_topic_module()
+    with open(path, encoding="utf-8") as f:
+        expected = f.read()
+    previous = topic.load_previous_results(path)
+    # daily_agg 저장소에서 읽은 것처럼 6자리 종목코드
+    daily = previous[['Date', 'Code', 'mentions', 'engagement']].sort_values(['Code', 'Date'])
+
+    def saved(result):
+        return topic.results_for_csv(result).to_csv(index=False, lineterminator="\n")
+
+    last = previous['Date'].max()
+    with tempfile.TemporaryDirectory() as tmp:
+        # 마지막 날이 없던 시점의 결과 파일 (기존 형식 그대로)
+        older = os.path.join(tmp, "daily_results.csv")
+        with open(older, "w", encoding="utf-8") as f:
+            f.write(saved(topic.compute_metrics(daily[daily['Date'] < last])))
+        stale = topic.load_previous_results(older)
+
+    return {
+        "전체 계산": same_results_csv(saved(topic.compute_metrics(daily)), expected),
+        "기존 파일로 증분 (변경 없음)": same_results_csv(saved(topic.compute_metrics(daily, previous)), expected),
+        "마지막 날 빠진 파일로 증분": same_results_csv(saved(topic.compute_metrics(daily, stale)), expected),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    daily = make_daily(args.stocks, args.days)
+    rows = []
+
+    t0 = time.perf_counter()
+    legacy = legacy_metrics(daily)
+    legacy_top = legacy_top5(legacy)
+    rows.append(("legacy (전체)", time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    result = popularity.compute_all(daily)
+    top = popularity.top_n_per_day(result, 5, popularity.last_dates(result, 7))
+    rows.append(("engine (전체)", time.perf_counter() - t0))
+
+    # 마지막 하루만 새로 들어온 상황
+    last = daily['Date'].max()
+    previous = popularity.compute_all(daily[daily['Date'] < last])
+    t0 = time.perf_counter()
+    incremental, start = popularity.update_results(daily, previous)
+    rows.append((f"update_results (변경 감지 포함, {start} 하루)", time.perf_counter() - t0))
+
+    # 상태를 메모리에 들고 있는 경우: 하루치 갱신만
+    engine = popularity.PopularityEngine.from_results(previous)
+    day = daily[daily['Date'] == last]
+    t0 = time.perf_counter()
+    engine.update(last, day['Code'].to_numpy(), day['mentions'].to_numpy(), day['engagement'].to_numpy())
+    rows.append(("engine.update (하루)", time.perf_counter() - t0))
+
+    same_metrics = result.equals(legacy[popularity.RESULT_COLS])
+    same_top = top.equals(legacy_top[popularity.RESULT_COLS])
+    same_incremental = incremental.equals(result.reset_index(drop=True))
+
+    print(f"\n종목 {args.stocks}개 / {args.days}일 / (날짜, 종목) {len(daily):,}행")
+    report = pd.DataFrame(rows, columns=["mode", "seconds"])
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"\n지표 일치: {same_metrics} / TOP5 일치: {same_top} / 증분 == 전체: {same_incremental}")
+
+    parity = committed_parity()
+    print("\n기존 Topic_Modeling/daily_results.csv 와 같은 파일:")
+    for name, ok in parity.items():
+        print(f"  {name}: {ok}")
+    if not (same_metrics and same_top and same_incremental and all(parity.values())):
+        sys.exit("!! 엔진 결과가 기존 계산과 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+crawling.fetch_post_contents 벤치마크: 본문 캐시 + 본문을 못 받은 글 다시 수집.
+
+로컬 스텁 서버에서 종목마다 새 글 posts 건의 본문을 두 번의 증분 실행으로 받습니다.
+  1회차: blocked 개의 글은 차단 안내 페이지로 응답 -> 본문 None, crawl_state.body_complete_rows 가
+         그 글부터 저장/워터마크에서 빼야 함 (워터마크가 못 받은 글을 넘으면 다음 실행이 건너뜀)
+  2회차: 차단이 풀린 서버에서 워터마크보다 새 글만 다시 수집 -> 못 받았던 본문을 받고,
+         1회차에 받아 캐시한 글은 다시 요청하지 않아야 함
+두 실행을 합친 결과가 차단 없이 한 번에 받은 결과와 같은지 확인합니다.
+
+    python benchmarks/bench_post_fetch.py --stocks 3 --posts 40 --blocked 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import crawl_state
+import crawling
+import rate_control
+from post_cache import PostContentCache
+from stub_server import StubServer
+
+
+def make_rows(srv, n_stocks, posts, start_nid=500000):
+    """종목마다 nid 가 이어지는 새 글 (목록 수집 결과 모양, Content 는 아직 없음)"""
+    rows = []
+    for i in range(n_stocks):
+        code = f"{(i + 1) * 37:06d}"
+        for k in range(posts):
+            nid = start_nid + i * posts + k
+            rows.append({'Code': code, 'Link': srv.url(f"/item/board_read.naver?code={code}&nid={nid}")})
+    return pd.DataFrame(rows)
+
+
+def crawl_run(srv, rows, watermarks, cache_path, workers):
+    """워터마크보다 새 글만 본문 수집 -> (저장할 행, 미룬 행 수, 본문 요청 수, 초)"""
+    nids = rows['Link'].map(crawl_state.extract_nid)
+    wm = rows['Code'].map(watermarks).fillna(0)
+    new = rows[(nids > wm).to_numpy()].copy()
+    srv.reset_hits()
+    t0 = time.perf_counter()
+    with PostContentCache(cache_path) as cache:
+        session = crawling.make_session(workers)
+        throttle = rate_control.AimdThrottle(rate=rate_control.MAX_RATE)
+        new['Content'] = crawling.fetch_post_contents(session, new['Link'].tolist(), workers, cache, throttle)
+    sec = time.perf_counter() - t0
+    kept, held = crawl_state.body_complete_rows(new)
+    return kept, held, srv.hits, sec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=3)
+    parser.add_argument("--posts", type=int, default=40, help="종목당 새 글 수")
+    parser.add_argument("--blocked", type=int, default=2, help="1회차에 본문이 차단되는 글 수")
+    parser.add_argument("--workers", type=int, default=crawling.BODY_WORKERS)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp, StubServer(latency=args.latency) as srv:
+        rows = make_rows(srv, args.stocks, args.posts)
+        nids = rows['Link'].map(crawl_state.extract_nid)
+        blocked = set(rng.choice(nids, size=args.blocked, replace=False).tolist())
+
+        # 기준: 차단 없이 한 번에
+        reference, _, _, _ = crawl_run(srv, rows, {}, os.path.join(tmp, "ref.sqlite"), args.workers)
+
+        cache_path = os.path.join(tmp, "cache.sqlite")
+        srv.httpd.blocked_posts = blocked
+        kept1, held1, hits1, sec1 = crawl_run(srv, rows, {}, cache_path, args.workers)
+        watermarks = crawl_state.update_watermarks({}, kept1)
+        srv.httpd.blocked_posts = set()
+        kept2, held2, hits2, sec2 = crawl_run(srv, rows, watermarks, cache_path, args.workers)
+
+    saved = pd.concat([kept1, kept2], ignore_index=True)
+    held_links = set(rows['Link']) - set(kept1['Link'])
+    report = pd.DataFrame([
+        {"run": "차단 없이 한 번에", "requests": len(rows), "saved": len(reference)},
+        {"run": "1회차 (본문 차단)", "requests": hits1, "saved": len(kept1), "held": held1, "seconds": sec1},
+        {"run": "2회차 (다시 수집)", "requests": hits2, "saved": len(kept2), "held": held2, "seconds": sec2},
+    ])
+    first_blocked = nids[nids.isin(blocked)].groupby(rows['Code']).min()
+    checks = {
+        "1회차: 못 받은 글은 저장하지 않음": not kept1['Link'].map(crawl_state.extract_nid).isin(blocked).any(),
+        "1회차: 워터마크가 못 받은 글을 넘지 않음": all(
+            watermarks.get(code, 0) < nid for code, nid in first_blocked.items()),
+        "2회차: 못 받았던 본문을 받음": held2 == 0 and kept2['Content'].notna().all(),
+        "2회차: 1회차에 받은 본문은 다시 요청하지 않음 (캐시)": hits2 == len(blocked),
+        "두 실행 합계 == 차단 없이 한 번에": saved.sort_values('Link').reset_index(drop=True)
+            .equals(reference.sort_values('Link').reset_index(drop=True)),
+    }
+
+    print(f"종목 {args.stocks}개 x 새 글 {args.posts}건 / 본문 차단 {len(blocked)}건 "
+          f"-> 1회차에 미룬 글 {len(held_links)}건")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+
+    if not all(checks.values()):
+        sys.exit("!! 본문을 못 받은 글이 다음 실행에서 다시 수집되지 않습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+종목별 순차 요청(기존 get_price_data 방식) vs PriceService(묶음 요청 + 캐시) 벤치마크.
+
+가짜 제공자(FakePriceProvider)가 요청당 latency + 종목당 per_ticker 만큼 잠들어서
+실제 API 처럼 "요청 횟수"에 비용이 붙도록 합니다.
+  - legacy : 종목마다 7일 전체 구간을 따로 요청하고 프레임마다 정리
+  - cold   : 빈 캐시에서 묶음 요청
+  - warm   : 1시간 뒤 다시 실행 (빠진 최근 구간만 요청)
+세 결과가 같은 구간에서 같은 값인지도 확인합니다.
+
+    python benchmarks/bench_price_service.py --stocks 80 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import price_service
+from fixtures import FakePriceProvider
+
+
+def legacy_prices(provider, stocks, start, end):
+    all_data = []
+    for stock in stocks:
+        df = provider.fetch([f"{stock['Code']}.KS"], start, end)
+        if not df.empty:
+            df = df.rename(columns={'Ticker': 'Code'})
+            df['Date'] = pd.to_datetime(df['Date'], utc=True)
+            df['Stock'] = stock['Name']
+            df['Code'] = stock['Code']
+            all_data.append(df[price_service.PRICE_COLS])
+    return pd.concat(all_data, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.2, help="요청당 지연(초)")
+    parser.add_argument("--per-ticker", type=float, default=0.005, help="종목당 추가 지연(초)")
+    parser.add_argument("--batch-size", type=int, default=price_service.BATCH_SIZE)
+    args = parser.parse_args()
+
+    stocks = [{'Code': f"{100000 + i * 37:06d}", 'Name': f"종목{i}"} for i in range(args.stocks)]
+    now = pd.Timestamp("2025-12-08 03:30", tz="UTC")
+    later = now + pd.Timedelta("1h")
+    rows = []
+
+    provider = FakePriceProvider(args.latency, args.per_ticker)
+    start, end = price_service.period_range("7d", now)
+    step = price_service.interval_seconds(price_service.INTERVAL)
+    start, end = start // step * step, -(-end // step) * step
+    t0 = time.perf_counter()
+    legacy = legacy_prices(provider, stocks, start, end)
+    rows.append(("legacy", time.perf_counter() - t0, len(provider.calls), len(legacy), True))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = price_service.PriceCache(os.path.join(tmp, "price_cache.sqlite"))
+        with price_service.PriceService(provider, cache, batch_size=args.batch_size) as service:
+            for mode, at in (("cold", now), ("warm(+1h)", later)):
+                provider.calls.clear()
+                t0 = time.perf_counter()
+                df = service.get_prices(stocks, period="7d", now=at)
+                elapsed = time.perf_counter() - t0
+                # 두 결과가 겹치는 구간끼리 비교
+                lo = max(df['Date'].min(), legacy['Date'].min())
+                hi = min(df['Date'].max(), legacy['Date'].max())
+                a = df[df['Date'].between(lo, hi)].reset_index(drop=True)
+                b = legacy[legacy['Date'].between(lo, hi)].reset_index(drop=True)
+                same = a.equals(b.astype(a.dtypes.to_dict()))
+                rows.append((mode, elapsed, len(provider.calls), len(df), same))
+
+    print(f"\n종목 {len(stocks)}개 / 요청당 지연 {args.latency * 1000:.0f}ms + 종목당 {args.per_ticker * 1000:.0f}ms")
+    report = pd.DataFrame(rows, columns=["mode", "seconds", "requests", "rows", "same_as_legacy"])
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+    if not report["same_as_legacy"].all():
+        sys.exit("!! 캐시 결과가 기존 방식 결과와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+rate_control.py 벤치마크: 초당 요청 수 제한이 있는 로컬 스텁 서버(넘으면 429/403/차단 안내 페이지)에서
+  1) 기존 방식 (비동기 고정 동시 요청, 재시도 없음): 차단된 페이지가 몇 장 빠지는지 (완료율 리포트)
+     (빠진 페이지가 있는 종목은 빈틈 없이 받은 글까지만 저장해서 다음 증분 수집에서 다시 받는지도 확인)
+  2) 재시도만 켠 경우: 빠진 페이지를 살리지만 서버에 요청을 얼마나 더 보내는지
+  3) AIMD 속도 조절 + 재시도 (비동기 / 순차): 완료율 100% 이고 제한 없는 서버에서 받은 결과와 같은지
+  4) 기존 순차 수집(고정 0.05초 딜레이) 대비 속도
+를 출력합니다.
+
+    python benchmarks/bench_rate_control.py --stocks 10 --rate-limit 25 --limit-status 429
+    python benchmarks/bench_rate_control.py --limit-status 200 --limit-latency 0.5   # 차단 안내 페이지 + 지연 급증
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import crawl_state
+import data_crawling
+import rate_control
+from bench_async_crawl import make_stock_list
+from stub_server import StubServer
+
+
+def lost_after_watermark(df, reference):
+    """
+    빠진 페이지 때문에 못 받은 글 중, 저장할 글(crawl_state.gap_free_rows)로 올린 워터마크 이하라서
+    다음 증분 수집에서도 못 받게 되는 글 수 (0 이어야 함)
+    """
+    kept, _ = crawl_state.gap_free_rows(df, df.attrs["completeness"])
+    watermarks = crawl_state.update_watermarks({}, kept)
+    missed = reference[~reference["Link"].isin(kept["Link"])]
+    nids = missed["Link"].map(crawl_state.extract_nid).astype("float64")
+    return int((nids <= missed["Code"].map(watermarks).astype("float64").fillna(0)).sum())
+
+
+def run(label, srv, fn, reference=None):
+    srv.reset_hits()
+    t0 = time.perf_counter()
+    df = fn()
+    sec = time.perf_counter() - t0
+    table = df.attrs["completeness"]
+    throttle = df.attrs.get("throttle") or {}
+    pages = int(table["pages"].sum())
+    return {
+        "mode": label, "seconds": sec, "pages/sec": pages / sec, "requests": srv.hits, "limited": srv.limited,
+        "completeness": table["ok"].sum() / pages, "recovered": int(table["recovered"].sum()),
+        "missing": int(table["missing"].sum()), "final_rate": throttle.get("rate"), "cuts": throttle.get("cuts"),
+        "same_as_unlimited": reference is not None and df.equals(reference),
+        "lost": lost_after_watermark(df, reference) if reference is not None and not df.empty else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02, help="응답당 인위적 지연(초)")
+    parser.add_argument("--rate-limit", type=float, default=25, help="서버가 1초에 정상 응답하는 게시판 요청 수")
+    parser.add_argument("--limit-status", type=int, default=429, help="제한을 넘었을 때 응답 (200 = 차단 안내 페이지)")
+    parser.add_argument("--limit-latency", type=float, default=0.0, help="제한을 넘었을 때 더하는 지연(초)")
+    parser.add_argument("--concurrency", type=int, default=data_crawling.CONCURRENCY)
+    parser.add_argument("--skip-sync", action="store_true")
+    args = parser.parse_args()
+
+    stocks = make_stock_list(args.stocks)
+    c = args.concurrency
+
+    def crawl_async(adaptive, attempts):
+        data_crawling.ADAPTIVE_RATE = adaptive
+        return lambda: data_crawling.crawl_kr_community_async(
+            stocks, base_url=base_url, concurrency=c, retry=rate_control.RetryQueue(max_attempts=attempts, seed=0))
+
+    def crawl_sync(adaptive, attempts):
+        data_crawling.ADAPTIVE_RATE = adaptive
+        return lambda: data_crawling.crawl_kr_community(
+            stocks, base_url=base_url, retry=rate_control.RetryQueue(max_attempts=attempts, seed=0))
+
+    with StubServer(latency=args.latency) as srv:
+        base_url = srv.url("/item/board.naver")
+        reference = crawl_async(False, 1)()
+
+    rows = []
+    with StubServer(latency=args.latency, rate_limit=args.rate_limit, limit_status=args.limit_status,
+                    limit_latency=args.limit_latency) as srv:
+        base_url = srv.url("/item/board.naver")
+        rows.append(run(f"async x{c} 고정, 재시도 없음", srv, crawl_async(False, 1), reference))
+        rows.append(run(f"async x{c} 고정 + 재시도", srv, crawl_async(False, rate_control.RETRY_ATTEMPTS), reference))
+        rows.append(run(f"async x{c} AIMD + 재시도", srv, crawl_async(True, rate_control.RETRY_ATTEMPTS), reference))
+        if not args.skip_sync:
+            rows.append(run("sync 고정 0.05초", srv, crawl_sync(False, 1), reference))
+            rows.append(run("sync AIMD + 재시도", srv, crawl_sync(True, rate_control.RETRY_ATTEMPTS), reference))
+    data_crawling.ADAPTIVE_RATE = True
+
+    report = pd.DataFrame(rows)
+    print(f"\n종목 {len(stocks)}개 / 서버 제한 초당 {args.rate_limit:.0f}건 (넘으면 {args.limit_status}"
+          + (f", +{args.limit_latency * 1000:.0f}ms" if args.limit_latency else "") + f") / 지연 {args.latency * 1000:.0f}ms")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+    by_mode = report.set_index("mode")
+    fixed, adaptive = by_mode.iloc[0], by_mode.iloc[2]
+    checks = {
+        "고정 방식: 차단 응답 수 == 누락 페이지 (빠짐없이 리포트)": fixed["limited"] == fixed["missing"],
+        "AIMD: 완료율 100%": adaptive["completeness"] == 1.0,
+        "AIMD: 제한 없는 서버 결과와 같음": bool(adaptive["same_as_unlimited"]),
+        "AIMD: 차단 응답 < 고정 + 재시도": adaptive["limited"] < by_mode.iloc[1]["limited"],
+        "빠진 페이지의 글이 워터마크 뒤로 밀리지 않음 (모든 방식)": (report["lost"] == 0).all(),
+    }
+    if not args.skip_sync:
+        sync_fixed, sync_adaptive = by_mode.iloc[3], by_mode.iloc[4]
+        checks["순차 AIMD: 완료율 100%, 결과 같음"] = sync_adaptive["completeness"] == 1.0 \
+            and bool(sync_adaptive["same_as_unlimited"])
+        checks["비동기 AIMD 가 순차 고정 딜레이보다 빠름"] = adaptive["pages/sec"] > sync_fixed["pages/sec"]
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+
+    if not all(checks.values()):
+        sys.exit("!! 속도 조절/재시도 결과가 기대와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
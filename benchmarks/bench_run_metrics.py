@@ -0,0 +1,112 @@
+"""
+run_metrics.py 확인용 벤치마크.
+
+로컬 스텁 서버에서 일부 게시판 페이지를 차단 안내 페이지(type2 테이블 없음)로 내려주고
+crawl_kr_community_async 를 계측한 뒤
+  1) 종목별 요청 수 / 빈 페이지 수가 서버 기준과 같은지, 파싱 건수가 수집 행 수와 같은지
+  2) JSONL 기록이 한 줄씩 JSON 으로 읽히고 start / empty / stage / summary 가 들어있는지
+  3) 프로파일링 단계의 .prof 파일이 pstats 로 읽히는지
+  4) 계측 호출 하나의 비용(µs)과 수집 시간 대비 비중
+을 출력합니다.
+
+    python benchmarks/bench_run_metrics.py --stocks 10 --blocked 12
+"""
+import argparse
+import json
+import os
+import pstats
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import data_crawling
+import rate_control
+import run_metrics
+from bench_async_crawl import make_stock_list
+from stub_server import StubServer
+
+
+def call_cost(n=200000):
+    """observe_http / record_stage 한 번에 드는 시간 (µs, 파일 기록 없는 정상 응답 기준)"""
+    metrics = run_metrics.RunMetrics("cost", log_dir=None)
+    t0 = time.perf_counter()
+    for i in range(n):
+        metrics.observe_http("005930", 0.03, 200)
+    http_us = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    for i in range(n):
+        metrics.record_stage("parse", 0.001, 20)
+    stage_us = (time.perf_counter() - t0) / n * 1e6
+    return http_us, stage_us
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=10)
+    parser.add_argument("--blocked", type=int, default=12, help="차단 페이지로 응답할 (종목, 페이지) 수")
+    parser.add_argument("--latency", type=float, default=0.02, help="응답당 인위적 지연(초)")
+    parser.add_argument("--concurrency", type=int, default=data_crawling.CONCURRENCY)
+    args = parser.parse_args()
+    # 서버 기준 요청 수와 맞추기 위해 재시도 / 속도 조절은 끔 (bench_rate_control.py 참고)
+    data_crawling.ADAPTIVE_RATE = False
+
+    stocks = make_stock_list(args.stocks)
+    pages = [(s["Code"], p) for s in stocks for p in range(1, data_crawling.get_target_pages(s["Code"]) + 1)]
+    blocked = set(random.Random(0).sample(pages, min(args.blocked, len(pages))))
+    checks = {}
+
+    with tempfile.TemporaryDirectory() as log_dir, \
+            StubServer(latency=args.latency, blocked_pages=blocked) as srv:
+        metrics = run_metrics.start_run("bench_crawl", log_dir=log_dir, profile="crawl_community")
+        t0 = time.perf_counter()
+        with run_metrics.stage("crawl_community") as s:
+            df = data_crawling.crawl_kr_community_async(stocks, base_url=srv.url("/item/board.naver"),
+                                                        concurrency=args.concurrency,
+                                                        retry=rate_control.RetryQueue(max_attempts=1))
+            s["items"] = len(df)
+        crawl_sec = time.perf_counter() - t0
+        run_metrics.finish_run()
+
+        http = metrics.http_table().set_index("stock")
+        expected_empty = pd.Series([c for c, _ in blocked]).value_counts()
+        expected_requests = pd.Series([c for c, _ in pages]).value_counts()
+        checks["종목별 요청 수 == 페이지 수"] = http["requests"].sort_index().equals(
+            expected_requests.sort_index().rename("requests"))
+        checks["종목별 빈 페이지 == 차단 페이지"] = \
+            http["empty"][http["empty"] > 0].sort_index().to_dict() == expected_empty.sort_index().to_dict()
+        checks["파싱 건수 == 수집 행 수"] = metrics.stages["parse"][2] == len(df)
+
+        with open(metrics.path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        kinds = {r["kind"] for r in records}
+        checks["JSONL: start/empty/stage/profile/summary"] = \
+            {"start", "empty", "stage", "profile", "summary"} <= kinds
+        checks["JSONL: 빈 페이지 기록 수 == 차단 페이지"] = \
+            sum(r["kind"] == "empty" for r in records) == len(blocked)
+
+        profiles = [r["path"] for r in records if r["kind"] == "profile"]
+        checks["프로파일 파일이 pstats 로 읽힘"] = bool(profiles) and pstats.Stats(profiles[0]).total_calls > 0
+
+    http_us, stage_us = call_cost()
+    calls = len(pages) * 2   # 페이지마다 observe_http + 파싱 record_stage
+    print(f"\n종목 {len(stocks)}개 / 페이지 {len(pages)}장 (차단 {len(blocked)}장) / 수집 {crawl_sec:.2f}초 "
+          f"(프로파일링 포함)")
+    print(f"   - 계측 호출 비용: observe_http {http_us:.2f}µs / record_stage {stage_us:.2f}µs "
+          f"-> 이번 수집 {calls}회 {calls * max(http_us, stage_us) / 1e6 * 1000:.2f}ms "
+          f"({calls * max(http_us, stage_us) / 1e6 / crawl_sec:.3%})")
+    print(f"   - JSONL {len(records)}줄: " + ", ".join(f"{k} {sum(r['kind'] == k for r in records)}"
+                                               for k in sorted(kinds)))
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+
+    if not all(checks.values()):
+        sys.exit("!! 계측 결과가 서버 기준과 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
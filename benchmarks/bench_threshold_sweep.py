@@ -0,0 +1,135 @@
+"""
+threshold_sweep 벤치마크 + 기존 루프와의 일치 검증.
+
+합성 daily_stats / daily_price 로
+  1) 기존 17개 기준값에서 기존 루프(기준값마다 필터 -> merge)와 곡선이 완전히 같은지
+  2) 종목별 스윕이 종목별 기존 루프와 같은지
+  3) 기준값 수를 늘렸을 때 두 방식의 실행 시간
+을 확인합니다.
+
+    python benchmarks/bench_threshold_sweep.py --stocks 80 --days 250
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import threshold_sweep
+
+
+def make_data(n_stocks, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = [f"{i * 37:06d}" for i in range(n_stocks)]
+    dates = pd.date_range("2025-01-01", periods=n_days, freq="D").date
+
+    stats = pd.DataFrame({
+        'Analysis_Date': np.tile(dates, n_stocks),
+        'Code': np.repeat(codes, n_days),
+    })
+    stats['Stock'] = "종목" + stats['Code']
+    stats['Type'] = 'Domestic'
+    pos = rng.integers(0, 12, len(stats))
+    neg = rng.integers(0, 12, len(stats))
+    total = pos + neg
+    stats['Positive_Ratio'] = np.where(total > 0, pos / np.maximum(total, 1), 0.0)
+    # 글이 없는 날 일부 제거
+    stats = stats[rng.random(len(stats)) > 0.1].reset_index(drop=True)
+
+    price = pd.DataFrame({
+        'Code': np.repeat(codes, n_days),
+        'Price_Date': np.tile(dates, n_stocks),
+        'Close': rng.normal(100, 5, n_stocks * n_days).round(1),
+    })
+    price['Prev_Close'] = price.groupby('Code')['Close'].shift(1)
+    price['Is_Price_Up'] = price['Close'] > price['Prev_Close']
+    price = price.dropna(subset=['Prev_Close'])
+    price = price[rng.random(len(price)) > 0.3].reset_index(drop=True)  # 휴장일
+    return stats, price
+
+
+def legacy_loop(daily_stats, daily_price, thresholds):
+    # accuracy_modeling.py 의 기존 탐색 루프 그대로
+    rows = []
+    for th in thresholds:
+        th = round(th, 2)
+        recs = daily_stats[daily_stats['Positive_Ratio'] > th].copy()
+        if len(recs) == 0: continue
+        merged = pd.merge(
+            recs, daily_price,
+            left_on=['Code', 'Analysis_Date'], right_on=['Code', 'Price_Date'],
+            how='inner'
+        )
+        count = len(merged)
+        if count == 0: continue
+        success_count = merged['Is_Price_Up'].sum()
+        accuracy = success_count / count
+        score = accuracy * np.log10(count)
+        rows.append((th, count, success_count, accuracy, score))
+    return pd.DataFrame(rows, columns=['threshold', 'count', 'success', 'accuracy', 'score'])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=80)
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[17, 100, 1000])
+    parser.add_argument("--legacy-max", type=int, default=100, help="기존 루프는 이 개수까지만 실행")
+    args = parser.parse_args()
+
+    daily_stats, daily_price = make_data(args.stocks, args.days)
+    print(f"daily_stats {len(daily_stats)}행 / daily_price {len(daily_price)}행")
+
+    # 1) 기존 기준값 17개에서 완전 일치 확인
+    thresholds = threshold_sweep.default_thresholds()
+    legacy = legacy_loop(daily_stats, daily_price, np.arange(0.1, 0.95, 0.05))
+    merged = threshold_sweep.join_signals(daily_stats, daily_price)
+    curve = threshold_sweep.sweep_thresholds(merged, thresholds)
+    same = (
+        np.array_equal(legacy['threshold'].to_numpy(), curve['threshold'].to_numpy())
+        and np.array_equal(legacy['count'].to_numpy(), curve['count'].to_numpy())
+        and np.array_equal(legacy['success'].to_numpy(), curve['success'].to_numpy())
+        and np.array_equal(legacy['score'].to_numpy(), curve['score'].to_numpy())
+    )
+    print(f"기존 루프와 곡선 일치: {same}")
+
+    # 2) 종목별 스윕 확인
+    by_stock = threshold_sweep.sweep_thresholds_by_stock(merged, thresholds)
+    ok_stock = True
+    for code, grp in list(daily_stats.groupby('Code'))[:10]:
+        ref = legacy_loop(grp, daily_price, np.arange(0.1, 0.95, 0.05))
+        got = by_stock[by_stock['Code'] == code]
+        ok_stock &= np.array_equal(ref['count'].to_numpy(), got['count'].to_numpy())
+        ok_stock &= np.array_equal(ref['success'].to_numpy(), got['success'].to_numpy())
+    print(f"종목별 스윕 일치 (10종목): {ok_stock}")
+
+    # 3) 실행 시간
+    rows = []
+    for n in args.sizes:
+        ths = np.round(np.linspace(0.05, 0.95, n), 6)
+        t0 = time.perf_counter()
+        m = threshold_sweep.join_signals(daily_stats, daily_price)
+        threshold_sweep.sweep_thresholds(m, ths)
+        threshold_sweep.sweep_thresholds_by_stock(m, ths)
+        fast = time.perf_counter() - t0
+
+        slow = np.nan
+        if n <= args.legacy_max:
+            t0 = time.perf_counter()
+            legacy_loop(daily_stats, daily_price, ths)
+            slow = time.perf_counter() - t0
+        rows.append((n, slow, fast))
+
+    report = pd.DataFrame(rows, columns=["thresholds", "legacy_loop_sec", "sweep_engine_sec(+by_stock)"])
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    if not (same and ok_stock):
+        sys.exit("!! 스윕 결과가 기존 루프와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
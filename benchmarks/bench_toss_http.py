@@ -0,0 +1,89 @@
+"""
+토스 커뮤니티 수집: HTTP 모드(crawl_toss_community_http) vs 브라우저 모드(crawl_toss_community_parallel).
+
+로컬 스텁 서버가 대부분 서버 렌더링된 글 페이지(일부는 스크립트로만 그림, fixtures.toss_is_ssr)를
+내려주고, 두 방식의 posts/sec, CPU 시간, 브라우저 대체 비율을 비교합니다.
+CPU 시간은 이 프로세스(스텁 서버 스레드 포함) + 끝난 자식 프로세스(chromedriver/크롬) 합계입니다.
+결과가 toss_crawled.csv 와 같은 컬럼이고 본문이 기대값(fixtures.toss_expected_content) 및
+브라우저 모드 결과와 같은지 확인합니다.
+
+크롬이 없으면 --no-browser 로 HTTP 추출만 잽니다 (대체가 필요한 글은 빠지고 나머지만 비교).
+
+    python benchmarks/bench_toss_http.py --stocks 8 --posts 30
+    python benchmarks/bench_toss_http.py --stocks 80 --posts 30 --no-browser
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import fixtures
+import toss_crawl
+from bench_toss_pool import expected_frame, make_stock_list
+from stub_server import StubServer
+
+CSV_COLUMNS = ["StockCode", "StockName", "PostURL", "Content"]   # toss_crawled.csv
+
+
+def cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def measure(fn):
+    t0, c0 = time.perf_counter(), cpu_seconds()
+    df = fn()
+    return df, time.perf_counter() - t0, cpu_seconds() - c0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=30, help="종목당 글 수")
+    parser.add_argument("--concurrency", type=int, default=toss_crawl.HTTP_CONCURRENCY)
+    parser.add_argument("--workers", type=int, default=toss_crawl.WORKERS)
+    parser.add_argument("--latency", type=float, default=0.02, help="응답당 인위적 지연(초)")
+    parser.add_argument("--no-browser", action="store_true", help="크롬 없이 HTTP 추출만")
+    args = parser.parse_args()
+
+    stocks = make_stock_list(args.stocks)
+
+    with StubServer(latency=args.latency, toss_posts=args.posts, toss_ssr=True) as srv:
+        base_url = srv.url()
+        expected = expected_frame(stocks, args.posts, base_url)
+        rows, checks = [], {}
+
+        stats = {}
+        http, sec, cpu = measure(lambda: toss_crawl.crawl_toss_community_http(
+            stocks, max_posts_per_stock=args.posts, concurrency=args.concurrency, fallback=not args.no_browser,
+            workers=args.workers, base_url=base_url, stats=stats))
+        rows.append(("http", len(http), sec, len(http) / sec, cpu, stats["fallback_rate"]))
+
+        if args.no_browser:
+            ssr = expected["PostURL"].str.rsplit("/", n=1).str[-1].astype(int).map(fixtures.toss_is_ssr)
+            checks["http == 기대값 (서버 렌더링 글)"] = http.equals(expected[ssr].reset_index(drop=True))
+        else:
+            checks["http == 기대값"] = http.equals(expected)
+            browser, sec, cpu = measure(lambda: toss_crawl.crawl_toss_community_parallel(
+                stocks, max_posts_per_stock=args.posts, workers=args.workers, base_url=base_url))
+            rows.append(("browser", len(browser), sec, len(browser) / sec, cpu, 1.0))
+            checks["http == browser"] = http.equals(browser)
+        checks["컬럼 == toss_crawled.csv"] = list(http.columns) == CSV_COLUMNS
+
+    print(f"\n종목 {len(stocks)}개 / 종목당 글 {args.posts}건 / 지연 {args.latency * 1000:.0f}ms")
+    report = pd.DataFrame(rows, columns=["mode", "posts", "seconds", "posts/sec", "cpu_seconds", "browser_rate"])
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    toss_crawl.print_http_stats(stats)
+    for name, ok in checks.items():
+        print(f"  {name}: {ok}")
+
+    if not all(checks.values()):
+        sys.exit("!! HTTP 모드 결과가 기대값/브라우저 모드와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
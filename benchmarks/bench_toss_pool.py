@@ -0,0 +1,87 @@
+"""
+토스 커뮤니티 크롤링: crawl_toss_community (크롬 하나, 페이지마다 1초 고정 대기) vs
+crawl_toss_community_parallel (드라이버 풀 + 콘텐츠 요소 대기) 벤치마크.
+
+로컬 스텁 서버가 토스처럼 스크립트로 늦게 그려지는 목록/글 페이지(fixtures.toss_*)를 내려주고,
+두 방식의 수집 시간 / pages/sec / 크롬 실행·교체 횟수를 비교합니다.
+결과 DataFrame 이 순차 수집과 같은지, 본문이 fixtures.toss_expected_content 와 같은지도 확인합니다.
+크롬과 chromedriver 가 설치되어 있어야 합니다.
+
+    python benchmarks/bench_toss_pool.py --stocks 4 --posts 10 --workers 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import fixtures
+import toss_crawl
+from stub_server import StubServer
+
+
+def make_stock_list(n):
+    codes = ['005930', '000660'] + [f"{100000 + i * 37:06d}" for i in range(n)]
+    return [{'Code': c, 'Name': f"종목{c}"} for c in codes[:n]]
+
+
+def expected_frame(stocks, n_posts, base_url):
+    rows = [{
+        "StockCode": s["Code"],
+        "StockName": s["Name"],
+        "PostURL": f"{base_url}/community/posts/{pid}",
+        "Content": fixtures.toss_expected_content(pid),
+    } for s in stocks for pid in fixtures.toss_post_ids(s["Code"], n_posts)]
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=10, help="종목당 글 수")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--recycle-after", type=int, default=10)
+    parser.add_argument("--render-delay", type=int, default=fixtures.TOSS_RENDER_DELAY_MS, help="렌더링 지연(ms)")
+    parser.add_argument("--latency", type=float, default=0.02, help="응답당 인위적 지연(초)")
+    parser.add_argument("--skip-sync", action="store_true")
+    args = parser.parse_args()
+
+    stocks = make_stock_list(args.stocks)
+    n_pages = args.stocks * (1 + args.posts)
+
+    with StubServer(latency=args.latency, render_delay_ms=args.render_delay, toss_posts=args.posts) as srv:
+        base_url = srv.url()
+        expected = expected_frame(stocks, args.posts, base_url)
+        rows = []
+
+        if not args.skip_sync:
+            t0 = time.perf_counter()
+            df = toss_crawl.crawl_toss_community(stocks, max_posts_per_stock=args.posts, base_url=base_url)
+            elapsed = time.perf_counter() - t0
+            rows.append(("sequential", 1, elapsed, n_pages / elapsed, 1, 0, len(df), df.equals(expected)))
+
+        for w in args.workers:
+            stats = {}
+            t0 = time.perf_counter()
+            df = toss_crawl.crawl_toss_community_parallel(stocks, max_posts_per_stock=args.posts, workers=w,
+                                                          recycle_after=args.recycle_after, base_url=base_url,
+                                                          stats=stats)
+            elapsed = time.perf_counter() - t0
+            rows.append(("pool", w, elapsed, n_pages / elapsed, stats["started"], stats["recycled"],
+                         len(df), df.equals(expected)))
+
+    print(f"\n종목 {len(stocks)}개 / 페이지 {n_pages}장 / 렌더링 {args.render_delay}ms / "
+          f"교체 주기 {args.recycle_after}페이지")
+    report = pd.DataFrame(rows, columns=["mode", "workers", "seconds", "pages/sec", "drivers", "recycled",
+                                         "rows", "same_as_expected"])
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+    if not report["same_as_expected"].all():
+        sys.exit("!! 수집 결과가 기대값(순차 수집과 같은 행/본문)과 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
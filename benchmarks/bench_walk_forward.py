@@ -0,0 +1,136 @@
+"""
+walk_forward 백테스트 벤치마크.
+
+합성 데이터(종목 N개 x 1년치 장중 시간봉 + 일별 Positive_Ratio)로
+  - 전체 그리드(horizon x 구간 x 기준값, 전체/종목별) 계산 시간을 재고
+  - 작은 부분집합에서 구간/기준값마다 DataFrame 을 거르는 단순 루프 구현과 결과를 비교합니다.
+
+    python benchmarks/bench_walk_forward.py --stocks 80 --days 365
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import walk_forward as wf
+import threshold_sweep
+
+
+def make_data(n_stocks, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2025-01-01", periods=n_days, freq="D")
+    trading = days[days.dayofweek < 5]
+    # 장중 시간봉 09~15시 KST = 00~06시 UTC
+    bars = (trading.tz_localize("UTC").repeat(7) + pd.to_timedelta(np.tile(np.arange(7), len(trading)), unit="h"))
+    codes = [f"{100000 + i * 37:06d}" for i in range(n_stocks)]
+
+    steps = rng.normal(0, 0.004, size=(n_stocks, len(bars)))
+    close = 10000 * np.exp(np.cumsum(steps, axis=1))
+    prices = pd.DataFrame({
+        'Date': np.tile(bars, n_stocks),
+        'Code': np.repeat(codes, len(bars)),
+        'Close': close.ravel().round(0),
+    })
+
+    # 다음날 수익률과 약간 상관된 긍정 비율
+    daily_ret = np.zeros((n_stocks, len(days)))
+    day_pos = np.searchsorted(days, trading)
+    day_close = close[:, 6::7]
+    nxt = np.zeros_like(day_close)
+    nxt[:, :-1] = day_close[:, 1:] / day_close[:, :-1] - 1
+    daily_ret[:, day_pos] = nxt
+    ratio = 1 / (1 + np.exp(-(rng.normal(0, 1, size=daily_ret.shape) + daily_ret * 80)))
+    signals = pd.DataFrame({
+        'Analysis_Date': np.tile(days.date, n_stocks),
+        'Code': np.repeat(codes, len(days)),
+        'Positive_Ratio': ratio.ravel().round(4),
+    })
+    return signals, prices
+
+
+def naive_walk_forward(events, horizon, thresholds, train_days, test_days, min_train_count):
+    """구간마다 학습 행을 거르고 기준값마다 다시 거르는 단순 구현 (전체 그룹)"""
+    day = 86400
+    ret_col, exit_col = f'ret_{horizon}', f'exit_ts_{horizon}'
+    ev = events.dropna(subset=[ret_col])
+    known = ev[exit_col] + 3600
+    starts = wf._window_starts(events['day_ts'].to_numpy(), train_days, test_days)
+    score_fn = threshold_sweep.SCORE_FUNCTIONS['accuracy_log_count']
+    out = []
+    for t0 in starts:
+        train = ev[(known > t0 - train_days * day) & (known <= t0)]
+        best, best_score = np.nan, -np.inf
+        for th in thresholds:
+            sel = train[train['Positive_Ratio'] > th]
+            if len(sel) < max(min_train_count, 1):
+                continue
+            s = score_fn((sel[ret_col] > 0).mean(), len(sel))
+            if np.isfinite(s) and s > best_score:
+                best, best_score = th, s
+        test = ev[(ev['day_ts'] >= t0) & (ev['day_ts'] < t0 + test_days * day)]
+        rec = test[test['Positive_Ratio'] > best]
+        out.append((best, len(rec), int((rec[ret_col] > 0).sum())))
+    return pd.DataFrame(out, columns=['threshold', 'test_count', 'test_success'])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=80)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--train-days", type=int, default=wf.TRAIN_DAYS)
+    parser.add_argument("--test-days", type=int, default=wf.TEST_DAYS)
+    parser.add_argument("--step", type=float, default=0.01, help="기준값 간격")
+    args = parser.parse_args()
+
+    signals, prices = make_data(args.stocks, args.days)
+    thresholds = np.round(np.arange(0.1, 0.95, args.step), 4)
+
+    t0 = time.perf_counter()
+    events = wf.forward_returns(signals, prices)
+    t_events = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    folds, summary = wf.walk_forward(events, thresholds=thresholds,
+                                     train_days=args.train_days, test_days=args.test_days)
+    t_all = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    folds_stock, _ = wf.walk_forward(events, thresholds=thresholds, per_stock=True,
+                                     train_days=args.train_days, test_days=args.test_days)
+    t_stock = time.perf_counter() - t0
+
+    n_win = folds['test_start'].nunique()
+    print(f"\n종목 {args.stocks}개 / {args.days}일 / 시간봉 {len(prices):,}개 / 신호 {len(signals):,}개")
+    print(f"horizon {len(wf.HORIZONS)}개 x 구간 {n_win}개 x 기준값 {len(thresholds)}개")
+    print(f"  forward_returns        {t_events:.2f}s")
+    print(f"  walk_forward (전체)     {t_all:.2f}s")
+    print(f"  walk_forward (종목별)   {t_stock:.2f}s  ({len(folds_stock):,} 행)")
+    print("\n[표본 외 요약]")
+    print(summary.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    # 작은 부분집합에서 단순 루프와 비교
+    small = events[events['Code'].isin(events['Code'].unique()[:10])]
+    small_folds, _ = wf.walk_forward(small, thresholds=thresholds,
+                                     train_days=args.train_days, test_days=args.test_days)
+    ok = True
+    t0 = time.perf_counter()
+    for h in wf.HORIZONS:
+        ref = naive_walk_forward(small, h, thresholds, args.train_days, args.test_days, wf.MIN_TRAIN_COUNT)
+        got = small_folds[small_folds['horizon'] == h].reset_index(drop=True)
+        same = (np.allclose(got['threshold'], ref['threshold'], equal_nan=True)
+                and (got['test_count'].to_numpy() == ref['test_count'].to_numpy()).all()
+                and (got['test_success'].to_numpy() == ref['test_success'].to_numpy()).all())
+        ok &= bool(same)
+    t_naive = time.perf_counter() - t0
+    print(f"\n단순 루프(종목 10개) {t_naive:.2f}s / 결과 일치: {ok}")
+    if not ok:
+        sys.exit("!! 벡터화 결과가 단순 루프 결과와 다릅니다.")
+
+
+if __name__ == "__main__":
+    main()
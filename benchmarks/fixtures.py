@@ -0,0 +1,502 @@
+"""
+벤치마크용 네이버 종목토론실 HTML 픽스처.
+
+실제 board.naver 목록 페이지와 동일한 마크업 구조(table.type2, onmouseover 행,
+td.title 링크, 조회/공감/비공감 열)를 (종목코드, 페이지) 별로 결정적으로 생성합니다.
+네트워크 없이 같은 입력이면 항상 같은 페이지가 나오므로 결과 비교가 가능합니다.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from html import escape
+
+POSTS_PER_PAGE = 20
+BASE_TIME = datetime(2025, 12, 8, 15, 30)
+BASE_NID = 320000000
+
+TITLE_WORDS = [
+    "오늘", "내일", "상한가", "하한가", "매수", "매도", "존버", "손절", "익절", "외인",
+    "기관", "실적", "배당", "공매도", "반등", "폭락", "급등", "가즈아", "물타기", "눌림목",
+    "HBM", "파운드리", "목표가", "컨센", "수급", "개미", "세력", "거래량", "신고가", "저점",
+]
+
+
+def _seed(*parts):
+    return int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def head_nid(code):
+    # 종목마다 다른 최신 글 번호
+    return BASE_NID + _seed(code) % 1000000
+
+
+def post_nid(code, page, idx, head=None):
+    head = head_nid(code) if head is None else head
+    return head - ((page - 1) * POSTS_PER_PAGE + idx)
+
+
+def make_title(nid):
+    s = _seed("title", nid)
+    n = 2 + s % 5
+    words = [TITLE_WORDS[(s >> (i * 3)) % len(TITLE_WORDS)] for i in range(n)]
+    return " ".join(words)
+
+
+def make_post_meta(code, nid, head=None):
+    head = head_nid(code) if head is None else head
+    s = _seed("meta", nid)
+    # 최신 글일수록 최근 시간 (글 하나당 약 3분 간격)
+    dt = BASE_TIME - timedelta(minutes=3 * (head - nid))
+    return {
+        "nid": nid,
+        "date": dt.strftime("%Y.%m.%d %H:%M"),
+        "title": make_title(nid),
+        "views": 10 + s % 900,
+        "good": s % 13,
+        "bad": (s >> 4) % 7,
+        "comments": (s >> 8) % 5,
+    }
+
+
+def board_row_html(code, meta):
+    comment = f' <span class="tah p9">[{meta["comments"]}]</span>' if meta["comments"] else ""
+    return f"""
+<tr onMouseOver="mouseOver(this)" onMouseOut="mouseOut(this)">
+<td><span class="tah p10 gray03">{meta["date"]}</span></td>
+<td class="title">
+<a href="/item/board_read.naver?code={code}&amp;nid={meta["nid"]}&amp;st=&amp;sw=&amp;page=1" title="{meta["title"]}">{meta["title"]}</a>{comment}
+</td>
+<td class="p11"><span class="gray03">user{meta["nid"] % 10000:04d}****</span></td>
+<td><span class="tah p10 gray03">{meta["views"]}</span></td>
+<td><strong class="tah p10 red01">{meta["good"]}</strong></td>
+<td><strong class="tah p10 blue01">{meta["bad"]}</strong></td>
+</tr>
+<tr><td colspan="6" class="blank_07"></td></tr>"""
+
+
+def board_page_html(code, page, head=None, total_pages=None):
+    """
+    목록 페이지 한 장. total_pages 를 넘는 페이지는 빈 테이블을 돌려줍니다.
+    """
+    head = head_nid(code) if head is None else head
+    rows = []
+    if total_pages is None or page <= total_pages:
+        for i in range(POSTS_PER_PAGE):
+            nid = post_nid(code, page, i, head)
+            if nid <= 0:
+                break
+            rows.append(board_row_html(code, make_post_meta(code, nid, head)))
+
+    return f"""<html lang="ko">
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">
+<title>종목토론실 : 네이버페이 증권</title>
+<script type="text/javascript" src="https://ssl.pstatic.net/imgstock/static.pc/js/board.js"></script>
+</head>
+<body>
+<div id="wrap">
+<div id="header"><div class="gnb_area"><a href="/">네이버페이 증권</a></div></div>
+<div id="content">
+<div class="section inner_sub">
+<h4 class="h_sub sub_tit7"><span>종목토론실</span></h4>
+<table summary="종목토론 게시판 리스트" class="type2">
+<caption>종목토론실 게시판</caption>
+<colgroup><col width="120"><col><col width="100"><col width="60"><col width="60"><col width="60"></colgroup>
+<thead>
+<tr><th scope="col">날짜</th><th scope="col">제목</th><th scope="col">글쓴이</th><th scope="col">조회</th><th scope="col">공감</th><th scope="col">비공감</th></tr>
+</thead>
+<tbody>
+<tr><td colspan="6" class="blank_08"></td></tr>{"".join(rows)}
+</tbody>
+</table>
+<table summary="페이지 네비게이션 리스트" class="Nnavi" align="center">
+<tr><td class="on"><a href="/item/board.naver?code={code}&amp;page={page}">{page}</a></td></tr>
+</table>
+</div>
+</div>
+<div id="footer"><p>네이버페이 증권에서 제공하는 콘텐츠는 투자 참고용입니다.</p></div>
+</div>
+</body>
+</html>"""
+
+
+BODY_SENTENCES = [
+    "오늘 외국인 순매수가 크게 들어왔습니다.",
+    "실적 발표 전까지는 관망하는 게 맞다고 봅니다.",
+    "HBM 수요가 생각보다 강하네요.",
+    "공매도 잔고가 계속 늘고 있어서 걱정입니다.",
+    "목표가 상향 리포트가 나왔습니다.",
+    "거래량 없는 반등은 믿기 어렵습니다.",
+    "배당 기준일 전에 들어갈 생각입니다.",
+    "손절 라인은 지키면서 대응하세요.",
+]
+
+
+def post_body_text(nid):
+    s = _seed("body", nid)
+    n = 1 + s % 6
+    return [BODY_SENTENCES[(s >> (i * 3)) % len(BODY_SENTENCES)] for i in range(n)]
+
+
+def post_page_html(code, nid):
+    """
+    게시글 상세 페이지. nid 에 따라 본문 마크업이 달라집니다.
+      0: 스마트에디터(se-main-container) / 1: 구형 div#body (+script)
+      2: 구형 scr01 / 3: 본문 없음(이미지 글 등)
+    """
+    meta = make_post_meta(code, nid)
+    sentences = post_body_text(nid)
+    kind = nid % 4
+
+    if kind == 0:
+        paragraphs = "".join(
+            f'<div class="se-component se-text"><p class="se-text-paragraph"><span>{t}</span></p></div>'
+            for t in sentences
+        )
+        body = f'<div class="se-main-container">{paragraphs}</div>'
+    elif kind == 1:
+        body = (
+            '<div id="body" class="view_se">'
+            + "<br>".join(sentences)
+            + '<script type="text/javascript">var _ad = "광고";</script>'
+            + "<style>.view_se{color:#333}</style>"
+            + "</div>"
+        )
+    elif kind == 2:
+        body = '<div class="scr01">' + "".join(f"<p>{t}&nbsp;</p>" for t in sentences) + "</div>"
+    else:
+        body = '<div class="view_img"><img src="https://ssl.pstatic.net/static/img.png" alt=""></div>'
+
+    return f"""<html lang="ko">
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">
+<title>{meta["title"]} : 네이버페이 증권</title>
+</head>
+<body>
+<div id="wrap">
+<div id="content">
+<table class="view" summary="게시판 글 상세 내용">
+<tr><th><strong class="c p15">{meta["title"]}</strong></th></tr>
+<tr><td><span class="gray03 p9 tah">{meta["date"]}</span> 조회 <span class="tah p11">{meta["views"]}</span></td></tr>
+<tr><td class="view_se">
+<!-- 본문 시작 -->
+{body}
+<!-- 본문 끝 -->
+</td></tr>
+</table>
+<ul class="comment_list"><li>댓글 영역</li></ul>
+</div>
+</div>
+</body>
+</html>"""
+
+
+BLOCKED_PAGE_HTML = """<html lang="ko">
+<head><meta http-equiv="Content-Type" content="text/html; charset=euc-kr"><title>네이버페이 증권</title></head>
+<body>
+<div id="wrap"><div class="error_content">
+<h2>서비스 이용이 제한되었습니다.</h2>
+<p>과도한 접근 요청으로 서비스 이용이 일시적으로 제한되었습니다. 잠시 후 다시 이용해 주세요.</p>
+</div></div>
+</body>
+</html>"""
+
+
+def save_html_fixtures(dirpath, codes=("005930", "000660", "035720"), pages=2):
+    """저장용 HTML 픽스처 파일을 실제 응답과 같은 EUC-KR 바이트로 씁니다."""
+    import os
+
+    os.makedirs(dirpath, exist_ok=True)
+
+    def write(name, html):
+        with open(os.path.join(dirpath, name), "wb") as f:
+            f.write(html.encode("euc-kr", errors="replace"))
+
+    for code in codes:
+        for page in range(1, pages + 1):
+            write(f"board_{code}_p{page}.html", board_page_html(code, page))
+    write("board_blocked.html", BLOCKED_PAGE_HTML)
+    write("post_blocked.html", BLOCKED_PAGE_HTML)   # 200 으로 온 차단 안내 페이지 -> 본문 None
+
+    code = codes[0]
+    for i in range(8):
+        nid = post_nid(code, 1, i)
+        write(f"post_{code}_{nid}.html", post_page_html(code, nid))
+
+
+# ==========================================
+# 가짜 주가 제공자 (price_service 용)
+# ==========================================
+KRX_BAR_HOURS_UTC = range(0, 7)   # 09:00~15:00 KST 시작 시간봉 (UTC 00~06시)
+
+
+def price_bar(code, ts):
+    """(종목, 시각) 마다 항상 같은 시간봉 값"""
+    s = _seed("price", code, ts)
+    base = 10000 + _seed("base", code) % 90000
+    drift = (ts // 3600) % 97 - 48
+    close = base + drift * 10 + s % 200
+    open_ = close - 100 + (s >> 8) % 200
+    return open_, max(open_, close) + (s >> 16) % 50, min(open_, close) - (s >> 20) % 50, close, (s >> 4) % 1000000
+
+
+class FakePriceProvider:
+    """PriceService 에 끼워 쓰는 로컬 제공자
+
+    평일 장중 시간봉만 결정적으로 만들어 돌려주고, 요청마다 latency + 종목당 per_ticker
+    만큼 잠들어서 실제 API 처럼 요청 횟수에 비례한 비용을 흉내냅니다. calls 에 요청 기록."""
+
+    def __init__(self, latency=0.0, per_ticker=0.0, missing=()):
+        self.latency = latency
+        self.per_ticker = per_ticker
+        self.missing = set(missing)
+        self.calls = []
+
+    def bars(self, ticker, start, end):
+        import pandas as pd
+
+        hours = pd.date_range(pd.Timestamp(start, unit="s", tz="UTC").ceil("h"),
+                              pd.Timestamp(end, unit="s", tz="UTC"), freq="h", inclusive="left")
+        hours = hours[hours.hour.isin(KRX_BAR_HOURS_UTC) & (hours.dayofweek < 5)]
+        code = ticker.split(".")[0]
+        rows = [(t, ticker) + price_bar(code, int(t.timestamp())) for t in hours]
+        return pd.DataFrame(rows, columns=['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume'])
+
+    def fetch(self, tickers, start, end, interval="1h"):
+        import time
+        import pandas as pd
+
+        self.calls.append((tuple(tickers), start, end))
+        time.sleep(self.latency + self.per_ticker * len(tickers))
+        frames = [self.bars(t, start, end) for t in tickers if t not in self.missing]
+        if not frames:
+            return pd.DataFrame(columns=['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        return pd.concat(frames, ignore_index=True)
+
+
+# ==========================================
+# 작은 감성 분류 모델 (ONNX 백엔드 비교용)
+# ==========================================
+SENTIMENT_LABELS = ("negative", "neutral", "positive")
+
+
+def make_tiny_sentiment_model(dirpath, n_titles=2000, hidden=64, layers=2, seed=0):
+    """KR-FinBert-SC 와 같은 구조(BertForSequenceClassification, 3 라벨)의 작은 모델을 만들어 저장.
+
+    학습은 하지 않은 무작위 가중치지만 구조/토크나이저/라벨 설정이 같아서
+    내보내기, 양자화, 라벨 일치율 비교를 네트워크 없이 확인할 수 있습니다.
+    토크나이저는 make_title 제목들로 WordPiece 어휘를 만들어 씁니다."""
+    import os
+
+    import torch
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors, trainers
+    from transformers import BertConfig, BertForSequenceClassification, PreTrainedTokenizerFast
+
+    os.makedirs(dirpath, exist_ok=True)
+    special = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    tok = Tokenizer(models.WordPiece(unk_token="[UNK]"))
+    tok.normalizer = normalizers.BertNormalizer(lowercase=False)
+    tok.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    titles = [make_title(BASE_NID + i) for i in range(n_titles)]
+    tok.train_from_iterator(titles, trainers.WordPieceTrainer(vocab_size=500, special_tokens=special))
+    cls_id, sep_id = tok.token_to_id("[CLS]"), tok.token_to_id("[SEP]")
+    tok.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", pair="[CLS] $A [SEP] $B:1 [SEP]:1",
+        special_tokens=[("[CLS]", cls_id), ("[SEP]", sep_id)],
+    )
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tok, model_max_length=128, pad_token="[PAD]", unk_token="[UNK]",
+        cls_token="[CLS]", sep_token="[SEP]", mask_token="[MASK]",
+    )
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(tokenizer), hidden_size=hidden, num_hidden_layers=layers,
+        num_attention_heads=4, intermediate_size=hidden * 4, max_position_embeddings=128,
+        # 무작위 가중치라도 라벨이 한쪽으로 쏠리지 않고 점수가 갈리도록 조금 크게 초기화
+        initializer_range=0.2,
+        id2label=dict(enumerate(SENTIMENT_LABELS)),
+        label2id={label: i for i, label in enumerate(SENTIMENT_LABELS)},
+    )
+    model = BertForSequenceClassification(config).eval()
+    model.save_pretrained(dirpath)
+    tokenizer.save_pretrained(dirpath)
+    return dirpath
+
+
+# ==========================================
+# 토스증권 커뮤니티 페이지 (Toss_Crawling_version 용)
+# ==========================================
+TOSS_BASE_ID = 171700000
+TOSS_POSTS_PER_STOCK = 30
+TOSS_RENDER_DELAY_MS = 150   # 클라이언트 렌더링에 걸리는 시간 흉내
+
+
+def toss_post_ids(code, n=TOSS_POSTS_PER_STOCK):
+    # 종목마다 겹치지 않는 글 번호 (최신 글부터)
+    head = TOSS_BASE_ID + (_seed("toss", code) % 9000) * 100
+    return [head + 99 - i for i in range(n)]
+
+
+def toss_post(post_id):
+    s = _seed("toss-post", post_id)
+    n_comments = (s >> 9) % 4
+    return {
+        "postId": post_id,
+        "author": f"토스개미{s % 1000:03d}",
+        "content": "\n".join(post_body_text(post_id)),
+        "likeCount": 1 + s % 40,
+        "commentCount": n_comments,
+        "comments": [
+            {"author": f"주린이{(s >> (i + 3)) % 100:02d}",
+             "ago": f"{1 + (s >> (i * 4)) % 23}시간 전",
+             "content": BODY_SENTENCES[(s >> (i * 5)) % len(BODY_SENTENCES)]}
+            for i in range(n_comments)
+        ],
+    }
+
+
+def _toss_post_url(post_id):
+    return f"/community/posts/{post_id}?from=community"
+
+
+def toss_list_markup(posts):
+    link = lambda p: f'<li><a href="{_toss_post_url(p["postId"])}">{escape(p["title"])}</a></li>'
+    hot = f'<section class="hot"><ul>{link(posts[0])}</ul></section>' if posts else ""
+    return hot + '<section class="feed"><ul>' + "".join(link(p) for p in posts) + "</ul></section>"
+
+
+def toss_post_markup(post):
+    body = "".join(f"<p>{escape(line)}</p>" for line in post["content"].split("\n"))
+    comments = "".join(
+        f'<li><span>{escape(c["author"])}</span><span>{escape(c["ago"])}</span><p>{escape(c["content"])}</p></li>'
+        for c in post["comments"]
+    )
+    return (f'<article><header><span>{escape(post["author"])}</span><button>팔로우</button></header>'
+            f'<div class="post-content" data-post-id="{post["postId"]}">{body}</div>'
+            f'<footer><span>{post["likeCount"]}</span><span>{post["commentCount"]}</span></footer></article>'
+            f'<section class="comments"><ul>{comments}</ul></section>'
+            '<a href="/community">인기글 더보기</a>')
+
+
+def _toss_page(title, payload, markup, delay_ms, ssr):
+    """Next.js 처럼 __NEXT_DATA__ 를 싣고, 스크립트가 delay_ms 뒤 #__next 를 그리는 페이지.
+    ssr=True 면 서버에서 이미 그린 마크업이 처음부터 들어 있음 (스크립트는 같은 내용으로 다시 그림)"""
+    import json
+
+    js_safe = lambda text: text.replace("</", "<\\/")
+    data = js_safe(json.dumps({"props": {"pageProps": payload}}, ensure_ascii=False))
+    initial = markup if ssr else '<div class="skeleton">로딩 중</div>'
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>{escape(title)} | 토스증권</title>
+</head>
+<body>
+<div id="__next">{initial}</div>
+<script id="__NEXT_DATA__" type="application/json">{data}</script>
+<script>
+setTimeout(function () {{
+  document.getElementById("__next").innerHTML = {js_safe(json.dumps(markup, ensure_ascii=False))};
+}}, {delay_ms});
+</script>
+</body>
+</html>"""
+
+
+def toss_list_page_html(code, n=TOSS_POSTS_PER_STOCK, delay_ms=TOSS_RENDER_DELAY_MS, ssr=False):
+    """종목 커뮤니티 목록 (인기글 하나가 피드와 중복으로 나옴)"""
+    posts = [{"postId": i, "title": make_title(i)} for i in toss_post_ids(code, n)]
+    return _toss_page(f"A{code} 커뮤니티", {"code": code, "posts": posts}, toss_list_markup(posts), delay_ms, ssr)
+
+
+def toss_is_ssr(post_id):
+    # 일부 글은 서버 렌더링 없이 스크립트로만 그려짐 (HTTP 모드에서 브라우저로 넘어가는 경우)
+    return _seed("toss-ssr", post_id) % 8 != 0
+
+
+def toss_post_page_html(post_id, delay_ms=TOSS_RENDER_DELAY_MS, ssr=False):
+    """게시글 상세. 작성자 -> '팔로우' -> 본문 -> 좋아요/댓글 수 -> 댓글 -> 하단 링크 순"""
+    post = toss_post(post_id)
+    return _toss_page(f"게시글 {post_id}", {"post": post}, toss_post_markup(post), delay_ms,
+                      ssr and toss_is_ssr(post_id))
+
+
+def toss_expected_content(post_id):
+    """extract_toss_content 가 렌더링된 글 페이지에서 뽑아야 하는 값"""
+    post = toss_post(post_id)
+    lines = post["content"].split("\n") + [str(post["likeCount"]), str(post["commentCount"])]
+    # 댓글이 있으면 첫 댓글 작성자까지, 없으면 하단 링크까지 본문으로 잡힘 (기존 추출 방식 그대로)
+    lines.append(post["comments"][0]["author"] if post["comments"] else "인기글 더보기")
+    return "\n".join(lines)
+
+
+# ==========================================
+# 도배/준복제 글이 섞인 게시글 (dedup.py 용)
+# ==========================================
+SPAM_PHRASES = [
+    "무료 리딩방 입장하세요 수익 인증 카톡 문의",
+    "내일 상한가 종목 공개합니다 지금 바로 확인",
+    "세력 매집 완료 급등 임박 선착순 무료 공개",
+    "손실 복구 도와드립니다 오픈채팅 검색 하세요",
+]
+_MUTATE_CHARS = "가나다라마바사아자차카타파하ㅋㅎ!?~1234567890"
+
+
+def make_dup_posts(n, spam_rate=0.3, family_mean=8, max_edits=2, seed=0):
+    """Title / Content / family(정답 묶음 번호) 게시글 n 건 (그중 약 spam_rate 가 도배글).
+
+    일반 글은 단어를 무작위로 이어 붙여서 서로 겹치지 않고,
+    도배글은 묶음마다 원본 하나를 글자 0~max_edits 개 바꾸기/지우기/덧붙이기 한 변형들입니다.
+    묶음 크기는 평균 family_mean 인 기하분포, 같은 seed 면 항상 같은 결과."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    vocab = np.array(TITLE_WORDS + sorted({w for s in BODY_SENTENCES for w in s.rstrip(".").split()}), dtype=object)
+
+    def words(count, lo, hi):
+        idx = rng.integers(0, len(vocab), size=(count, hi))
+        lens = rng.integers(lo, hi + 1, size=count)
+        return [" ".join(row[:k]) for row, k in zip(vocab[idx], lens)]
+
+    def mutate(text):
+        chars = list(text)
+        for _ in range(rng.integers(0, max_edits + 1)):
+            op, at = rng.integers(0, 3), int(rng.integers(0, len(chars)))
+            c = _MUTATE_CHARS[rng.integers(0, len(_MUTATE_CHARS))]
+            if op == 0:
+                chars[at] = c
+            elif op == 1 and len(chars) > 1:
+                del chars[at]
+            else:
+                chars.append(c)
+        return "".join(chars)
+
+    # 도배 묶음 크기를 먼저 정하고 나머지는 일반 글 (묶음 번호 = 첫 행 번호)
+    sizes = []
+    while sum(sizes) < n * spam_rate:
+        sizes.append(int(rng.geometric(1 / family_mean)))
+    sizes[-1] -= max(0, sum(sizes) - int(n * spam_rate))
+    sizes = [k for k in sizes if k > 0]
+    n_spam = sum(sizes)
+
+    titles = words(n - n_spam, 3, 6)
+    contents = words(n - n_spam, 8, 15)
+    family = list(range(n - n_spam))
+    bases_t = words(len(sizes), 2, 2)
+    bases_c = words(len(sizes), 10, 10)
+    for f, k in enumerate(sizes):
+        title = f"{bases_t[f]} {SPAM_PHRASES[rng.integers(0, len(SPAM_PHRASES))]}"
+        content = f"{bases_c[f]} {rng.integers(10000, 99999)}"
+        fid = len(family)
+        for _ in range(k):
+            titles.append(mutate(title))
+            contents.append(mutate(content))
+            family.append(fid)
+
+    # 도배글이 한곳에 몰리지 않도록 섞음
+    order = rng.permutation(n)
+    return pd.DataFrame({"Title": np.asarray(titles, dtype=object)[order],
+                         "Content": np.asarray(contents, dtype=object)[order],
+                         "family": np.asarray(family)[order]})
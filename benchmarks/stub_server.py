@@ -0,0 +1,156 @@
+"""
+벤치마크용 로컬 스텁 서버.
+
+fixtures.py 가 만든 네이버 게시판 페이지를 실제 사이트처럼 EUC-KR 로 내려줍니다.
+토스증권 커뮤니티 목록/글 페이지(/stocks/A<코드>/community, /community/posts/<번호>)는 UTF-8 로,
+render_delay_ms 뒤에 스크립트가 내용을 그리는 페이지이고, toss_ssr=True 면 대부분의 글이
+서버 렌더링 마크업을 처음부터 담고 옵니다 (fixtures.toss_is_ssr).
+latency 로 응답마다 인위적인 지연(네트워크 왕복 시간)을 줄 수 있습니다.
+blocked_pages 에 (종목코드, 페이지) 를 넣으면 그 게시판 페이지는 type2 테이블 없는 차단 안내 페이지로 응답합니다.
+blocked_posts 에 nid 를 넣으면 그 게시글 페이지도 본문 영역 없는 차단 안내 페이지로 응답합니다.
+rate_limit 을 주면 최근 1초 동안 게시판 요청이 그보다 많을 때 limit_status 로 응답합니다
+(200 이면 차단 안내 페이지, 429/403 이면 그 상태 코드), limit_latency 는 그때 더하는 지연입니다.
+"""
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import fixtures
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, charset="euc-kr"):
+        data = body.encode(charset, errors="replace")
+        self.send_response(status)
+        self.send_header("Content-Type", f"text/html; charset={charset}")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _over_limit(self):
+        # 최근 1초 안에 정상 응답한 게시판 요청 수 기준 (차단 응답은 세지 않음)
+        server = self.server
+        now = time.monotonic()
+        with server.lock:
+            while server.recent and server.recent[0] <= now - 1.0:
+                server.recent.popleft()
+            if len(server.recent) >= server.rate_limit:
+                server.limited += 1
+                return True
+            server.recent.append(now)
+            return False
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        qs = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/item/board.naver":
+            code = qs.get("code", "005930")
+            page = int(qs.get("page", 1))
+            head = server.heads.get(code)
+            if server.rate_limit and self._over_limit():
+                if server.limit_latency:
+                    time.sleep(server.limit_latency)
+                if server.limit_status == 200:
+                    self._send(200, fixtures.BLOCKED_PAGE_HTML)
+                else:
+                    self._send(server.limit_status, "<html><body>Too Many Requests</body></html>")
+                return
+            if (code, page) in server.blocked_pages:
+                self._send(200, fixtures.BLOCKED_PAGE_HTML)
+                return
+            self._send(200, fixtures.board_page_html(code, page, head, server.total_pages))
+            return
+
+        if url.path == "/item/board_read.naver":
+            code = qs.get("code", "005930")
+            nid = int(qs.get("nid", 0))
+            if nid in server.blocked_posts:
+                self._send(200, fixtures.BLOCKED_PAGE_HTML)
+                return
+            self._send(200, fixtures.post_page_html(code, nid))
+            return
+
+        parts = url.path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "stocks" and parts[2] == "community":
+            self._send(200, fixtures.toss_list_page_html(parts[1].lstrip("A"), server.toss_posts,
+                                                         server.render_delay_ms, server.toss_ssr), charset="utf-8")
+            return
+
+        if len(parts) == 3 and parts[:2] == ["community", "posts"] and parts[2].isdigit():
+            self._send(200, fixtures.toss_post_page_html(int(parts[2]), server.render_delay_ms, server.toss_ssr),
+                       charset="utf-8")
+            return
+
+        self._send(404, "<html><body>not found</body></html>")
+
+
+class StubServer:
+    """
+    with StubServer(latency=0.02) as srv:
+        crawl(..., base_url=srv.url("/item/board.naver"))
+    """
+
+    def __init__(self, latency=0.0, total_pages=None, host="127.0.0.1", port=0,
+                 render_delay_ms=fixtures.TOSS_RENDER_DELAY_MS, toss_posts=fixtures.TOSS_POSTS_PER_STOCK, toss_ssr=False,
+                 blocked_pages=(), blocked_posts=(), rate_limit=None, limit_status=429, limit_latency=0.0):
+        self.httpd = ThreadingHTTPServer((host, port), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.total_pages = total_pages
+        self.httpd.render_delay_ms = render_delay_ms
+        self.httpd.toss_posts = toss_posts
+        self.httpd.toss_ssr = toss_ssr
+        self.httpd.heads = {}
+        self.httpd.blocked_pages = set(blocked_pages)
+        self.httpd.blocked_posts = set(blocked_posts)
+        self.httpd.rate_limit = rate_limit
+        self.httpd.limit_status = limit_status
+        self.httpd.limit_latency = limit_latency
+        self.httpd.recent = deque()
+        self.httpd.limited = 0
+        self.httpd.hits = 0
+        self.httpd.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def hits(self):
+        return self.httpd.hits
+
+    @property
+    def limited(self):
+        return self.httpd.limited
+
+    def reset_hits(self):
+        self.httpd.hits = 0
+        self.httpd.limited = 0
+        self.httpd.recent.clear()
+
+    def set_head(self, code, nid):
+        # 새 글이 올라온 상황을 흉내낼 때 사용
+        self.httpd.heads[code] = nid
+
+    def url(self, path=""):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
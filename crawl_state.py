@@ -0,0 +1,139 @@
+"""
+증분 수집용 크롤링 상태 저장소.
+
+종목코드별로 지금까지 수집한 가장 최신 게시글 번호(링크의 nid)를
+JSON 파일 하나에 보관합니다. 다음 수집 때는 이 번호(워터마크)보다
+큰 글만 새 글로 보고, 이미 가진 글이 보이는 페이지에서 멈춥니다.
+"""
+import json
+import os
+import re
+
+import pandas as pd
+
+STATE_FILE = "crawl_state.json"
+
+NID_PATTERN = re.compile(r"[?&]nid=(\d+)")
+
+
+def extract_nid(link):
+    """게시글 링크에서 nid 를 뽑아 int 로 반환 (없으면 None)"""
+    m = NID_PATTERN.search(str(link))
+    return int(m.group(1)) if m else None
+
+
+def max_nid(links):
+    """링크들 중 가장 큰 nid (없으면 None) - 페이지 하나의 최신 글 번호"""
+    return max((nid for nid in map(extract_nid, links) if nid is not None), default=None)
+
+
+def load_watermarks(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return {str(code): int(nid) for code, nid in state.get("watermarks", {}).items()}
+
+
+def save_watermarks(watermarks, path=STATE_FILE):
+    # 쓰는 도중 죽어도 기존 파일이 깨지지 않도록 임시 파일에 쓰고 교체
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"watermarks": watermarks}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def watermarks_from_csv(csv_path):
+    """
+    상태 파일이 없을 때 기존 수집 CSV 의 Link 컬럼으로 워터마크를 복원합니다.
+    """
+    if not os.path.exists(csv_path):
+        return {}
+    df = pd.read_csv(csv_path, usecols=["Code", "Link"], dtype=str, encoding="utf-8-sig")
+    return update_watermarks({}, df)
+
+
+def update_watermarks(watermarks, df):
+    """df(Code, Link) 에서 종목별 최대 nid 를 구해 기존 워터마크와 합친 새 dict 반환"""
+    merged = dict(watermarks)
+    if df is None or df.empty:
+        return merged
+
+    nids = df["Link"].map(extract_nid)
+    latest = pd.DataFrame({"Code": df["Code"].astype(str).str.zfill(6), "nid": nids}) \
+        .dropna().groupby("Code")["nid"].max()
+
+    for code, nid in latest.items():
+        merged[code] = max(int(nid), merged.get(code, 0))
+    return merged
+
+
+def gap_free_rows(df, completeness):
+    """
+    못 받은 페이지가 있는 종목은 빈틈 없이 받은 글(nid <= safe_nid)만 남깁니다.
+    completeness: 수집 결과의 df.attrs["completeness"] (rate_control.Completeness.table())
+    빠진 페이지보다 새 글까지 저장하고 워터마크를 올리면 다음 증분 수집이 그 워터마크에서 멈춰서
+    빠진 페이지의 글을 영영 못 받음 -> 남겨둔 글은 다음 실행에서 빠진 페이지와 함께 다시 수집됨
+    반환: (저장할 행, 미룬 행 수)
+    """
+    if df is None or df.empty or completeness is None or completeness.empty:
+        return df, 0
+    limits = completeness.dropna(subset=["safe_nid"])
+    if limits.empty:
+        return df, 0
+
+    limit = df["Code"].astype(str).str.zfill(6).map(
+        dict(zip(limits["stock"].astype(str).str.zfill(6), limits["safe_nid"].astype("int64"))))
+    nids = df["Link"].map(extract_nid).astype("float64")
+    keep = limit.isna() | (nids.notna() & (nids <= limit))
+    return df[keep.to_numpy()], int((~keep).sum())
+
+
+def body_complete_rows(df, column="Content"):
+    """
+    본문을 못 받은 글(column 이 None)이 있는 종목은 그 글보다 오래된 글(nid < 못 받은 글 중 가장 작은 nid)만 남깁니다.
+    못 받은 글까지 저장하고 워터마크를 올리면 다음 증분 수집이 그 글을 건너뛰어 본문을 영영 못 받음
+    -> gap_free_rows 처럼 남겨둔 글은 다음 실행에서 다시 수집됨
+    반환: (저장할 행, 미룬 행 수)
+    """
+    if df is None or df.empty or column not in df.columns:
+        return df, 0
+    failed = df[column].isna()
+    if not failed.any():
+        return df, 0
+
+    codes = df["Code"].astype(str).str.zfill(6)
+    nids = df["Link"].map(extract_nid).astype("float64")
+    limit = codes.map(nids[failed].groupby(codes[failed]).min())
+    keep = limit.isna() | (nids < limit)
+    return df[keep.to_numpy()], int((~keep).sum())
+
+
+def split_new_rows(rows, watermark):
+    """
+    한 페이지의 행들 중 워터마크보다 새로운 글만 골라냅니다.
+    반환: (새 글 리스트, 이미 수집한 글에 도달했는지 여부)
+    """
+    if not watermark:
+        return rows, False
+
+    new_rows = []
+    reached = False
+    for row in rows:
+        nid = extract_nid(row["Link"])
+        if nid is not None and nid <= watermark:
+            reached = True
+            continue
+        new_rows.append(row)
+    return new_rows, reached
+
+
+def append_csv(df, path):
+    """기존 데이터셋 뒤에 새 행만 덧붙입니다. (파일이 없으면 새로 생성)"""
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    if exists:
+        # 컬럼 순서를 기존 파일 헤더에 맞춤
+        header = pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns
+        df = df.reindex(columns=header)
+    df.to_csv(path, mode="a" if exists else "w", header=not exists,
+              index=False, encoding="utf-8-sig")
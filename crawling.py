@@ -1,10 +1,18 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import random
-import yfinance as yf
 import warnings
+import os
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+import crawl_state
+import naver_extract
+import price_service
+import rate_control
+import run_metrics
+from post_cache import PostContentCache
 
 # 경고 무시
 warnings.filterwarnings("ignore")
@@ -20,6 +28,17 @@ TARGET_STOCKS = [
 
 PAGES_TO_CRAWL = 2  # 종목당 수집할 페이지 수
 
+INCREMENTAL = True  # 지난 수집 이후의 새 글만 가져와서 기존 CSV 에 추가
+COMMUNITY_CSV = "stock_community_data.csv"
+STATE_FILE = "crawl_state_community.json"
+
+BODY_WORKERS = 4    # 본문 동시 요청 수
+ADAPTIVE_RATE = True  # True: 목록/본문 요청 속도를 응답을 보고 조절 (rate_control) / False: 본문마다 랜덤 딜레이
+USE_BODY_CACHE = True
+
+# HTML 추출 백엔드: "lxml"(C 파서, 기본) / "bs4-lxml" / "bs4"(html.parser)
+EXTRACTOR = naver_extract.get_extractor(naver_extract.DEFAULT_EXTRACTOR)
+
 # ==========================================
 # 2. 네이버 금융 게시글 수집 (requests + Session)
 # ==========================================
@@ -36,50 +55,162 @@ def get_headers():
         'Connection': 'keep-alive'
     }
 
-def get_post_content(session, url):
+def make_session(pool_size=BODY_WORKERS):
+    # 모든 워커가 같은 커넥션 풀을 공유하도록 풀 크기를 워커 수에 맞춤
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_post_content(session, url, throttle=None):
     """
     세션(Session)을 유지하며 상세 페이지의 본문을 가져옵니다.
+    요청 자체가 실패했거나 본문 영역이 없는 페이지(차단/캡차 안내)면 None -> 캐시하지 않고,
+    crawl_state.body_complete_rows 가 그 글부터는 저장/워터마크에서 빼서 다음 실행에서 다시 요청
+    (본문 영역은 있는데 비어 있는 글은 "")
+    throttle: rate_control.AimdThrottle (없으면 기존 랜덤 딜레이)
     """
+    t0 = None
     try:
-        # 랜덤 딜레이 (필수)
-        time.sleep(random.uniform(0.2, 0.5))
+        if throttle is not None:
+            throttle.wait()
+        else:
+            # 랜덤 딜레이 (필수)
+            time.sleep(random.uniform(0.2, 0.5))
         
+        t0 = time.perf_counter()
         res = session.get(url, headers=get_headers(), timeout=10)
-        soup = BeautifulSoup(res.content, 'html.parser')
-        
-        content = ""
-        
-        # 본문 태그 찾기 (가장 확실한 순서대로)
-        # 1. 스마트 에디터 (최신 글)
-        if not content:
-            smart_editor = soup.find('div', {'class': 'se-main-container'})
-            if smart_editor:
-                content = smart_editor.get_text(separator=" ", strip=True)
-
-        # 2. 일반 HTML 본문 (구형) - id='body'가 가장 일반적
-        if not content:
-            body_tag = soup.find('div', {'id': 'body'})
-            if body_tag:
-                # 내부에 불필요한 스크립트나 스타일 제거
-                for script in body_tag(['script', 'style']):
-                    script.decompose()
-                content = body_tag.get_text(separator=" ", strip=True)
-
-        # 3. 구형 글 (scr01)
-        if not content:
-            scr01 = soup.find('div', {'class': 'scr01'})
-            if scr01:
-                content = scr01.get_text(separator=" ", strip=True)
+        latency = time.perf_counter() - t0
+        run_metrics.observe_http("본문", latency, res.status_code, url=url)
+        reason = rate_control.failure_reason(res.status_code)
+        content = None
+        if reason is None:
+            # 본문 태그 찾기 (se-main-container -> #body -> scr01 순서, naver_extract 참고)
+            t0 = time.perf_counter()
+            content = EXTRACTOR.post_content(res.content)
+            run_metrics.record_stage("parse_post", time.perf_counter() - t0, 1)
+            if content is None:
+                # 200 이지만 본문 영역이 없음 = 차단/캡차 안내 페이지 -> 차단 신호로 취급
+                reason = "no_content"
+                run_metrics.observe_empty("본문", url, reason)
+        if throttle is not None:
+            throttle.observe(latency, reason)
                 
         return content
 
     except Exception as e:
-        return ""
+        if throttle is not None and t0 is not None:
+            throttle.observe(time.perf_counter() - t0, rate_control.failure_reason(error=e))
+        run_metrics.error("get_post_content", e, url=url)
+        return None
 
-def crawl_community(stocks, pages):
-    all_data = []
-    # 세션 시작 (쿠키 유지)
-    session = requests.Session()
+def fetch_post_contents(session, urls, workers=BODY_WORKERS, cache=None, throttle=None):
+    """
+    여러 게시글 본문을 워커 풀로 한꺼번에 가져옵니다.
+    반환 리스트는 urls 와 같은 순서입니다. (캐시에 있는 글은 요청하지 않음, 못 받은 글은 None)
+    """
+    cached = cache.get_many(urls) if cache else {}
+    missing = [u for u in dict.fromkeys(urls) if u not in cached]
+
+    fetched = {}
+    if missing:
+        print(f"  ▶ 본문 {len(missing)}건 요청 중 (캐시 적중 {len(set(urls)) - len(missing)}건)...")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # map 은 입력 순서대로 결과를 돌려줌
+            for url, content in zip(missing, pool.map(lambda u: get_post_content(session, u, throttle), missing)):
+                if content is not None:
+                    fetched[url] = content
+
+        # 본문 영역까지 받은 글만 캐시에 저장 (실패하거나 차단 안내 페이지였던 글은 None 으로 남겨서 다시 요청)
+        if cache and fetched:
+            cache.put_many(fetched)
+
+    contents = {**cached, **fetched}
+    return [contents.get(u) for u in urls]
+
+def get_board_entries(session, code, url, throttle=None):
+    """목록 페이지 한 장 -> (게시글 항목 리스트 또는 None, 실패 사유 또는 None)"""
+    if throttle is not None:
+        throttle.wait()
+    t0 = time.perf_counter()
+    try:
+        res = session.get(url, headers=get_headers(), timeout=10)
+    except Exception as e:
+        latency = time.perf_counter() - t0
+        run_metrics.observe_http(code, latency, error=e, url=url)
+        run_metrics.error("crawl_community", e, stock=code, url=url)
+        reason = rate_control.failure_reason(error=e)
+        if throttle is not None:
+            throttle.observe(latency, reason)
+        return None, reason
+    latency = time.perf_counter() - t0
+    run_metrics.observe_http(code, latency, res.status_code, url=url)
+
+    t0 = time.perf_counter()
+    entries = EXTRACTOR.board_entries(res.content)
+    run_metrics.record_stage("parse", time.perf_counter() - t0, len(entries) if entries else 0)
+
+    reason = rate_control.failure_reason(res.status_code, empty=entries is None)
+    if reason == "no_table":
+        run_metrics.observe_empty(code, url)
+    if throttle is not None:
+        throttle.observe(latency, reason)
+    return (None if reason else entries), reason
+
+def board_rows(entries, name, code, watermark=None):
+    """목록 항목 -> 행 리스트 (본문은 비워둠), 이미 수집한 글에 도달했는지 여부"""
+    rows = []
+    reached = False
+    for e in entries:
+        if not e['hover']:
+            continue
+            
+        # 1. 전체 제목 가져오기 (title 속성 우선)
+        full_title = e['title_attr']
+        if not full_title:
+            full_title = e['title']
+            
+        # 2. 링크 생성
+        full_link = "https://finance.naver.com" + e['href']
+
+        # 이미 수집한 글이면 본문 요청 없이 건너뜀
+        nid = crawl_state.extract_nid(full_link)
+        if watermark and nid is not None and nid <= watermark:
+            reached = True
+            continue
+        
+        # 3. 기타 정보 (본문은 목록 수집 후 일괄 요청)
+        rows.append({
+            'Date': e['date'],
+            'Stock': name,
+            'Code': code,
+            'Title': full_title,
+            'Content': "",
+            'Link': full_link,
+            'Views': e['views']
+        })
+    return rows, reached
+
+def page_nid(entries):
+    """목록 페이지의 최대 nid (워터마크로 걸러지기 전, 빈틈 계산용)"""
+    return crawl_state.max_nid(e['href'] for e in entries if e['hover'])
+
+def crawl_community(stocks, pages, watermarks=None, workers=BODY_WORKERS, cache=None, throttle=None, retry=None):
+    """
+    watermarks: {종목코드: 마지막 수집 nid}. 주어지면 새 글만 본문까지 수집하고
+    이미 수집한 글이 보이는 페이지에서 해당 종목을 끝냅니다.
+    목록을 먼저 다 읽은 뒤 본문은 fetch_post_contents 로 한 번에 병렬 수집합니다.
+    throttle / retry: rate_control.AimdThrottle / RetryQueue (없으면 설정값으로 생성, 목록/본문 요청이 같이 씀)
+    차단 의심 페이지는 목록을 다 읽은 뒤 백오프로 다시 요청합니다. 종목별 완료율은 df.attrs["completeness"]
+    """
+    watermarks = watermarks or {}
+    throttle = throttle if throttle is not None else (rate_control.AimdThrottle() if ADAPTIVE_RATE else None)
+    retry = retry if retry is not None else rate_control.RetryQueue()
+    report = rate_control.Completeness()
+    by_stock = {}   # 종목코드 -> {페이지: 행 리스트}
+    # 세션 시작 (쿠키 유지, 커넥션 풀 공유)
+    session = make_session(workers)
     
     for stock in stocks:
         name = stock['name']
@@ -87,132 +218,128 @@ def crawl_community(stocks, pages):
         print(f"\n=== [{name}] 게시글 수집 시작 ===")
         
         base_url = f"https://finance.naver.com/item/board.naver?code={code}&page="
+        watermark = watermarks.get(code)
+        by_page = by_stock[code] = {}
         
         for page in range(1, pages + 1):
             url = base_url + str(page)
             print(f"  ▶ {page} 페이지 읽는 중...", end="")
             
-            try:
-                res = session.get(url, headers=get_headers())
-                soup = BeautifulSoup(res.content, 'html.parser')
-                table = soup.find('table', {'class': 'type2'})
-                
-                if not table:
-                    print(" [차단 의심 혹은 데이터 없음]")
-                    continue
-
-                rows = table.find_all('tr')
-                count = 0
-                
-                for row in rows:
-                    if 'onmouseover' not in row.attrs:
-                        continue
-                        
-                    cols = row.find_all('td')
-                    if len(cols) < 6:
-                        continue
-                        
-                    # 제목 링크 태그
-                    link_tag = cols[1].find('a')
-                    if not link_tag:
-                        continue
-                        
-                    # 1. 전체 제목 가져오기 (title 속성 우선)
-                    full_title = link_tag.get('title')
-                    if not full_title:
-                        full_title = link_tag.text.strip()
-                        
-                    # 2. 링크 생성
-                    link_suffix = link_tag['href']
-                    full_link = "https://finance.naver.com" + link_suffix
-                    
-                    # 3. 본문 가져오기 (함수 호출)
-                    content = get_post_content(session, full_link)
-                    
-                    # 4. 기타 정보
-                    date = cols[0].text.strip()
-                    views = cols[3].text.strip()
-                    
-                    all_data.append({
-                        'Date': date,
-                        'Stock': name,
-                        'Code': code,
-                        'Title': full_title,
-                        'Content': content,
-                        'Link': full_link,
-                        'Views': views
-                    })
-                    count += 1
-                
-                print(f" -> {count}개 완료")
-                
-            except Exception as e:
-                print(f" [에러] {e}")
+            entries, reason = get_board_entries(session, code, url, throttle)
+            if entries is None:
+                print(f" [차단 의심 혹은 데이터 없음: {reason}]")
+                if not retry.push((stock, page, url), 1, reason):
+                    report.record(code, page, 1, reason)
                 continue
-                
-    return pd.DataFrame(all_data)
+
+            by_page[page], reached = board_rows(entries, name, code, watermark)
+            report.record(code, page, 1, nid=page_nid(entries))
+            print(f" -> {len(by_page[page])}개 완료")
+
+            if reached:
+                print("  ▶ 이전 수집 지점 도달, 다음 종목으로")
+                break
+
+    # 재시도 대기열: 백오프 시간이 된 페이지부터 다시 요청
+    if len(retry):
+        print(f"\n  ▶ 차단 의심 페이지 {len(retry)}장 재시도...")
+    while len(retry):
+        time.sleep(retry.delay())
+        for (stock, page, url), attempts in retry.pop_ready():
+            code = stock['code']
+            entries, reason = get_board_entries(session, code, url, throttle)
+            if entries is not None:
+                report.record(code, page, attempts + 1, nid=page_nid(entries))
+                by_stock[code][page] = board_rows(entries, stock['name'], code, watermarks.get(code))[0]
+            elif not retry.push((stock, page, url), attempts + 1, reason):
+                report.record(code, page, attempts + 1, reason)
+
+    # 종목 순서, 페이지 순서대로 (재시도로 나중에 받은 페이지도 제자리에)
+    all_data = [row for code, by_page in by_stock.items() for page in sorted(by_page) for row in by_page[page]]
+
+    # 4. 본문 일괄 수집 (순서 유지)
+    with run_metrics.stage("post_contents", items=len(all_data)):
+        contents = fetch_post_contents(session, [r['Link'] for r in all_data], workers, cache, throttle)
+    for row, content in zip(all_data, contents):
+        row['Content'] = content
+
+    df = pd.DataFrame(all_data)
+    df.attrs["completeness"] = table = report.table()
+    report.log()
+    rate_control.print_report(table, throttle)
+    return df
 
 # ==========================================
 # 3. 주가 데이터 수집 (yfinance)
 # ==========================================
-def get_stock_prices(stocks):
-    all_prices = []
+def get_stock_prices(stocks, service=None):
     print(f"\n=== 주가 데이터 수집 시작 (Yahoo Finance) ===")
-    
-    for stock in stocks:
-        name = stock['name']
-        ticker = stock['ticker']
-        print(f"  ▶ [{name}] 데이터 요청 중...")
-        
-        try:
-            # 최근 1달, 1시간 간격 데이터
-            yf_stock = yf.Ticker(ticker)
-            df = yf_stock.history(period="1mo", interval="60m")
-            
-            if df.empty:
-                print("     -> 데이터 없음 (장 휴장일 등 확인 필요)")
-                continue
-                
-            df.reset_index(inplace=True)
-            df['Stock'] = name
-            df['Code'] = stock['code']
-            
-            # 날짜 포맷 통일 (문자열로 변환)
-            df['Datetime'] = df['Datetime'].astype(str)
-            
-            # 필요한 컬럼만 선택
-            cols = ['Datetime', 'Stock', 'Code', 'Open', 'High', 'Low', 'Close', 'Volume']
-            all_prices.append(df[cols])
-            print(f"     -> {len(df)}개 행 수집 완료")
-            
-        except Exception as e:
-            print(f"     -> [에러] {e}")
-            
-    if all_prices:
-        return pd.concat(all_prices)
-    else:
-        return pd.DataFrame()
+    owns = service is None
+    if owns:
+        service = price_service.PriceService()
+    try:
+        # 최근 1달, 1시간 간격 데이터 (캐시에 없는 구간만 요청)
+        df = service.get_prices(stocks, period="1mo")
+    finally:
+        if owns: service.close()
+    price_service.print_stats(service.stats)
+
+    if df.empty:
+        print("     -> 데이터 없음 (장 휴장일 등 확인 필요)")
+        return df
+
+    # 날짜 포맷 통일 (한국 시간 문자열로 변환)
+    df['Datetime'] = df['Date'].dt.tz_convert("Asia/Seoul").astype(str)
+    cols = ['Datetime', 'Stock', 'Code', 'Open', 'High', 'Low', 'Close', 'Volume']
+    return df[cols]
 
 # ==========================================
 # 4. 메인 실행 및 CSV 저장
 # ==========================================
 if __name__ == "__main__":
-    # 1) 게시글 수집
-    df_community = crawl_community(TARGET_STOCKS, PAGES_TO_CRAWL)
+    run_metrics.start_run("crawling")
+
+    # 1) 게시글 수집 (증분 모드면 워터마크 이후의 새 글만)
+    watermarks = {}
+    if INCREMENTAL and os.path.exists(COMMUNITY_CSV):
+        watermarks = crawl_state.load_watermarks(STATE_FILE) or crawl_state.watermarks_from_csv(COMMUNITY_CSV)
+
+    cache = PostContentCache() if USE_BODY_CACHE else None
+    try:
+        df_community = crawl_community(TARGET_STOCKS, PAGES_TO_CRAWL, watermarks, cache=cache)
+    finally:
+        if cache: cache.close()
+    # 못 받은 페이지가 있는 종목은 빈틈 없이 받은 글까지만 저장 (워터마크가 빠진 페이지를 건너뛰지 않도록)
+    df_community, held = crawl_state.gap_free_rows(df_community, df_community.attrs.get("completeness"))
+    if held:
+        print(f"\n  ▶ 빠진 페이지가 있는 종목: 그보다 새 글 {held}건은 다음 실행에서 다시 수집")
+    # 본문을 못 받은 글도 마찬가지 (그 글보다 새 글까지 워터마크를 올리면 다시 요청하지 않게 됨)
+    df_community, held = crawl_state.body_complete_rows(df_community)
+    if held:
+        print(f"\n  ▶ 본문을 못 받은 글이 있는 종목: 그 글부터 {held}건은 다음 실행에서 다시 수집 (받은 본문은 캐시)")
     if not df_community.empty:
-        df_community.to_csv("stock_community_data.csv", index=False, encoding="utf-8-sig")
-        print("\n✅ [성공] 게시글 데이터 저장 완료: stock_community_data.csv")
+        if watermarks:
+            crawl_state.append_csv(df_community, COMMUNITY_CSV)
+        else:
+            df_community.to_csv(COMMUNITY_CSV, index=False, encoding="utf-8-sig")
+        crawl_state.save_watermarks(crawl_state.update_watermarks(watermarks, df_community), STATE_FILE)
+        print(f"\n✅ [성공] 게시글 데이터 저장 완료: {COMMUNITY_CSV} (+{len(df_community)}건)")
         # 미리보기
         print(df_community[['Stock', 'Title', 'Content']].head(3))
+    elif watermarks:
+        print("\n✅ 새 게시글 없음")
     else:
         print("\n❌ 게시글 수집 실패")
 
     # 2) 주가 데이터 수집
-    df_price = get_stock_prices(TARGET_STOCKS)
+    with run_metrics.stage("prices"):
+        df_price = get_stock_prices(TARGET_STOCKS)
     if not df_price.empty:
         df_price.to_csv("stock_price_data.csv", index=False, encoding="utf-8-sig")
         print("✅ [성공] 주가 데이터 저장 완료: stock_price_data.csv")
         # 미리보기
         print(df_price.head(3))
     else:
-        print("❌ 주가 데이터 수집 실패")
\ No newline at end of file
+        print("❌ 주가 데이터 수집 실패")
+
+    run_metrics.finish_run()
\ No newline at end of file
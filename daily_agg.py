@@ -0,0 +1,447 @@
+"""
+(날짜, 종목) 단위 감성 집계 저장소.
+
+라벨링된 게시글을 (Date, Code) 로 묶어서
+    positive / negative / neutral / labeled 건수, mentions(제목 수), engagement 합
+을 CSV 하나에 누적 보관합니다.
+라벨링 때 dedup.py 로 묶인 준복제/도배 글(dup_count > 1)은 감성 건수(positive/negative/neutral/labeled)에
+묶음 대표 글(dup_rep, 묶음에서 가장 먼저 나온 글) 1건만 셉니다 (mentions/engagement 는 전부).
+묶음은 같은 (Code, Date) 안에서만 만들어지므로 (dedup.GROUP_COLUMNS) 묶음마다 (Date, Code) 하나에 1건입니다.
+대표 글은 묶음의 가장 앞 글이라 글이 뒤에 붙어도 그대로이므로, 나눠서 증분 반영해도 전체 재계산과 같습니다.
+나중 글이 이미 반영한 두 묶음을 이어 붙이면 뒤쪽 묶음의 대표가 대표에서 빠지는데, 증분 반영 때 이미 반영한 글
+(워터마크 이하)의 감성 건수를 다시 세어서 그 (Date, Code) 의 글이 파일에 모두 남아 있으면 고쳐 넣습니다 (_recount).
+accuracy_modeling.py 와 Topic_Modeling 은 원본 게시글 전체를 다시 읽지 않고 이 표만 읽습니다.
+
+증분 반영은 crawl_state 와 같은 방식(종목별 최신 nid 워터마크)으로,
+이미 반영한 글은 다시 더하지 않습니다. 특정 날짜를 다시 계산해야 하면
+rebuild_days() 에 그 날짜의 게시글만 넘기면 됩니다.
+
+큰 라벨링 CSV 는 merge_labeled_csv() / aggregate_csv() 로 필요한 컬럼만 CHUNK_ROWS 행씩 읽어서
+청크마다 (Date, Code) 집계에 접어 넣습니다 (ChunkedAggregator). 청크 안에서는 종목/이름/라벨을
+범주형 정수 코드로, 날짜를 datetime64 일 단위로, 건수를 int32 로 다뤄서 메모리가 입력 행 수와 무관합니다.
+준복제 대표 여부도 글마다 판단하므로 앞 청크의 묶음을 기억하지 않습니다 (도배글이 많아도 메모리가 늘지 않음).
+
+    python daily_agg.py stock_community_labeled.csv   # 새 라벨링 결과 반영
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import crawl_state
+import dataset_store
+
+STORE_FILE = "daily_sentiment_agg.csv"
+
+KEY_COLS = ['Date', 'Code']
+COUNT_COLS = ['positive', 'negative', 'neutral', 'labeled', 'mentions']
+STORE_COLS = KEY_COLS + ['Stock', 'Type'] + COUNT_COLS + ['engagement']
+
+# 라벨 집계에 필요한 컬럼만 읽음
+SOURCE_COLS = ['Date', 'Stock', 'Code', 'Type', 'Title', 'Good', 'Bad', 'Views', 'Link', 'sentiment_label',
+               'dup_cluster', 'dup_count', 'dup_rep']
+
+CHUNK_ROWS = 500_000  # 청크 단위 집계의 한 번에 읽는 행 수 (메모리 상한)
+# 반복이 많은 문자열은 범주형으로 읽음 (Code 는 앞자리 0 유지)
+CHUNK_DTYPES = {'Code': 'category', 'Stock': 'category', 'Type': 'category', 'sentiment_label': 'category'}
+
+
+def state_path(store_path):
+    return os.path.splitext(store_path)[0] + ".state.json"
+
+
+# ==========================================
+# 1. 게시글 -> (Date, Code) 집계
+# ==========================================
+def parse_post_dates(dates):
+    # 네이버 목록 형식(2025.12.08 15:30) 우선, 나머지(2025-12-08 등)는 일반 파싱
+    dt = pd.to_datetime(dates, format='%Y.%m.%d %H:%M', errors='coerce')
+    rest = dt.isna() & dates.notna()
+    if rest.any():
+        dt[rest] = pd.to_datetime(dates[rest], errors='coerce', format='mixed')
+    return dt
+
+
+def _numeric(df, col):
+    if col not in df.columns:
+        return pd.Series(0, index=df.index)
+    return pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+
+
+def aggregate_posts(df):
+    """라벨링된 게시글 DataFrame -> 집계 표 (STORE_COLS)"""
+    if df.empty:
+        return pd.DataFrame(columns=STORE_COLS)
+
+    dt = parse_post_dates(df['Date'].astype('string'))
+    label = df['sentiment_label'].astype(str).str.lower() if 'sentiment_label' in df.columns \
+        else pd.Series('', index=df.index)
+
+    good, bad, views = (_numeric(df, c) for c in ('Good', 'Bad', 'Views'))
+    once = pd.Series(_counted(df), index=df.index)
+
+    work = pd.DataFrame({
+        'Date': dt.dt.date,
+        'Code': df['Code'].astype(str).str.zfill(6),
+        'Stock': df['Stock'] if 'Stock' in df.columns else '',
+        'Type': df['Type'] if 'Type' in df.columns else 'Domestic',
+        'positive': ((label == 'positive') & once).astype(int),
+        'negative': ((label == 'negative') & once).astype(int),
+        'neutral': ((label == 'neutral') & once).astype(int),
+        'labeled': once.astype(int),
+        'mentions': df['Title'].notna().astype(int) if 'Title' in df.columns else 1,
+        # Topic_Modeling 과 같은 정의: 공감 + 비공감 + log(1 + 조회수)
+        'engagement': good + bad + np.log1p(np.maximum(views, 0)),
+    })
+    work = work[dt.notna()]
+
+    agg = work.groupby(KEY_COLS, sort=True).agg(
+        Stock=('Stock', 'first'),
+        Type=('Type', 'first'),
+        **{c: (c, 'sum') for c in COUNT_COLS},
+        engagement=('engagement', 'sum'),
+    ).reset_index()
+    return agg[STORE_COLS]
+
+
+# ==========================================
+# 1-1. 청크 단위 집계 (메모리 상한)
+# ==========================================
+LABEL_CODES = {'positive': 0, 'negative': 1, 'neutral': 2}
+
+
+def _category_ids(values, mapping, rename=None):
+    """
+    범주형(또는 문자열) -> 청크 사이에 공유하는 정수 id (int32, 결측은 -1). 새 값은 mapping 에 추가.
+    rename: 범주 이름 변환 (행이 아니라 범주 수만큼만 계산)
+    """
+    cat = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype('category')
+    names = cat.cat.categories if rename is None else rename(cat.cat.categories)
+    lookup = np.array([mapping.setdefault(c, len(mapping)) for c in names] + [-1], dtype=np.int32)
+    return lookup[cat.cat.codes.to_numpy()]   # 결측 코드 -1 -> lookup 의 마지막(-1)
+
+
+def _constant_ids(n, mapping, value):
+    return np.full(n, mapping.setdefault(value, len(mapping)), dtype=np.int32)
+
+
+def _id_names(ids, mapping):
+    """id(실수, 결측 NaN) -> 원래 값"""
+    names = np.array(list(mapping) + [np.nan], dtype=object)
+    return names[np.where(np.isnan(ids), -1, ids).astype(np.int64)]
+
+
+def _link_nids(links):
+    """Link 에서 nid (crawl_state.extract_nid 의 벡터 버전, 없으면 NaN)"""
+    return pd.to_numeric(links.astype('string').str.extract(crawl_state.NID_PATTERN.pattern, expand=False),
+                         errors='coerce')
+
+
+def _chunk_numeric(df, col, dtype=np.int32):
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=dtype)
+    s = df[col]
+    if not pd.api.types.is_numeric_dtype(s):
+        s = pd.to_numeric(s, errors='coerce')
+    return s.fillna(0).to_numpy().astype(dtype)
+
+
+def _counted(df):
+    """
+    감성 건수에 넣을 글 (numpy bool): 준복제 묶음(dup_count > 1)은 대표 글만, 묶이지 않은 글은 전부.
+    대표 여부는 dup_rep 컬럼으로, dup_rep 이 없는 예전 파일은 dup_cluster == 행 번호(df.index)로 판단
+    (dedup.annotate 를 돌린 파일을 그대로 읽었을 때만 맞음)
+    """
+    n = len(df)
+    if 'dup_count' not in df.columns:
+        return np.ones(n, dtype=bool)
+    grouped = _chunk_numeric(df, 'dup_count', np.int64) > 1
+    rep = _chunk_numeric(df, 'dup_cluster', np.int64) == np.asarray(df.index)
+    if 'dup_rep' in df.columns:
+        marker = df['dup_rep']
+        if pd.api.types.is_bool_dtype(marker):
+            rep = marker.to_numpy(dtype=bool)
+        else:
+            # CSV 에서 빈 칸이 섞이면 문자열/object 로 읽힘 -> 적힌 값만 쓰고 빈 칸은 행 번호로
+            text = marker.astype('string').str.lower()
+            known = text.isin(['true', 'false']).to_numpy(dtype=bool)
+            rep = np.where(known, text.eq('true').fillna(False).to_numpy(dtype=bool), rep)
+    return ~grouped | rep
+
+
+class ChunkedAggregator:
+    """
+    게시글 청크를 add() 로 하나씩 넣으면 (Date, Code) 집계에 바로 더해 넣습니다.
+    메모리는 청크 하나 + 집계 표 (날짜 수 x 종목 수) + 종목별 워터마크만큼 (준복제 글이 많아도 늘지 않음).
+    aggregate_posts() 와 같은 결과 (Stock/Type 은 (Date, Code) 마다 처음 나온 값).
+    준복제 묶음은 _counted() 로 대표 글만 감성 건수에 넣으므로 앞 청크를 기억할 필요가 없습니다.
+    """
+
+    def __init__(self):
+        self.codes, self.stocks, self.types = {}, {}, {}   # 값 -> 정수 id
+        self.totals = None      # (day, code) 인덱스, COUNT_COLS(int32) + engagement + stock/type id
+        self.nids = {}          # code id -> 최대 nid (워터마크)
+        self.has_link = False
+        self.rows = 0
+
+    def add(self, df):
+        n = len(df)
+        if n == 0:
+            return
+        self.rows += n
+
+        dates = df['Date']
+        dt = dates if pd.api.types.is_datetime64_any_dtype(dates) else parse_post_dates(dates.astype('string'))
+        day = dt.to_numpy().astype('datetime64[D]')
+        ok = ~np.isnat(day)
+
+        code_id = _category_ids(df['Code'], self.codes, rename=lambda c: c.astype(str).str.zfill(6))
+        stock_id = _category_ids(df['Stock'], self.stocks) if 'Stock' in df.columns \
+            else _constant_ids(n, self.stocks, '')
+        type_id = _category_ids(df['Type'], self.types) if 'Type' in df.columns \
+            else _constant_ids(n, self.types, 'Domestic')
+
+        if 'sentiment_label' in df.columns:
+            lab = df['sentiment_label']
+            lab = lab if isinstance(lab.dtype, pd.CategoricalDtype) else lab.astype('category')
+            lut = np.array([LABEL_CODES.get(str(c).lower(), -1) for c in lab.cat.categories] + [-1], dtype=np.int8)
+            label = lut[lab.cat.codes.to_numpy()]
+        else:
+            label = np.full(n, -1, dtype=np.int8)
+
+        once = _counted(df)
+        good, bad = _chunk_numeric(df, 'Good'), _chunk_numeric(df, 'Bad')
+        views = _chunk_numeric(df, 'Views')
+        # Topic_Modeling 과 같은 정의: 공감 + 비공감 + log(1 + 조회수)
+        engagement = good + bad + np.log1p(np.maximum(views, 0))
+        mentions = df['Title'].notna().to_numpy() if 'Title' in df.columns else np.ones(n, dtype=bool)
+
+        work = pd.DataFrame({
+            'day': day[ok], 'code': code_id[ok],
+            # 결측(-1)은 NaN 으로 둬서 'first' 가 건너뛰게 (aggregate_posts 와 같은 동작)
+            'stock': np.where(stock_id < 0, np.nan, stock_id)[ok].astype(np.float32),
+            'type': np.where(type_id < 0, np.nan, type_id)[ok].astype(np.float32),
+            'positive': ((label == 0) & once)[ok].astype(np.int32),
+            'negative': ((label == 1) & once)[ok].astype(np.int32),
+            'neutral': ((label == 2) & once)[ok].astype(np.int32),
+            'labeled': once[ok].astype(np.int32),
+            'mentions': mentions[ok].astype(np.int32),
+            'engagement': engagement[ok],
+        })
+        part = self._fold(work.groupby(['day', 'code'], sort=False))
+        if self.totals is not None:
+            part = self._fold(pd.concat([self.totals, part]).groupby(level=[0, 1], sort=False))
+        self.totals = part
+
+        if 'Link' in df.columns:
+            self.has_link = True
+            latest = pd.Series(_link_nids(df['Link']).to_numpy(), index=code_id).dropna()
+            latest = latest[latest.index >= 0]
+            for cid, value in latest.groupby(level=0).max().items():
+                self.nids[cid] = max(int(value), self.nids.get(cid, 0))
+
+    @staticmethod
+    def _fold(grouped):
+        agg = grouped.agg(stock=('stock', 'first'), type=('type', 'first'),
+                          **{c: (c, 'sum') for c in COUNT_COLS}, engagement=('engagement', 'sum'))
+        agg[COUNT_COLS] = agg[COUNT_COLS].astype(np.int32)
+        return agg
+
+    def result(self):
+        """집계 표 (STORE_COLS, aggregate_posts 와 같은 모양)"""
+        if self.totals is None or self.totals.empty:
+            return pd.DataFrame(columns=STORE_COLS)
+        t = self.totals.reset_index()
+        out = pd.DataFrame({
+            'Date': pd.to_datetime(t['day']).dt.date,
+            'Code': np.array(list(self.codes), dtype=object)[t['code'].to_numpy()],
+            'Stock': _id_names(t['stock'].to_numpy(), self.stocks),
+            'Type': _id_names(t['type'].to_numpy(), self.types),
+            **{c: t[c].to_numpy() for c in COUNT_COLS},
+            'engagement': t['engagement'].to_numpy(),
+        })
+        return out.sort_values(KEY_COLS, kind='stable').reset_index(drop=True)[STORE_COLS]
+
+    def watermarks(self):
+        names = list(self.codes)
+        return {names[cid]: nid for cid, nid in self.nids.items()}
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS, encoding='utf-8-sig', columns=SOURCE_COLS):
+    """라벨링 CSV 를 columns 중 있는 컬럼만 chunk_rows 행씩 읽음"""
+    # low_memory=False: 청크 하나를 통째로 타입 추론 (청크 안에서 다시 쪼개지 않음)
+    return pd.read_csv(path, usecols=lambda c: c in columns, dtype=CHUNK_DTYPES, encoding=encoding,
+                       chunksize=chunk_rows, low_memory=False)
+
+
+def aggregate_csv(path, chunk_rows=CHUNK_ROWS, encoding='utf-8-sig', columns=SOURCE_COLS):
+    """라벨링 CSV 전체 -> 집계 표 (청크 단위, 메모리 상한). 반환: ChunkedAggregator (result() 로 표)"""
+    acc = ChunkedAggregator()
+    for chunk in read_chunks(path, chunk_rows, encoding, columns):
+        acc.add(chunk)
+    return acc
+
+
+def combine(store, delta):
+    """두 집계 표를 더함 (같은 (Date, Code) 는 건수/engagement 합산)"""
+    if store is None or store.empty:
+        return delta.reset_index(drop=True)
+    if delta.empty:
+        return store
+
+    both = pd.concat([store, delta], ignore_index=True)
+    out = both.groupby(KEY_COLS, sort=True).agg(
+        Stock=('Stock', 'last'),
+        Type=('Type', 'last'),
+        **{c: (c, 'sum') for c in COUNT_COLS},
+        engagement=('engagement', 'sum'),
+    ).reset_index()
+    return out[STORE_COLS]
+
+
+# ==========================================
+# 2. 저장소 읽기/쓰기
+# ==========================================
+def load_store(path=STORE_FILE):
+    if not os.path.exists(path):
+        return None
+    store = pd.read_csv(path, dtype={'Code': str}, encoding='utf-8-sig')
+    store['Date'] = pd.to_datetime(store['Date']).dt.date
+    return store
+
+
+def save_store(store, path=STORE_FILE):
+    tmp = path + ".tmp"
+    store.sort_values(KEY_COLS).to_csv(tmp, index=False, encoding='utf-8-sig')
+    os.replace(tmp, path)
+
+
+# ==========================================
+# 3. 증분 반영 / 날짜 재계산
+# ==========================================
+def _already_merged(nid, codes, watermarks):
+    """종목 워터마크 이하 nid 의 글 (이미 저장소에 반영한 글, numpy bool)"""
+    wm = pd.to_numeric(codes.astype('string').str.zfill(6).map(watermarks), errors='coerce')
+    return (nid.notna() & wm.notna() & (nid <= wm)).to_numpy(dtype=bool)
+
+
+def _recount(store, merged):
+    """
+    merged: 이미 반영한 글만 지금 파일 기준으로 다시 집계한 표.
+    (Date, Code) 의 글이 파일에 모두 남아 있으면 (mentions 가 같으면) 감성 건수를 다시 센 값으로 바꿈.
+    나중 글이 두 묶음을 이어 붙여 대표에서 빠진 글을 빼기 위함 (빠진 글이 없으면 값이 같아 그대로).
+    반환: (저장소, 고친 (Date, Code) 수)
+    """
+    if store is None or store.empty or merged.empty:
+        return store, 0
+    counts = ['positive', 'negative', 'neutral', 'labeled']
+    cur = store.set_index(KEY_COLS)
+    new = merged.set_index(KEY_COLS).reindex(cur.index)
+    fix = (new['mentions'] == cur['mentions']) & (new[counts] != cur[counts]).any(axis=1)
+    if not fix.any():
+        return store, 0
+    cur.loc[fix, counts] = new.loc[fix, counts].astype(cur[counts].dtypes.iloc[0])
+    return cur.reset_index()[STORE_COLS], int(fix.sum())
+
+
+def merge_labeled(labeled_df, path=STORE_FILE):
+    """
+    새 라벨링 결과를 저장소에 더합니다.
+    종목별로 이미 반영한 nid 보다 큰 글만 더하고, Link 에 nid 가 없는 글은 그대로 더합니다.
+    이미 반영한 글은 _recount() 로 준복제 대표가 바뀐 (Date, Code) 의 감성 건수만 고칩니다.
+    반환: (갱신된 저장소, 이번에 반영한 게시글 수)
+    """
+    store = load_store(path)
+    watermarks = crawl_state.load_watermarks(state_path(path)) if store is not None else {}
+
+    df = labeled_df
+    if watermarks and 'Link' in df.columns:
+        old = _already_merged(df['Link'].map(crawl_state.extract_nid).astype('float64'), df['Code'], watermarks)
+        store, _ = _recount(store, aggregate_posts(df[old]))
+        df = df[~old]
+
+    store = combine(store, aggregate_posts(df))
+    save_store(store, path)
+    if 'Link' in df.columns:
+        crawl_state.save_watermarks(crawl_state.update_watermarks(watermarks, df), state_path(path))
+    return store, len(df)
+
+
+def merge_chunks(chunks, path=STORE_FILE):
+    """
+    merge_labeled() 의 청크 버전: 게시글 청크마다 워터마크로 걸러서 집계에 더함 (전체를 메모리에 올리지 않음).
+    새 글 / 이미 반영한 글(_recount 용) 집계를 따로 모으므로 메모리는 청크 하나 + 집계 표 2개
+    """
+    store = load_store(path)
+    watermarks = crawl_state.load_watermarks(state_path(path)) if store is not None else {}
+
+    acc, merged = ChunkedAggregator(), ChunkedAggregator()
+    added = 0
+    for chunk in chunks:
+        if watermarks and 'Link' in chunk.columns:
+            old = _already_merged(_link_nids(chunk['Link']), chunk['Code'], watermarks)
+            merged.add(chunk[old])
+            chunk = chunk[~old]
+        acc.add(chunk)
+        added += len(chunk)
+
+    store, _ = _recount(store, merged.result())
+    store = combine(store, acc.result())
+    save_store(store, path)
+    if acc.has_link:
+        merged = dict(watermarks)
+        for code, nid in acc.watermarks().items():
+            merged[code] = max(nid, merged.get(code, 0))
+        crawl_state.save_watermarks(merged, state_path(path))
+    return store, added
+
+
+def merge_labeled_csv(labeled_csv, path=STORE_FILE, chunk_rows=CHUNK_ROWS, encoding='utf-8-sig'):
+    """라벨링 CSV 를 chunk_rows 행씩 읽어서 merge_chunks()"""
+    return merge_chunks(read_chunks(labeled_csv, chunk_rows, encoding), path)
+
+
+def rebuild_days(day_posts, path=STORE_FILE):
+    """
+    day_posts 에 들어있는 날짜들만 집계를 새로 계산해서 교체합니다.
+    (해당 날짜의 게시글 전부를 넘겨야 함 - 비용은 그 날짜 행 수만큼)
+    """
+    fresh = aggregate_posts(day_posts)
+    store = load_store(path)
+    if store is not None:
+        store = store[~store['Date'].isin(set(fresh['Date']))]
+    store = combine(store, fresh)
+    save_store(store, path)
+    return store
+
+
+def load_or_build(labeled_csv, path=STORE_FILE):
+    """저장소가 있으면 그대로, 없으면 라벨링 CSV 로 처음 만듭니다."""
+    store = load_store(path)
+    if store is not None:
+        return store
+    if dataset_store.exists("labeled"):
+        print(">> 집계 저장소가 없어 Parquet 라벨링 테이블로 새로 생성합니다...")
+        store, _ = merge_chunks(dataset_store.iter_table("labeled", columns=SOURCE_COLS, batch_rows=CHUNK_ROWS), path)
+    elif os.path.exists(labeled_csv):
+        print(f">> 집계 저장소가 없어 {labeled_csv} 로 새로 생성합니다 (청크 {CHUNK_ROWS}행씩)...")
+        store, _ = merge_labeled_csv(labeled_csv, path)
+    else:
+        return None
+    return store
+
+
+# ==========================================
+# 4. 소비자용 변환
+# ==========================================
+def positive_ratio(store):
+    """긍정 / (긍정 + 부정), 중립 제외. 둘 다 0 이면 0.0 (accuracy_modeling 기존 정의)"""
+    total = store['positive'] + store['negative']
+    return (store['positive'] / total.where(total > 0, 1)).where(total > 0, 0.0)
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "stock_community_labeled.csv"
+    store, added = merge_labeled_csv(src)
+    print(f"✅ 집계 저장소 갱신: 새 게시글 {added}건 반영 / (날짜, 종목) {len(store)}행 -> {STORE_FILE}")
@@ -1,11 +1,20 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import yfinance as yf
 import FinanceDataReader as fdr
 import time
+import os
+import sys
+import asyncio
+import aiohttp
 from tqdm import tqdm
 
+import crawl_state
+import naver_extract
+import dataset_store
+import price_service
+import rate_control
+import run_metrics
+
 # ==========================================
 # 1. 설정 (Configuration)
 # ==========================================
@@ -13,6 +22,25 @@ TOP_N = 80            # 상위 80개 기업
 DEFAULT_PAGES = 15    # 기본 15페이지
 HIGH_PAGES = 30       # 게시글 많은 종목(삼성전자, SK하이닉스)은 30페이지
 
+NAVER_BOARD_URL = "https://finance.naver.com/item/board.naver"
+NAVER_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+USE_ASYNC = True      # True: 비동기 병렬 수집 / False: 기존 순차 수집
+CONCURRENCY = 8       # 호스트당 동시 요청 수 (너무 높이면 차단 위험)
+ADAPTIVE_RATE = True  # True: 응답을 보고 초당 요청 수 조절 (rate_control.AimdThrottle) / False: 고정 딜레이
+FIXED_DELAY = 0.05    # ADAPTIVE_RATE=False 일 때 순차 수집의 요청 간 딜레이 (비동기는 딜레이 없음)
+
+INCREMENTAL = True    # True: 지난 수집 이후 새 글만 수집해서 기존 CSV 뒤에 추가
+COMMUNITY_CSV = "stock_community_data_top80.csv"
+PRICE_CSV = "stock_price_data_top80.csv"
+PRICE_PERIOD = "7d"
+PRICE_CACHE_FILE = price_service.CACHE_FILE
+
+USE_DATASET_STORE = True  # CSV 와 함께 data/ 아래 Parquet 저장소(dataset_store)에도 저장
+
+# HTML 추출 백엔드: "lxml"(C 파서, 기본) / "bs4-lxml" / "bs4"(html.parser)
+EXTRACTOR = naver_extract.get_extractor(naver_extract.DEFAULT_EXTRACTOR)
+
 # ==========================================
 # 2. 종목 리스트 확보 (국내 Top 80)
 # ==========================================
@@ -27,128 +55,332 @@ def get_kr_top_stocks():
         return kr_stocks
     except Exception as e:
         print(f"!! 리스트 확보 실패: {e}")
+        run_metrics.error("get_kr_top_stocks", e)
         return [{'Code': '005930', 'Name': '삼성전자'}]
 
 # ==========================================
 # 3. 커뮤니티 데이터 수집 (삼성전자, SK하이닉스 40p)
 # ==========================================
-def crawl_kr_community(stock_list):
+def get_target_pages(code):
+    # [핵심 수정] 삼성전자(005930)와 SK하이닉스(000660)는 40페이지 수집
+    if code in ['005930', '000660']:
+        return HIGH_PAGES
+    return DEFAULT_PAGES
+
+def parse_board_rows(html, name, code):
+    """
+    게시판 목록 페이지 HTML 한 장에서 게시글 행(dict) 리스트를 추출합니다.
+    type2 테이블이 없으면 None 을 반환합니다. (차단 혹은 데이터 없음)
+    """
+    t0 = time.perf_counter()
+    entries = EXTRACTOR.board_entries(html)
+    run_metrics.record_stage("parse", time.perf_counter() - t0, len(entries) if entries else 0)
+    if entries is None: return None
+
+    return [{
+        'Date': e['date'],
+        'Stock': name,
+        'Code': code,
+        'Type': 'Domestic',
+        'Title': e['title'],
+        'Good': e['good'],
+        'Bad': e['bad'],
+        'Views': e['views'],
+        'Link': "https://finance.naver.com" + e['href']
+    } for e in entries]
+
+def _make_throttle():
+    return rate_control.AimdThrottle() if ADAPTIVE_RATE else None
+
+def _page_result(code, rows, latency, status=None, error=None, throttle=None, url=None):
+    """응답 하나 -> (행 리스트 또는 None, 실패 사유 또는 None). 속도 조절기에 신호도 넘김"""
+    reason = rate_control.failure_reason(status, error, empty=rows is None)
+    if reason == "no_table":
+        run_metrics.observe_empty(code, url)
+    if reason is not None:
+        rows = None
+    if throttle is not None:
+        throttle.observe(latency, reason)
+    return rows, reason
+
+def _page_nid(rows):
+    return crawl_state.max_nid(row['Link'] for row in rows)
+
+def _assemble(stock_list, pages, watermarks):
+    """종목 순서, 페이지 순서대로 행을 합침 (재시도로 나중에 받은 페이지도 제자리에)"""
+    results = []
+    for stock in stock_list:
+        by_page = pages.get(stock['Code'], {})
+        for page in sorted(by_page):
+            rows, reached = crawl_state.split_new_rows(by_page[page], watermarks.get(stock['Code']))
+            results.extend(rows)
+            if reached: break
+    return results
+
+def _finish_report(df, report, throttle):
+    df.attrs["completeness"] = table = report.table()
+    if throttle is not None:
+        df.attrs["throttle"] = throttle.summary()
+    report.log()
+    rate_control.print_report(table, throttle)
+    incomplete = int((table["completeness"] < 1).sum()) if not table.empty else 0
+    if incomplete:
+        run_metrics.warn(f"수집 완료율 100% 미만 종목 {incomplete}개", echo=False)
+    return df
+
+def _get_board_page(base_url, stock, page, throttle):
+    code = stock['Code']
+    url = f"{base_url}?code={code}&page={page}"
+    if throttle is not None:
+        throttle.wait()
+    else:
+        time.sleep(FIXED_DELAY) # 차단 방지용 미세 딜레이
+    t0 = time.perf_counter()
+    try:
+        resp = requests.get(url, headers=NAVER_HEADERS, timeout=5)
+    except Exception as e:
+        latency = time.perf_counter() - t0
+        run_metrics.observe_http(code, latency, error=e, url=url)
+        return _page_result(code, None, latency, error=e, throttle=throttle, url=url)
+    latency = time.perf_counter() - t0
+    run_metrics.observe_http(code, latency, resp.status_code, url=url)
+    rows = parse_board_rows(resp.text, stock['Name'], code)
+    return _page_result(code, rows, latency, resp.status_code, throttle=throttle, url=url)
+
+def crawl_kr_community(stock_list, base_url=NAVER_BOARD_URL, watermarks=None, throttle=None, retry=None):
+    """
+    watermarks: {종목코드: 마지막으로 수집한 nid}. 주어지면 그보다 새 글만 모으고,
+    이미 수집한 글이 나온 페이지에서 해당 종목의 페이지 순회를 멈춥니다.
+    throttle / retry: rate_control.AimdThrottle / RetryQueue (없으면 설정값으로 생성)
+    차단/실패한 페이지는 전체 순회 뒤에 백오프로 다시 요청하고, 종목별 완료율은 df.attrs["completeness"]
+    """
     print(f"\n>> 국내 커뮤니티 데이터 수집 시작...")
     print(f"   - 삼성전자/SK하이닉스: {HIGH_PAGES}페이지 | 그 외: {DEFAULT_PAGES}페이지")
-    
-    results = []
-    base_url = "https://finance.naver.com/item/board.naver"
-    
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+    watermarks = watermarks or {}
+    throttle = throttle if throttle is not None else _make_throttle()
+    retry = retry if retry is not None else rate_control.RetryQueue()
+    report = rate_control.Completeness()
+    pages = {}
 
     for stock in tqdm(stock_list, desc="Community"):
+        code = stock['Code']
+        by_page = pages.setdefault(code, {})
+        for page in range(1, get_target_pages(code) + 1):
+            rows, reason = _get_board_page(base_url, stock, page, throttle)
+            if rows is None:
+                if not retry.push((stock, page), 1, reason):
+                    report.record(code, page, 1, reason)
+                continue
+            report.record(code, page, 1, nid=_page_nid(rows))
+            by_page[page] = rows
+            if crawl_state.split_new_rows(rows, watermarks.get(code))[1]: break # 이미 수집한 글에 도달 -> 다음 종목
+
+    # 재시도 대기열: 백오프 시간이 된 페이지부터 다시 요청
+    while len(retry):
+        time.sleep(retry.delay())
+        for (stock, page), attempts in retry.pop_ready():
+            rows, reason = _get_board_page(base_url, stock, page, throttle)
+            if rows is not None:
+                report.record(stock['Code'], page, attempts + 1, nid=_page_nid(rows))
+                pages[stock['Code']][page] = rows
+            elif not retry.push((stock, page), attempts + 1, reason):
+                report.record(stock['Code'], page, attempts + 1, reason)
+
+    return _finish_report(pd.DataFrame(_assemble(stock_list, pages, watermarks)), report, throttle)
+
+# ------------------------------------------
+# 3-1. 비동기 병렬 수집 (aiohttp)
+#      - 하나의 세션(커넥션 풀)을 모든 요청이 공유
+#      - limit_per_host 로 호스트당 동시 요청 수 제한, 그 안에서 AIMD 로 초당 요청 수 조절
+#      - 결과는 (종목 순서, 페이지 순서) 그대로 합쳐서 순차 수집과 동일한 DataFrame 생성
+#      - 워터마크가 있는 종목은 페이지를 앞에서부터 차례로 읽다가 기존 글에서 멈춤
+# ------------------------------------------
+async def _fetch_board_page(session, sem, throttle, base_url, stock, page):
+    code = stock['Code']
+    url = f"{base_url}?code={code}&page={page}"
+    # 세마포어 = 연결 수 -> 시간은 연결 풀에서 기다린 뒤부터 (응답 지연만 잼)
+    async with sem:
+        if throttle is not None:
+            await throttle.wait_async()
+        t0 = time.perf_counter()
         try:
-            code = stock['Code']
-            name = stock['Name']
-            
-            # [핵심 수정] 삼성전자(005930)와 SK하이닉스(000660)는 40페이지 수집
-            if code in ['005930', '000660']:
-                target_pages = HIGH_PAGES
-            else:
-                target_pages = DEFAULT_PAGES
-            
-            for page in range(1, target_pages + 1):
-                resp = requests.get(f"{base_url}?code={code}&page={page}", headers=headers, timeout=5)
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                table = soup.find('table', {'class': 'type2'})
-                if not table: continue
-                
-                for row in table.find_all('tr'):
-                    title_td = row.find('td', {'class': 'title'})
-                    if title_td:
-                        link_tag = title_td.find('a')
-                        if not link_tag: continue
-                        
-                        tds = row.find_all('td')
-                        if len(tds) >= 6:
-                            results.append({
-                                'Date': tds[0].get_text(strip=True),
-                                'Stock': name,
-                                'Code': code,
-                                'Type': 'Domestic',
-                                'Title': link_tag.get_text(strip=True),
-                                'Good': tds[4].get_text(strip=True),
-                                'Bad': tds[5].get_text(strip=True),
-                                'Views': tds[3].get_text(strip=True),
-                                'Link': "https://finance.naver.com" + link_tag['href']
-                            })
-                time.sleep(0.05) # 차단 방지용 미세 딜레이
-        except Exception:
-            continue
-
-    return pd.DataFrame(results)
+            async with session.get(base_url, params={'code': code, 'page': page}) as resp:
+                html = await resp.text(errors='replace')
+                status = resp.status
+        except Exception as e:
+            latency = time.perf_counter() - t0
+            run_metrics.observe_http(code, latency, error=e, url=url)
+            return _page_result(code, None, latency, error=e, throttle=throttle, url=url)
+        latency = time.perf_counter() - t0
+        run_metrics.observe_http(code, latency, status, url=url)
+    rows = parse_board_rows(html, stock['Name'], code)
+    return _page_result(code, rows, latency, status, throttle=throttle, url=url)
+
+async def _crawl_stock_async(session, sem, throttle, base_url, stock, watermark, retry, report):
+    """반환: {페이지: 행 리스트} (실패한 페이지는 retry 에 넣음)"""
+    code = stock['Code']
+    target_pages = get_target_pages(code)
+    by_page = {}
+
+    def handle(page, result):
+        rows, reason = result
+        if rows is None:
+            if not retry.push((stock, page), 1, reason):
+                report.record(code, page, 1, reason)
+            return False
+        report.record(code, page, 1, nid=_page_nid(rows))
+        by_page[page] = rows
+        return crawl_state.split_new_rows(rows, watermark)[1]
+
+    # 워터마크 없음 -> 전체 페이지를 한 번에 병렬 요청
+    if not watermark:
+        results = await asyncio.gather(*[
+            _fetch_board_page(session, sem, throttle, base_url, stock, page)
+            for page in range(1, target_pages + 1)
+        ])
+        for page, result in enumerate(results, start=1):
+            handle(page, result)
+        return by_page
+
+    # 워터마크 있음 -> 기존 글이 나올 때까지만 순서대로
+    for page in range(1, target_pages + 1):
+        if handle(page, await _fetch_board_page(session, sem, throttle, base_url, stock, page)): break
+    return by_page
+
+async def _drain_retries(session, sem, throttle, base_url, retry, pages, report):
+    # 백오프 시간이 된 페이지끼리 묶어서 다시 요청, 또 실패하면 다음 백오프로
+    while len(retry):
+        await asyncio.sleep(retry.delay())
+        batch = retry.pop_ready()
+        results = await asyncio.gather(*[
+            _fetch_board_page(session, sem, throttle, base_url, stock, page) for (stock, page), _ in batch
+        ])
+        for ((stock, page), attempts), (rows, reason) in zip(batch, results):
+            if rows is not None:
+                report.record(stock['Code'], page, attempts + 1, nid=_page_nid(rows))
+                pages[stock['Code']][page] = rows
+            elif not retry.push((stock, page), attempts + 1, reason):
+                report.record(stock['Code'], page, attempts + 1, reason)
+
+async def _crawl_kr_community_async(stock_list, base_url, concurrency, watermarks, throttle, retry, report):
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    timeout = aiohttp.ClientTimeout(total=5)
+    sem = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, headers=NAVER_HEADERS, timeout=timeout) as session:
+        with tqdm(total=len(stock_list), desc="Community(async)") as bar:
+            futures = [
+                asyncio.ensure_future(_crawl_stock_async(session, sem, throttle, base_url, stock,
+                                                         watermarks.get(stock['Code']), retry, report))
+                for stock in stock_list
+            ]
+            for f in futures:
+                f.add_done_callback(lambda _: bar.update(1))
+            per_stock = await asyncio.gather(*futures)
+
+        pages = {stock['Code']: by_page for stock, by_page in zip(stock_list, per_stock)}
+        await _drain_retries(session, sem, throttle, base_url, retry, pages, report)
+
+    return _assemble(stock_list, pages, watermarks)
+
+def crawl_kr_community_async(stock_list, base_url=NAVER_BOARD_URL, concurrency=CONCURRENCY, watermarks=None,
+                             throttle=None, retry=None):
+    print(f"\n>> 국내 커뮤니티 데이터 수집 시작 (비동기, 동시 요청 {concurrency}개)...")
+    print(f"   - 삼성전자/SK하이닉스: {HIGH_PAGES}페이지 | 그 외: {DEFAULT_PAGES}페이지")
+
+    throttle = throttle if throttle is not None else _make_throttle()
+    retry = retry if retry is not None else rate_control.RetryQueue()
+    report = rate_control.Completeness()
+    results = asyncio.run(_crawl_kr_community_async(stock_list, base_url, concurrency, watermarks or {},
+                                                    throttle, retry, report))
+    return _finish_report(pd.DataFrame(results), report, throttle)
 
 # ==========================================
 # 4. 주가 데이터 수집 (기존 로직 유지)
 # ==========================================
-def get_price_data(kr_stocks):
+def get_price_data(kr_stocks, service=None):
+    # 여러 종목을 묶어서 요청하고, 캐시에 이미 있는 시간봉은 다시 받지 않음
     print(f"\n>> 주가 데이터 수집 시작...")
-    all_data = []
-
-    for stock in tqdm(kr_stocks, desc="Price"):
-        try:
-            ticker = f"{stock['Code']}.KS"
-            # 7일치, 1시간 간격 데이터 (정확도 산출용)
-            df = yf.download(ticker, period="7d", interval="1h", progress=False)
-            
-            if not df.empty:
-                # 컬럼 정리
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = df.columns.get_level_values(0)
-                
-                df.reset_index(inplace=True)
-                df = df.loc[:, ~df.columns.duplicated()] # 중복 컬럼 제거
-
-                # 날짜 컬럼명 통일
-                if 'Date' not in df.columns and 'index' in df.columns:
-                    df.rename(columns={'index': 'Date'}, inplace=True)
-                elif 'Datetime' in df.columns: 
-                    df.rename(columns={'Datetime': 'Date'}, inplace=True)
-                elif df.index.name == 'Date' or df.index.name == 'Datetime':
-                    df.reset_index(inplace=True) # 인덱스가 Date인 경우
-                    if 'index' in df.columns: df.rename(columns={'index': 'Date'}, inplace=True)
-
-                df['Stock'] = stock['Name']
-                df['Code'] = stock['Code']
-                df['Type'] = 'Domestic'
-                
-                # 필요한 컬럼만 추출
-                cols = ['Date', 'Stock', 'Code', 'Open', 'High', 'Low', 'Close', 'Volume']
-                valid_cols = [c for c in cols if c in df.columns]
-                all_data.append(df[valid_cols])
-        except: continue
-
-    if all_data:
-        merged = pd.concat(all_data, ignore_index=True)
-        return merged
-    
-    return pd.DataFrame()
+    owns = service is None
+    if owns:
+        service = price_service.PriceService(cache=price_service.PriceCache(PRICE_CACHE_FILE))
+    try:
+        # 7일치, 1시간 간격 데이터 (정확도 산출용)
+        df = service.get_prices(kr_stocks, period=PRICE_PERIOD)
+    finally:
+        if owns: service.close()
+    price_service.print_stats(service.stats)
+    return df
 
 # ==========================================
 # 5. 실행 및 저장
 # ==========================================
-if __name__ == "__main__":
-    # 1. 리스트 확보 (Top 80)
-    kr_list = get_kr_top_stocks()
-    
-    # 2. 커뮤니티 데이터 (삼성전자/하이닉스 40p, 나머지 20p)
-    df_comm = crawl_kr_community(kr_list)
+def run_community(kr_list):
+    # 커뮤니티 데이터 (삼성전자/하이닉스 40p, 나머지 20p)
+    #    증분 모드: 기존 CSV 가 있을 때만 워터마크 사용 (CSV 없이 상태만 남은 경우는 전체 수집)
+    watermarks = {}
+    if INCREMENTAL and os.path.exists(COMMUNITY_CSV):
+        watermarks = crawl_state.load_watermarks() or crawl_state.watermarks_from_csv(COMMUNITY_CSV)
+        print(f"   - 증분 수집: 워터마크 {len(watermarks)}개 종목")
+
+    with run_metrics.stage("crawl_community") as s:
+        if USE_ASYNC:
+            df_comm = crawl_kr_community_async(kr_list, watermarks=watermarks)
+        else:
+            df_comm = crawl_kr_community(kr_list, watermarks=watermarks)
+        s["items"] = len(df_comm)
     
+    # 못 받은 페이지가 있는 종목은 빈틈 없이 받은 글까지만 저장 (워터마크가 빠진 페이지를 건너뛰지 않도록)
+    df_comm, held = crawl_state.gap_free_rows(df_comm, df_comm.attrs.get("completeness"))
+    if held:
+        print(f"   - 빠진 페이지가 있는 종목: 그보다 새 글 {held}건은 다음 실행에서 다시 수집")
+
     if not df_comm.empty:
-        df_comm.to_csv("stock_community_data_top80.csv", index=False, encoding="utf-8-sig")
-        print(f"✅ 커뮤니티 데이터 저장 완료: {len(df_comm)}건 (파일명: stock_community_data_top80.csv)")
+        if watermarks:
+            crawl_state.append_csv(df_comm, COMMUNITY_CSV)
+        else:
+            df_comm.to_csv(COMMUNITY_CSV, index=False, encoding="utf-8-sig")
+        if USE_DATASET_STORE:
+            dataset_store.write_table("community", df_comm, mode="append" if watermarks else "overwrite")
+        # CSV 저장이 끝난 뒤에 워터마크 갱신 (중간에 실패하면 다음 실행에서 다시 수집)
+        crawl_state.save_watermarks(crawl_state.update_watermarks(watermarks, df_comm))
+        print(f"✅ 커뮤니티 데이터 저장 완료: {len(df_comm)}건 (파일명: {COMMUNITY_CSV})")
+    elif watermarks:
+        print("✅ 새 게시글 없음")
     else:
         print("❌ 커뮤니티 데이터 수집 실패")
 
-    # 3. 주가 데이터 (Top 80)
-    df_price = get_price_data(kr_list)
+
+def run_prices(kr_list):
+    with run_metrics.stage("prices") as s:
+        df_price = get_price_data(kr_list)
+        s["items"] = len(df_price)
     if not df_price.empty:
-        df_price.to_csv("stock_price_data_top80.csv", index=False, encoding="utf-8-sig")
-        print(f"✅ 주가 데이터 저장 완료: {len(df_price)}건 (파일명: stock_price_data_top80.csv)")
+        df_price.to_csv(PRICE_CSV, index=False, encoding="utf-8-sig")
+        if USE_DATASET_STORE:
+            # 받아온 날짜 파티션만 기존 봉과 합침 (PRICE_PERIOD 의 첫날은 일부 봉만 오므로 교체하면 지난 봉이 지워짐)
+            dataset_store.write_table("price", df_price, mode="upsert")
+        print(f"✅ 주가 데이터 저장 완료: {len(df_price)}건 (파일명: {PRICE_CSV})")
     else:
-        print("❌ 주가 데이터 수집 실패")
\ No newline at end of file
+        print("❌ 주가 데이터 수집 실패")
+
+
+# python data_crawling.py            -> 커뮤니티 + 주가
+# python data_crawling.py community  -> 커뮤니티만 / prices -> 주가만 (pipeline.py 가 두 단계를 동시에 실행)
+if __name__ == "__main__":
+    targets = sys.argv[1:] or ["community", "prices"]
+    run_metrics.start_run("data_crawling_" + "_".join(targets))
+
+    # 1. 리스트 확보 (Top 80)
+    kr_list = get_kr_top_stocks()
+
+    # 2. 커뮤니티 데이터
+    if "community" in targets:
+        run_community(kr_list)
+
+    # 3. 주가 데이터 (Top 80)
+    if "prices" in targets:
+        run_prices(kr_list)
+
+    run_metrics.finish_run()
@@ -0,0 +1,285 @@
+"""
+단계 간 데이터 교환용 컬럼형(Parquet) 저장소.
+
+CSV 대신 타입이 정해진 Parquet 파일을 날짜별 파티션(day=YYYY-MM-DD)으로 저장합니다.
+  - 읽을 때 필요한 컬럼만 읽기 (columns=...)
+  - 날짜/종목 조건은 파티션 가지치기 + row group 통계로 걸러서 읽기 (start/end/codes)
+  - 날짜/숫자 파싱은 저장할 때 한 번만
+
+테이블: community(수집 게시글), labeled(라벨링 결과), price(시간봉), daily_results(Topic 결과)
+
+    write_table("labeled", df)                                  # 전체 교체
+    write_table("community", new_rows, mode="append")           # 증분 추가
+    write_table("price", recent_bars, mode="upsert")            # 같은 (Code, Date) 만 새 값으로
+    read_table("labeled", columns=["Date", "Code", "sentiment_label"], start="2025-12-01", codes=["005930"])
+
+기존 CSV 를 한 번에 옮기려면:
+    python dataset_store.py import
+"""
+import os
+import shutil
+import sys
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# 어느 폴더에서 실행해도 같은 저장소를 쓰도록 저장소 위치는 이 파일 기준
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+PARTITION_COL = "day"
+
+TABLES = {
+    "community": pa.schema([
+        ("Date", pa.timestamp("s")),
+        ("Stock", pa.string()),
+        ("Code", pa.string()),
+        ("Type", pa.string()),
+        ("Title", pa.string()),
+        ("Content", pa.string()),
+        ("Good", pa.int32()),
+        ("Bad", pa.int32()),
+        ("Views", pa.int32()),
+        ("Link", pa.string()),
+    ]),
+    "price": pa.schema([
+        ("Date", pa.timestamp("s", tz="UTC")),
+        ("Stock", pa.string()),
+        ("Code", pa.string()),
+        ("Open", pa.float64()),
+        ("High", pa.float64()),
+        ("Low", pa.float64()),
+        ("Close", pa.float64()),
+        ("Volume", pa.int64()),
+    ]),
+    "daily_results": pa.schema([
+        ("Date", pa.date32()),
+        ("Code", pa.string()),
+        ("mentions", pa.int32()),
+        ("engagement", pa.float64()),
+        ("mentions_7d_ma", pa.float64()),
+        ("daily_growth", pa.float64()),
+        ("weekly_growth", pa.float64()),
+        ("log_weight", pa.float64()),
+        ("popularity", pa.float64()),
+        ("valid", pa.bool_()),
+    ]),
+}
+TABLES["labeled"] = TABLES["community"] \
+    .append(pa.field("sentiment_label", pa.string())) \
+    .append(pa.field("sentiment_score", pa.float32())) \
+    .append(pa.field("dup_cluster", pa.int64())) \
+    .append(pa.field("dup_count", pa.int32())) \
+    .append(pa.field("dup_rep", pa.bool_()))
+
+# upsert 때 같은 행으로 보는 컬럼
+KEY_COLUMNS = {
+    "community": ["Link"],
+    "labeled": ["Link"],
+    "price": ["Code", "Date"],
+    "daily_results": ["Code", "Date"],
+}
+
+# 기존 CSV -> 테이블 (python dataset_store.py import)
+CSV_SOURCES = {
+    "community": "stock_community_data_top80.csv",
+    "labeled": "stock_community_labeled.csv",
+    "price": "stock_price_data_top80.csv",
+    "daily_results": os.path.join("Topic_Modeling", "daily_results.csv"),
+}
+
+
+def table_path(name, root=DATA_DIR):
+    return os.path.join(root, name)
+
+
+def exists(name, root=DATA_DIR):
+    path = table_path(name, root)
+    return os.path.isdir(path) and any(f.endswith(".parquet") for _, _, fs in os.walk(path) for f in fs)
+
+
+# ==========================================
+# 1. CSV 형태 DataFrame -> 정해진 타입
+# ==========================================
+def _to_int(s, dtype):
+    return pd.to_numeric(s.astype(str).str.replace(",", ""), errors="coerce").fillna(0).astype(dtype)
+
+
+def _post_datetime(df):
+    dates = df["Date"].astype("string")
+    if "Time" in df.columns:  # Crawling/update_version1 형식 (Date, Time 분리)
+        dates = dates + " " + df["Time"].astype("string").fillna("00:00:00")
+    dt = pd.to_datetime(dates, format="%Y.%m.%d %H:%M", errors="coerce")
+    rest = dt.isna() & dates.notna()
+    if rest.any():
+        dt[rest] = pd.to_datetime(dates[rest], errors="coerce", format="mixed")
+    return dt
+
+
+def normalize(name, df):
+    """CSV 에서 읽은(문자열 위주) DataFrame 을 테이블 스키마 타입으로 변환"""
+    schema = TABLES[name]
+    out = pd.DataFrame(index=df.index)
+
+    for field in schema:
+        col = field.name
+        if col not in df.columns:
+            if col == "Type":
+                out[col] = "Domestic"
+            elif pa.types.is_integer(field.type):
+                out[col] = 0
+            else:
+                out[col] = None
+            continue
+
+        s = df[col]
+        if col == "Date" and name in ("community", "labeled"):
+            out[col] = _post_datetime(df)
+        elif col == "Date" and name == "price":
+            out[col] = pd.to_datetime(s, errors="coerce", utc=True)
+        elif col == "Date":
+            out[col] = pd.to_datetime(s, errors="coerce").dt.date
+        elif col == "Code":
+            out[col] = s.astype(str).str.zfill(6)
+        elif pa.types.is_integer(field.type):
+            out[col] = _to_int(s, "int64")
+        elif pa.types.is_floating(field.type):
+            out[col] = pd.to_numeric(s, errors="coerce")
+        elif pa.types.is_boolean(field.type):
+            out[col] = s.astype(bool) if pd.api.types.is_bool_dtype(s) else s.astype(str).str.lower().eq("true")
+        else:
+            out[col] = s.astype("string").where(s.notna(), None)
+
+    return out.dropna(subset=["Date"]).reset_index(drop=True)
+
+
+def _partition_values(name, df):
+    d = pd.to_datetime(df["Date"])
+    if getattr(d.dt, "tz", None) is not None:
+        # 시간봉은 한국 거래일 기준으로 파티션
+        d = d.dt.tz_convert("Asia/Seoul").dt.tz_localize(None)
+    return d.dt.date
+
+
+# ==========================================
+# 2. 쓰기
+# ==========================================
+def write_table(name, df, mode="overwrite", root=DATA_DIR, normalized=False):
+    """
+    mode:
+      overwrite - 테이블 전체 교체
+      replace   - df 에 들어있는 날짜 파티션만 교체 (그 날짜의 행이 df 에 전부 있을 때)
+      upsert    - df 에 들어있는 날짜 파티션의 기존 행과 합쳐서 교체, 같은 KEY_COLUMNS 는 df 의 값으로
+                  (최근 N일처럼 가장 오래된 날짜의 일부만 받아오는 경우)
+      append    - 기존 파일은 두고 새 파일 추가 (증분 수집용)
+    """
+    schema = TABLES[name]
+    if not normalized:
+        df = normalize(name, df)
+    if df.empty:
+        return 0
+
+    df = df.copy()
+    df[PARTITION_COL] = _partition_values(name, df)
+    if mode == "upsert" and exists(name, root):
+        old = read_table(name, start=df[PARTITION_COL].min(), end=df[PARTITION_COL].max(), root=root)
+        old[PARTITION_COL] = _partition_values(name, old)
+        old = old[old[PARTITION_COL].isin(set(df[PARTITION_COL]))]
+        df = pd.concat([old, df], ignore_index=True).drop_duplicates(KEY_COLUMNS[name], keep="last")
+
+    table = pa.Table.from_pandas(
+        df, schema=schema.append(pa.field(PARTITION_COL, pa.date32())), preserve_index=False
+    )
+
+    path = table_path(name, root)
+    if mode == "overwrite" and os.path.isdir(path):
+        shutil.rmtree(path)
+
+    ds.write_dataset(
+        table, path, format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTITION_COL, pa.date32())]), flavor="hive"),
+        basename_template=f"part-{int(time.time())}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if mode in ("replace", "upsert") else "overwrite_or_ignore",
+        max_rows_per_group=256 * 1024,
+    )
+    return len(df)
+
+
+# ==========================================
+# 3. 읽기 (컬럼 선택 + 날짜/종목 조건)
+# ==========================================
+def _as_date(value):
+    return pd.Timestamp(value).date() if value is not None else None
+
+
+def _dataset(name, root=DATA_DIR):
+    schema = TABLES[name].append(pa.field(PARTITION_COL, pa.date32()))
+    return ds.dataset(
+        table_path(name, root), format="parquet", schema=schema,
+        partitioning=ds.partitioning(pa.schema([(PARTITION_COL, pa.date32())]), flavor="hive"),
+    )
+
+
+def read_table(name, columns=None, start=None, end=None, codes=None, root=DATA_DIR):
+    """
+    start/end: 파티션 날짜 범위 (end 포함). codes: 종목코드 리스트.
+    조건은 파일을 읽기 전에 적용돼서 필요한 파티션/row group 만 읽습니다.
+    """
+    dataset = _dataset(name, root)
+
+    expr = None
+    conds = []
+    if start is not None:
+        conds.append(ds.field(PARTITION_COL) >= _as_date(start))
+    if end is not None:
+        conds.append(ds.field(PARTITION_COL) <= _as_date(end))
+    if codes is not None:
+        conds.append(ds.field("Code").isin([str(c).zfill(6) for c in codes]))
+    for c in conds:
+        expr = c if expr is None else expr & c
+
+    cols = columns or [f.name for f in TABLES[name]]
+    table = dataset.to_table(columns=cols, filter=expr)
+    return table.to_pandas()
+
+
+def iter_table(name, columns=None, batch_rows=500_000, root=DATA_DIR):
+    """read_table 처럼 읽되 batch_rows 행 이하씩 DataFrame 으로 (전체를 메모리에 올리지 않음)"""
+    cols = [c for c in (columns or [f.name for f in TABLES[name]]) if c in TABLES[name].names]
+    for batch in _dataset(name, root).to_batches(columns=cols, batch_size=batch_rows):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+# ==========================================
+# 4. 기존 CSV 한 번에 옮기기
+# ==========================================
+def read_csv_any(path, **kwargs):
+    encodings = ["utf-8-sig", "cp949", "euc-kr"]
+    for enc in encodings:
+        try:
+            return pd.read_csv(path, encoding=enc, **kwargs)
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise ValueError(f"인코딩을 알 수 없는 파일: {path} (시도: {', '.join(encodings)})") from last_error
+
+
+def import_csvs(sources=None, root=DATA_DIR):
+    sources = sources or CSV_SOURCES
+    for name, path in sources.items():
+        if not os.path.exists(path):
+            print(f"   - [{name}] 건너뜀 (파일 없음: {path})")
+            continue
+        df = read_csv_any(path, dtype=str, keep_default_na=False, na_values=[""])
+        n = write_table(name, df, mode="overwrite", root=root)
+        print(f"   - [{name}] {path} -> {table_path(name, root)} ({n}행)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        print(">> 기존 CSV 를 Parquet 저장소로 변환 중...")
+        import_csvs()
+        print("✅ 변환 완료")
+    else:
+        print(__doc__)
@@ -0,0 +1,274 @@
+"""
+준복제/도배 게시글 묶기 (수집 -> 라벨링 사이 단계).
+
+종목토론실/토스 커뮤니티에는 같은 글을 조금씩 바꿔 반복해서 올린 도배글이 많습니다.
+제목/본문이 거의 같은 글을 묶음(cluster)으로 묶어서
+  - 라벨링은 묶음 대표(가장 먼저 나온 글) 하나만 모델에 넣고 결과를 묶음 전체에 복사
+  - dup_cluster(대표 글의 행 번호) / dup_count(묶음 크기) / dup_rep(대표 글 여부) 컬럼을 남겨서
+    daily_agg 가 묶음 전체를 감성 1건(대표 글)으로 셀 수 있게 합니다.
+묶음은 같은 (종목, 날짜) 안에서만 만듭니다 (GROUP_COLUMNS). "매수" 같은 흔한 제목이 다른 종목/날짜에
+올라와도 그 (날짜, 종목)의 감성 건수에서 빠지지 않도록.
+
+방식 (글 수에 대해 선형, 글끼리 전부 비교하지 않음):
+  1) 공백/기호 제거, 소문자화 후 글자 SHINGLE-gram 집합
+  2) MinHash 서명 NUM_PERM 개 (numpy 로 블록 단위 계산, 완전히 같은 글은 한 번만)
+  3) LSH: 서명을 BANDS 개 구간으로 나눠 구간이 같은 글끼리만 후보
+  4) 후보는 서명 일치 비율(≈ Jaccard)이 THRESHOLD 이상일 때만 연결, 연결 요소 = 묶음
+
+    python dedup.py stock_community_data_top80.csv          # 묶음 리포트
+    python dedup.py toss_crawled.csv toss_dedup.csv         # dup_cluster / dup_count 붙여 저장
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+import daily_agg
+
+TEXT_COLUMNS = ("Title", "Content")   # 있는 컬럼만 이어 붙여서 비교
+GROUP_COLUMNS = ("Code", "Date")      # 이 값(Date 는 날짜 단위)이 같은 글끼리만 묶음 (둘 다 있을 때)
+SHINGLE = 3             # 글자 n-gram 길이
+NUM_PERM = 64           # MinHash 서명 길이
+BANDS = 16              # LSH 구간 수 (구간당 NUM_PERM // BANDS 개), 후보 기준 Jaccard ≈ (1/BANDS)^(BANDS/NUM_PERM)
+THRESHOLD = 0.6         # 같은 묶음으로 볼 추정 Jaccard 하한 (글자 하나 바뀌면 shingle 3개가 달라짐)
+MAX_CHARS = 300         # 긴 본문은 앞부분만 비교
+BLOCK_ROWS = 50000      # MinHash 계산 블록 (메모리 상한)
+SEED = 1
+
+
+# ==========================================
+# 1. 텍스트 -> shingle 해시
+# ==========================================
+def post_texts(df, columns=TEXT_COLUMNS):
+    """df 에 있는 columns 를 이어 붙인 비교용 텍스트 (Series)"""
+    cols = [c for c in columns if c in df.columns]
+    if not cols:
+        raise ValueError(f"중복 비교에 쓸 컬럼이 없습니다: {list(columns)}")
+    text = df[cols[0]].fillna("").astype(str)
+    for c in cols[1:]:
+        text = text + " " + df[c].fillna("").astype(str)
+    return text
+
+
+def normalize_texts(texts, max_chars=MAX_CHARS):
+    # 띄어쓰기/기호/이모지만 바꾼 도배글이 같아지도록 글자(한글/영문/숫자)만 남김
+    # (\w 는 pyarrow 문자열에서 ASCII 만 뜻하므로 범위를 직접 씀)
+    s = pd.Series(texts, dtype="string").fillna("")
+    return s.str.lower().str.replace(r"[^0-9a-z가-힣ㄱ-ㅎㅏ-ㅣ]+", "", regex=True).str.slice(0, max_chars)
+
+
+def _mix(x):
+    # splitmix64 마무리 단계 (uint64, 넘침은 그대로 버림)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _shingle_hashes(texts, shingle=SHINGLE):
+    """
+    texts(list[str]) 전체의 shingle 해시를 한 배열로.
+    반환: (해시 uint64, 글마다 shingle 수) - 빈 글은 0개, shingle 보다 짧은 글은 글 전체 1개
+    """
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    # 글 사이에 shingle-1 개의 0 을 넣어서 창이 다음 글로 넘어가지 않게
+    sep = "\0" * (shingle - 1)
+    codes = np.frombuffer((sep.join(texts) + sep).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    starts = np.concatenate([[0], np.cumsum(lengths + shingle - 1)[:-1]])
+
+    counts = np.where(lengths > 0, np.maximum(lengths - shingle + 1, 1), 0)
+    total = int(counts.sum())
+    # 글마다 start, start+1, ... (counts 개) 위치
+    pos = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + np.arange(total)
+
+    h = np.zeros(total, dtype=np.uint64)
+    for k in range(shingle):
+        h = _mix(h ^ codes[pos + k])
+    return h, counts
+
+
+# ==========================================
+# 2. MinHash 서명
+# ==========================================
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle=SHINGLE, seed=SEED, block_rows=BLOCK_ROWS):
+    """
+    texts: 정규화된 텍스트 리스트. 반환: (글 수, num_perm) uint32
+    해시 i 는 (a_i * x + b_i) 의 상위 32비트 (multiply-shift), 빈 글은 전부 최댓값
+    """
+    a, b = _permutations(num_perm, seed)
+    sig = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    for lo in range(0, len(texts), block_rows):
+        block = texts[lo:lo + block_rows]
+        h, counts = _shingle_hashes(block, shingle)
+        rows = np.flatnonzero(counts) + lo
+        if len(rows) == 0:
+            continue
+        seg = np.concatenate([[0], np.cumsum(counts[counts > 0])[:-1]])
+        for i in range(num_perm):
+            v = ((a[i] * h + b[i]) >> np.uint64(32)).astype(np.uint32)
+            sig[rows, i] = np.minimum.reduceat(v, seg)
+    return sig
+
+
+# ==========================================
+# 3. LSH 후보 -> 묶음
+# ==========================================
+def _components(n, u, v):
+    """간선 (u, v) 로 연결된 요소. 반환: 요소마다 가장 작은 번호 (hook + pointer jumping)"""
+    parent = np.arange(n)
+    if len(u) == 0:
+        return parent
+    while True:
+        pu, pv = parent[u], parent[v]
+        if np.array_equal(pu, pv):
+            return parent
+        low = np.minimum(pu, pv)
+        np.minimum.at(parent, pu, low)
+        np.minimum.at(parent, pv, low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+def cluster_signatures(sig, bands=BANDS, threshold=THRESHOLD, groups=None):
+    """
+    같은 구간 해시를 가진 글을 구간의 첫 글과 비교해서 (추정 Jaccard >= threshold) 연결.
+    비교 횟수는 글 수 × bands 라서 글 수에 선형.
+    groups: 글마다 그룹 번호 (주면 구간 해시에 섞어서 같은 그룹끼리만 연결)
+    반환: 글마다 묶음 대표(요소에서 가장 앞 번호)
+    """
+    n, num_perm = sig.shape
+    rows = num_perm // bands
+    mult = _mix(np.arange(1, rows + 1, dtype=np.uint64))
+    salt = np.uint64(0) if groups is None else _mix(np.asarray(groups).astype(np.uint64) + np.uint64(1))
+    us, vs = [], []
+    for band in range(bands):
+        part = sig[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        key = _mix(((part * mult).sum(axis=1) + np.uint64(band)) ^ salt)
+        codes, _ = pd.factorize(key)
+        _, first = np.unique(codes, return_index=True)
+        leader = first[codes]
+        cand = np.flatnonzero(leader != np.arange(n))
+        if len(cand) == 0:
+            continue
+        sim = (sig[cand] == sig[leader[cand]]).mean(axis=1)
+        ok = cand[sim >= threshold]
+        us.append(ok)
+        vs.append(leader[ok])
+    if not us:
+        return np.arange(n)
+    return _components(n, np.concatenate(us), np.concatenate(vs))
+
+
+def near_duplicate_clusters(texts, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS,
+                            shingle=SHINGLE, max_chars=MAX_CHARS, seed=SEED, groups=None):
+    """
+    texts: 원문 텍스트 (list/Series). 반환: 행마다 묶음 대표 행 번호 (int64, 대표 자신은 자기 번호)
+    groups: 행마다 그룹 번호 (0 이상 정수, 주면 같은 그룹 안에서만 묶음)
+    정규화 후 완전히 같은 글은 MinHash 전에 합쳐서 한 번만 계산합니다.
+    """
+    norm = normalize_texts(texts, max_chars)
+    text_codes, uniques = pd.factorize(norm)
+    if groups is None:
+        codes, text_of, group_of = text_codes, np.arange(len(uniques)), None
+    else:
+        # (그룹, 글) 쌍마다 하나. 서명은 글마다 한 번만 계산해서 쌍에 나눠 줌
+        pair, keys = pd.factorize(np.asarray(groups, dtype=np.int64) * len(uniques) + text_codes)
+        codes, text_of, group_of = pair, keys % len(uniques), keys // len(uniques)
+    first_row = np.full(len(text_of), len(codes), dtype=np.int64)
+    np.minimum.at(first_row, codes, np.arange(len(codes)))
+
+    sig = minhash_signatures(list(uniques), num_perm, shingle, seed)[text_of]
+    root = cluster_signatures(sig, bands, threshold, group_of)
+    # factorize 는 처음 나온 순서라 가장 작은 고유 번호 = 가장 앞 행
+    return first_row[root][codes]
+
+
+# ==========================================
+# 4. DataFrame 연결
+# ==========================================
+def post_groups(df, columns=GROUP_COLUMNS):
+    """묶음을 나눌 그룹 번호 (columns 가 다 있을 때만, 아니면 None). Date 는 날짜 단위, Code 는 6자리로"""
+    if not all(c in df.columns for c in columns):
+        return None
+    key = {}
+    for c in columns:
+        if c == "Date":
+            key[c] = daily_agg.parse_post_dates(df[c].astype("string")).dt.date
+        elif c == "Code":
+            key[c] = df[c].astype("string").str.zfill(6)
+        else:
+            key[c] = df[c]
+    return pd.DataFrame(key).groupby(list(columns), sort=False, dropna=False).ngroup().to_numpy()
+
+
+def annotate(df, columns=TEXT_COLUMNS, threshold=THRESHOLD, offset=0, group_columns=GROUP_COLUMNS):
+    """
+    df 에 dup_cluster(대표 글 행 번호 + offset) / dup_count(묶음 크기) / dup_rep(대표 글 여부) 컬럼을 붙임 (제자리 수정).
+    offset: 청크로 나눠 처리할 때 청크 시작 행 (묶음 번호가 파일 전체에서 겹치지 않도록)
+    group_columns: 이 값이 같은 글끼리만 묶음 (없는 컬럼이 있으면 전체를 한 그룹으로)
+    dup_rep 은 행 순서가 바뀌어도(날짜 파티션 Parquet 등) 대표 글을 알아볼 수 있게 따로 남김
+    """
+    rep = near_duplicate_clusters(post_texts(df, columns), threshold=threshold,
+                                  groups=post_groups(df, group_columns) if group_columns else None)
+    df["dup_cluster"] = rep + offset
+    df["dup_count"] = np.bincount(rep, minlength=len(df))[rep].astype(np.int32)
+    df["dup_rep"] = rep == np.arange(len(df))
+    return df
+
+
+def spread(values, df, offset=0):
+    """행마다 묶음 대표 행의 값 (대표에게만 계산한 결과를 묶음 전체에 복사)"""
+    values = np.asarray(values, dtype=object)
+    return values[df["dup_cluster"].to_numpy() - offset]
+
+
+def cluster_table(df, columns=TEXT_COLUMNS, top=None):
+    """묶음마다 한 행: 대표 행 번호, 글 수, 대표 텍스트 (큰 묶음부터)"""
+    reps = df[df["dup_count"] > 1].drop_duplicates("dup_cluster")
+    table = pd.DataFrame({
+        "dup_cluster": reps["dup_cluster"].to_numpy(),
+        "dup_count": reps["dup_count"].to_numpy(),
+        "text": post_texts(reps, columns).str.slice(0, 60).to_numpy(),
+    }).sort_values(["dup_count", "dup_cluster"], ascending=[False, True], kind="stable")
+    return table.head(top) if top else table
+
+
+def summary(df):
+    n = len(df)
+    clusters = int(df["dup_cluster"].nunique())
+    return {
+        "rows": n,
+        "clusters": clusters,
+        "collapsed": n - clusters,
+        "dup_clusters": int(df.loc[df["dup_count"] > 1, "dup_cluster"].nunique()),
+        "largest": int(df["dup_count"].max()) if n else 0,
+    }
+
+
+def print_summary(stats):
+    rate = stats["collapsed"] / stats["rows"] if stats["rows"] else 0.0
+    print(f"   - 준복제 묶기: {stats['rows']}건 -> 묶음 {stats['clusters']}개 "
+          f"(중복 {stats['collapsed']}건, {rate:.1%} / 2건 이상 묶음 {stats['dup_clusters']}개, "
+          f"최대 {stats['largest']}건)")
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "stock_community_data_top80.csv"
+    df = pd.read_csv(src, dtype={"Code": str}, encoding="utf-8-sig")
+    annotate(df)
+    print(f">> {src}")
+    print_summary(summary(df))
+    print(cluster_table(df, top=20).to_string(index=False))
+    if len(sys.argv) > 2:
+        df.to_csv(sys.argv[2], index=False, encoding="utf-8-sig")
+        print(f"✅ dup_cluster / dup_count 추가 저장: {sys.argv[2]}")
@@ -0,0 +1,211 @@
+"""
+게시글(분 단위) / 시간별 감성 묶음 -> "다음에 거래 가능한 시간봉" 정렬.
+
+accuracy_modeling.py 는 게시글과 주가를 모두 날짜로 뭉개서 비교합니다. 여기서는
+게시글 시각 이후 처음 시작하는 같은 종목의 시간봉을 찾아 붙입니다.
+  - 게시글 Date 는 한국 시간(%Y.%m.%d %H:%M), 시간봉 Date 는 봉 시작 시각(UTC)
+  - 분 단위 글은 그 분이 끝난 뒤에야 볼 수 있으므로 delay(기본 1분) 뒤 첫 봉
+  - 장 마감(15:30) 뒤/주말/휴장일 글은 다음 거래일 첫 봉으로 (시간봉이 있는 시각만 거래 가능)
+  - max_wait 보다 오래 기다려야 하는 글(주가 데이터 공백 등)은 정렬하지 않음
+
+(종목, 시각)을 int64 키 하나로 합쳐 정렬해 두고 searchsorted 한 번으로 찾기 때문에
+게시글 수백만 건도 정렬 한 번 + 이진 탐색이면 끝납니다.
+
+    index = BarIndex(price_df)
+    aligned = align_posts(posts, index)            # 게시글마다 bar_ts / ret_1b ...
+    hourly = hourly_signals(posts, index)          # (종목, 시간) 묶음 + 다음 봉 상승 여부
+"""
+import numpy as np
+import pandas as pd
+
+import daily_agg
+
+TIMEZONE = 'Asia/Seoul'
+MARKET_OPEN = 9 * 3600            # 09:00 KST
+MARKET_CLOSE = 15 * 3600 + 1800   # 15:30 KST
+POST_DELAY = '1min'
+HORIZON_BARS = (1,)
+
+_KEY_STRIDE = 1 << 34   # 종목 인덱스 * stride + epoch 초
+_UTC_OFFSET = 9 * 3600  # KST 는 서머타임 없음
+
+
+def _epoch(ts):
+    return ((ts - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+
+
+def _seconds(delta):
+    return int(pd.Timedelta(delta).total_seconds())
+
+
+def post_seconds(dates, tz=TIMEZONE):
+    """게시글 Date -> UTC epoch 초 (파싱 실패는 -1). 시간대 없는 값은 한국 시간으로 봄"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        dt = pd.Series(dates)
+    else:
+        dt = daily_agg.parse_post_dates(pd.Series(dates).astype('string'))
+    if dt.dt.tz is None:
+        dt = dt.dt.tz_localize(tz, ambiguous='NaT', nonexistent='NaT')
+    ok = dt.notna().to_numpy()
+    out = np.full(len(dt), -1, dtype=np.int64)
+    out[ok] = _epoch(dt[ok])
+    return out
+
+
+def in_session(ts):
+    """UTC epoch 초 -> KRX 정규장(평일 09:00~15:30 KST) 여부. 공휴일은 시간봉 유무로 판단"""
+    local = np.asarray(ts, dtype=np.int64) + _UTC_OFFSET
+    sec = local % 86400
+    weekday = (local // 86400 + 3) % 7     # 1970-01-01 은 목요일 (월=0)
+    return (weekday < 5) & (sec >= MARKET_OPEN) & (sec < MARKET_CLOSE)
+
+
+def factorize_codes(codes):
+    """종목코드 -> (번호 배열, 6자리 코드 목록 정렬). 0 채우기는 고유값에만 해서 수백만 행도 빠르게"""
+    raw_idx, raw = pd.factorize(pd.Series(codes))
+    idx, uniq = pd.factorize(pd.Index(raw).astype(str).str.zfill(6), sort=True)
+    return np.where(raw_idx >= 0, idx[raw_idx], -1), uniq
+
+
+# ==========================================
+# 1. 시간봉 색인
+# ==========================================
+class BarIndex:
+    """종목별 시간봉을 (종목, 시각) 순으로 정렬해 둔 색인 (Open 은 align_posts / hourly_signals 에 필요)"""
+
+    def __init__(self, prices):
+        px = prices.dropna(subset=['Date', 'Close'])
+        bar_ts = _epoch(pd.to_datetime(px['Date'], utc=True))
+        code_idx, self.codes = factorize_codes(px['Code'])
+
+        order = np.lexsort((bar_ts, code_idx))
+        self.code = code_idx[order]
+        self.ts = bar_ts[order]
+        self.keys = self.code * _KEY_STRIDE + self.ts
+        self.close = px['Close'].to_numpy(float)[order]
+        self._open = None
+        if 'Open' in px.columns:
+            opens = px['Open'].to_numpy(float)[order]
+            # 시가가 비어 있는 봉만 종가로 대신
+            self._open = np.where(np.isfinite(opens) & (opens > 0), opens, self.close)
+
+    @property
+    def open(self):
+        # 종가만 있는 시간봉으로는 "다음 봉 시가 진입" 수익률을 못 구함 (종가로 대신하면 수익률이 항상 0)
+        if self._open is None:
+            raise ValueError("시간봉에 Open 컬럼이 없습니다. 다음 봉 시가 진입 수익률에는 Open 이 필요합니다.")
+        return self._open
+
+    def __len__(self):
+        return len(self.ts)
+
+    def code_index(self, codes):
+        """종목코드 배열 -> 색인 번호 (시간봉이 없는 종목은 -1)"""
+        idx, uniq = factorize_codes(codes)
+        return np.where(idx >= 0, self.codes.get_indexer(uniq)[idx], -1)
+
+    def next_bar(self, code_idx, ts, max_wait=None):
+        """같은 종목에서 ts 이후(포함) 처음 시작하는 봉 위치 (-1: 없음)"""
+        code_idx = np.asarray(code_idx, dtype=np.int64)
+        ts = np.asarray(ts, dtype=np.int64)
+        pos = np.searchsorted(self.keys, code_idx * _KEY_STRIDE + ts, side='left')
+        ok = (code_idx >= 0) & (pos < len(self.keys))
+        ok[ok] &= self.code[pos[ok]] == code_idx[ok]
+        if max_wait is not None:
+            ok[ok] &= self.ts[pos[ok]] - ts[ok] <= _seconds(max_wait)
+        return np.where(ok, pos, -1)
+
+    def shift(self, pos, n):
+        """pos 에서 같은 종목으로 n 봉 뒤 위치 (-1: 없음)"""
+        pos = np.asarray(pos)
+        out = pos + n
+        ok = (pos >= 0) & (out >= 0) & (out < len(self.keys))
+        ok[ok] &= self.code[out[ok]] == self.code[pos[ok]]
+        return np.where(ok, out, -1)
+
+
+def _as_index(prices):
+    return prices if isinstance(prices, BarIndex) else BarIndex(prices)
+
+
+def _attach_bars(out, index, code_idx, ts, delay, max_wait, horizons):
+    pos = index.next_bar(code_idx, ts + _seconds(delay), max_wait)
+    ok = (ts >= 0) & (pos >= 0)
+    pos = np.where(ok, pos, -1)
+
+    out['bar_ts'] = pd.to_datetime(np.where(ok, index.ts[pos], 0), unit='s', utc=True).where(ok)
+    out['wait_minutes'] = np.where(ok, (index.ts[pos] - ts) / 60, np.nan)
+    out['entry_open'] = np.where(ok, index.open[pos], np.nan)
+    # n 봉 보유: 다음 봉 시가에 사서 n 번째 봉 종가에 판다
+    for n in horizons:
+        last = index.shift(pos, n - 1)
+        out[f'ret_{n}b'] = np.where(last >= 0, index.close[last] / out['entry_open'].to_numpy() - 1, np.nan)
+    return out
+
+
+# ==========================================
+# 2. 게시글 단위
+# ==========================================
+def align_posts(posts, prices, delay=POST_DELAY, max_wait=None, horizons=HORIZON_BARS):
+    """
+    posts: Date(한국 시간), Code (+ 나머지 컬럼은 그대로 유지)
+    prices: 시간봉 DataFrame 또는 BarIndex
+    반환: posts + post_ts(UTC), in_session, bar_ts, wait_minutes, entry_open, ret_<n>b
+    """
+    index = _as_index(prices)
+    ts = post_seconds(posts['Date'])
+    out = posts.copy()
+    out['post_ts'] = pd.to_datetime(np.where(ts >= 0, ts, 0), unit='s', utc=True).where(ts >= 0)
+    out['in_session'] = in_session(ts) & (ts >= 0)
+    return _attach_bars(out, index, index.code_index(posts['Code']), ts, delay, max_wait, horizons)
+
+
+# ==========================================
+# 3. 시간별 감성 묶음
+# ==========================================
+def hourly_buckets(posts, freq='1h'):
+    """(종목, 한국 시간 freq 단위) 별 긍정/부정/중립/전체 건수와 Positive_Ratio
+
+    bucket_ts: 묶음 시작 시각(UTC epoch 초). 묶음의 글은 bucket_ts + freq 가 지나야 다 모임"""
+    ts = post_seconds(posts['Date'])
+    width = _seconds(freq)
+    label = posts['sentiment_label'].astype(str).str.lower().to_numpy() \
+        if 'sentiment_label' in posts.columns else np.full(len(posts), '')
+    code_idx, codes = factorize_codes(posts['Code'])
+
+    ok = (ts >= 0) & (code_idx >= 0)
+    # 한국 시간 기준으로 자름 (1D 같은 간격도 한국 날짜 경계)
+    bucket = ((ts[ok] + _UTC_OFFSET) // width) * width - _UTC_OFFSET
+    key = code_idx[ok] * _KEY_STRIDE + bucket
+    uniq, inv = np.unique(key, return_inverse=True)
+    n = len(uniq)
+    pos = np.bincount(inv, weights=label[ok] == 'positive', minlength=n).astype(np.int32)
+    neg = np.bincount(inv, weights=label[ok] == 'negative', minlength=n).astype(np.int32)
+    neu = np.bincount(inv, weights=label[ok] == 'neutral', minlength=n).astype(np.int32)
+    total = pos + neg
+    return pd.DataFrame({
+        'Code': codes[uniq // _KEY_STRIDE],
+        'bucket_ts': uniq % _KEY_STRIDE,
+        'positive': pos,
+        'negative': neg,
+        'neutral': neu,
+        'mentions': np.bincount(inv, minlength=n).astype(np.int32),
+        # daily_agg.positive_ratio 와 같은 정의 (중립 제외, 둘 다 0 이면 0)
+        'Positive_Ratio': np.where(total > 0, pos / np.maximum(total, 1), 0.0),
+    })
+
+
+def hourly_signals(posts, prices, freq='1h', max_wait=None, horizons=HORIZON_BARS):
+    """hourly_buckets + 묶음이 끝난 뒤 다음 거래 가능 봉 정렬.
+
+    Is_Price_Up 은 첫 horizon 보유 수익률 > 0 (threshold_sweep 에 그대로 넣을 수 있음)"""
+    index = _as_index(prices)
+    buckets = hourly_buckets(posts, freq)
+    end_ts = buckets['bucket_ts'].to_numpy(np.int64) + _seconds(freq)
+    out = buckets.assign(
+        Bucket=pd.to_datetime(buckets['bucket_ts'], unit='s', utc=True).dt.tz_convert(TIMEZONE),
+        in_session=in_session(end_ts - 1),
+    )
+    out = _attach_bars(out, index, index.code_index(out['Code']), end_ts, 0, max_wait, horizons)
+    out['Is_Price_Up'] = out[f'ret_{horizons[0]}b'] > 0
+    return out.dropna(subset=[f'ret_{horizons[0]}b']).drop(columns='bucket_ts').reset_index(drop=True)
@@ -0,0 +1,255 @@
+"""
+청크 단위 스트리밍 라벨링 (멀티 프로세스 + 재시작 가능).
+
+  - 입력 CSV 를 chunk_rows 행씩 읽어서
+  - 프로세스 풀(워커마다 모델 하나)에 청크를 나눠 주고
+  - 끝난 청크는 shard_dir/part-00000.csv 처럼 샤드 파일로 바로 저장
+  - 다시 실행하면 이미 저장된 샤드는 건너뛰고 남은 청크만 처리
+    (shard_dir/manifest.json 의 입력 파일 크기/수정 시각, chunk_rows, 모델/백엔드, 준복제 설정이
+     이번 실행과 다르면 예전 샤드는 버리고 처음부터 - 입력 CSV 에 새 글이 덧붙은 경우 등)
+  - 입력이 URL(Labeling 의 GitHub raw 주소 등)이면 shard_dir/input.csv 로 먼저 받아서 읽고,
+    수정 시각 대신 내용 해시(sha256)로 같은 입력인지 판단
+  - 모든 샤드가 모이면 순서대로 이어 붙여 최종 CSV 생성, 샤드는 삭제
+  - dedup_columns 를 주면 청크 안에서 준복제 글을 묶어 대표만 추론 (dedup.py, 묶음은 청크를 넘지 않음)
+
+추론 실패(unknown)는 숨기지 않고 건수와 예시를 리포트합니다.
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+import urllib.request
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+import dedup
+import run_metrics
+import sentiment
+from sentiment_cache import SentimentCache
+
+# 워커 프로세스 전역 (워커마다 한 번만 모델 로드)
+_classifier = None
+_cache = None
+_model_name = None
+
+
+def shard_path(shard_dir, idx):
+    return os.path.join(shard_dir, f"part-{idx:05d}.csv")
+
+
+def is_url(path):
+    return str(path).startswith(("http://", "https://"))
+
+
+def local_input(input_csv, shard_dir):
+    """URL 입력은 shard_dir/input.csv 로 받아서 그 경로를 반환 (로컬 파일은 그대로)"""
+    if not is_url(input_csv):
+        return input_csv
+    os.makedirs(shard_dir, exist_ok=True)
+    path = os.path.join(shard_dir, "input.csv")
+    tmp = path + ".tmp"
+    with urllib.request.urlopen(input_csv, timeout=60) as res, open(tmp, "wb") as f:
+        shutil.copyfileobj(res, f)
+    os.replace(tmp, path)
+    return path
+
+
+def _sha256(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(block), b""):
+            h.update(data)
+    return h.hexdigest()
+
+
+def shard_manifest(input_csv, text_column, chunk_rows, model_name, backend, dedup_columns, dedup_threshold,
+                   local_csv=None):
+    """
+    샤드를 재사용해도 되는지 판단하는 기준 (하나라도 바뀌면 예전 샤드는 다른 입력/설정의 결과)
+    local_csv: URL 입력을 받아 둔 파일 (받을 때마다 수정 시각이 바뀌므로 내용 해시로 비교)
+    """
+    if is_url(input_csv):
+        source = {"input": input_csv, "size": os.path.getsize(local_csv), "sha256": _sha256(local_csv)}
+    else:
+        st = os.stat(input_csv)
+        source = {"input": os.path.abspath(input_csv), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return {**source, "text_column": text_column, "chunk_rows": chunk_rows,
+            "model": sentiment.cache_model_key(model_name, backend),
+            "dedup_columns": list(dedup_columns) if dedup_columns else None,
+            "dedup_threshold": dedup_threshold if dedup_columns else None}
+
+
+def clear_shards(shard_dir):
+    for path in glob.glob(os.path.join(shard_dir, "part-*.csv*")):
+        os.remove(path)
+    manifest = os.path.join(shard_dir, "manifest.json")
+    if os.path.exists(manifest):
+        os.remove(manifest)
+
+
+def prepare_shard_dir(shard_dir, manifest):
+    """manifest 가 저장된 것과 같으면 샤드를 그대로 두고, 다르면 비우고 새 manifest 를 씀. 반환: 버린 샤드 수"""
+    os.makedirs(shard_dir, exist_ok=True)
+    path = os.path.join(shard_dir, "manifest.json")
+    saved = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+    if saved == manifest:
+        return 0
+
+    stale = len(glob.glob(os.path.join(shard_dir, "part-*.csv")))
+    clear_shards(shard_dir)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return stale
+
+
+def _init_worker(model_name, num_threads, cache_file, cache_max_entries, backend="torch"):
+    global _classifier, _cache, _model_name
+    _model_name = sentiment.cache_model_key(model_name, backend)
+    _classifier = sentiment.load_classifier(model_name, device=-1, num_threads=num_threads, backend=backend)
+    _cache = SentimentCache(cache_file, cache_max_entries) if cache_file else None
+
+
+def _label_chunk(idx, df, text_column, batch_size, out_path, offset=0, dedup_columns=None,
+                 dedup_threshold=dedup.THRESHOLD):
+    texts = df[text_column].astype(str).tolist()
+    collapsed = 0
+    if dedup_columns:
+        df = df.reset_index(drop=True)
+        dedup.annotate(df, dedup_columns, dedup_threshold, offset=offset)
+        texts = dedup.spread(texts, df, offset).tolist()
+        collapsed = len(df) - df["dup_cluster"].nunique()
+    labels, scores, stats = sentiment.classify_texts(
+        _classifier, texts, batch_size=batch_size, cache=_cache, model_name=_model_name
+    )
+    df["sentiment_label"] = labels
+    df["sentiment_score"] = scores
+
+    # 임시 파일에 다 쓴 다음 이름을 바꿔서, 샤드 파일이 있으면 항상 완성본이 되도록
+    tmp = out_path + ".tmp"
+    df.to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, out_path)
+
+    stats["chunk"] = idx
+    stats["collapsed"] = collapsed
+    return stats
+
+
+def merge_shards(shard_dir, output_csv):
+    parts = sorted(glob.glob(os.path.join(shard_dir, "part-*.csv")))
+    tmp = output_csv + ".tmp"
+    for i, part in enumerate(parts):
+        df = pd.read_csv(part, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+        df.to_csv(tmp, mode="w" if i == 0 else "a", header=(i == 0), index=False, encoding="utf-8-sig")
+    if parts:
+        os.replace(tmp, output_csv)
+    return len(parts)
+
+
+def label_csv_streaming(input_csv, output_csv, shard_dir, text_column="Title",
+                        chunk_rows=20000, workers=2, batch_size=32,
+                        model_name=sentiment.MODEL_NAME, num_threads=None,
+                        cache_file=None, cache_max_entries=None, backend="torch",
+                        dedup_columns=None, dedup_threshold=dedup.THRESHOLD):
+    local_csv = local_input(input_csv, shard_dir)
+    stale = prepare_shard_dir(shard_dir, shard_manifest(input_csv, text_column, chunk_rows, model_name, backend,
+                                                        dedup_columns, dedup_threshold, local_csv))
+    if stale:
+        print(f"   - 입력 파일/설정이 바뀌어 예전 샤드 {stale}개를 버리고 처음부터 처리")
+    if num_threads is None:
+        # 워커끼리 코어를 나눠 쓰도록 (과도한 스레드 경쟁 방지)
+        num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    summary = {"chunks": 0, "skipped": 0, "stale": stale, "done": 0, "crashed": 0,
+               "rows": 0, "inferred": 0, "cache_hits": 0, "failed": 0, "collapsed": 0, "errors": []}
+    t0 = time.perf_counter()
+
+    reader = pd.read_csv(local_csv, chunksize=chunk_rows, dtype={"Code": str})
+    if backend != "torch":
+        # 내보내기/양자화는 워커들이 동시에 하지 않도록 여기서 한 번만
+        import onnx_backend
+        onnx_backend.ensure_exported(model_name, quantized=(backend == "onnx-int8"))
+    ctx = mp.get_context("spawn")  # torch 는 fork 후 스레드가 꼬일 수 있어서 spawn 사용
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(model_name, num_threads, cache_file, cache_max_entries, backend)) as pool:
+        pending = {}
+
+        def collect(done):
+            for fut in done:
+                idx = pending.pop(fut)
+                try:
+                    stats = fut.result()
+                except Exception as e:
+                    run_metrics.error("label_chunk", e, chunk=idx)
+                    summary["crashed"] += 1
+                    summary["errors"].append((f"chunk {idx}", f"{type(e).__name__}: {e}"))
+                    print(f"   !! 청크 {idx} 실패 (다음 실행 때 다시 처리): {e}")
+                    continue
+                summary["done"] += 1
+                # 워커 프로세스 안의 추론 시간 (워커별 계측은 부모로 오지 않으므로 청크 결과로 합산)
+                run_metrics.record_stage("classify_chunk", stats["seconds"], stats["rows"])
+                for key in ("rows", "inferred", "cache_hits", "failed", "collapsed"):
+                    summary[key] += stats[key]
+                summary["errors"].extend(stats["errors"])
+                print(f"   - 청크 {idx} 완료: {stats['rows']}행 / 추론 {stats['inferred']}건 / "
+                      f"실패 {stats['failed']}건")
+
+        for idx, chunk in enumerate(reader):
+            summary["chunks"] += 1
+            if text_column not in chunk.columns:
+                raise ValueError(f"CSV에 '{text_column}' 컬럼이 없습니다. 실제 컬럼명을 다시 확인하세요.")
+
+            out_path = shard_path(shard_dir, idx)
+            if os.path.exists(out_path):
+                summary["skipped"] += 1
+                continue
+
+            # 메모리에 올라가는 청크 수를 워커 수의 2배로 제한
+            while len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            fut = pool.submit(_label_chunk, idx, chunk, text_column, batch_size, out_path,
+                              idx * chunk_rows, dedup_columns, dedup_threshold)
+            pending[fut] = idx
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    summary["seconds"] = time.perf_counter() - t0
+
+    if summary["crashed"] == 0:
+        merge_shards(shard_dir, output_csv)
+        # 최종 CSV 가 생겼으니 샤드는 필요 없음 (남겨두면 다음 실행이 바뀐 입력에 예전 샤드를 이어 붙임)
+        clear_shards(shard_dir)
+        summary["output"] = output_csv
+    if local_csv != input_csv:
+        os.remove(local_csv)
+    return summary
+
+
+def print_summary(summary):
+    print("\n[라벨링 요약]")
+    print(f"   - 청크 {summary['chunks']}개: 완료 {summary['done']} / 이전 실행분 건너뜀 {summary['skipped']} / "
+          f"실패 {summary['crashed']}")
+    print(f"   - 이번 실행 {summary['rows']}행 / 모델 추론 {summary['inferred']}건 / "
+          f"캐시 적중 {summary['cache_hits']}건 / {summary['seconds']:.1f}초")
+    if summary["collapsed"]:
+        print(f"   - 준복제 묶음으로 합친 글: {summary['collapsed']}건 (대표 결과 복사)")
+    print(f"   - 추론 실패(unknown): {summary['failed']}건")
+    for where, err in summary["errors"][:5]:
+        print(f"       · {where[:40]!r}: {err}")
+    if summary["crashed"]:
+        print("   !! 실패한 청크가 있어 최종 CSV 를 만들지 않았습니다. 다시 실행하면 남은 청크만 처리합니다.")
+    else:
+        print(f"   - 결과 저장 위치: {summary['output']}")
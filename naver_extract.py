@@ -0,0 +1,200 @@
+"""
+네이버 종목토론실 HTML 추출기.
+
+목록 페이지(board.naver)의 게시글 행과 상세 페이지(board_read.naver)의 본문을
+뽑아내는 로직을 백엔드별로 구현합니다. 어떤 백엔드를 써도 결과는 같습니다.
+
+  - bs4      : BeautifulSoup + html.parser (순수 파이썬, 기존 방식)
+  - bs4-lxml : BeautifulSoup + lxml 파서
+  - lxml     : lxml(libxml2, C 구현) 트리를 직접 순회 (가장 빠름)
+
+    extractor = get_extractor("lxml")
+    entries = extractor.board_entries(html)   # 테이블이 없으면 None
+    content = extractor.post_content(html)    # 게시글 화면(table.view)이 아니면 None (차단/안내 페이지)
+"""
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # lxml 이 없으면 bs4 백엔드만 사용
+    lxml = None
+
+DEFAULT_EXTRACTOR = "lxml" if lxml else "bs4"
+
+# BeautifulSoup 의 get_text() 가 건너뛰는 태그
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+def _entry(date, title, title_attr, href, views, good, bad, hover):
+    return {
+        'date': date,
+        'title': title,
+        'title_attr': title_attr,
+        'href': href,
+        'views': views,
+        'good': good,
+        'bad': bad,
+        'hover': hover,
+    }
+
+
+# ==========================================
+# 1. BeautifulSoup 백엔드
+# ==========================================
+class Bs4Extractor:
+    def __init__(self, parser="html.parser"):
+        self.parser = parser
+        self.name = "bs4" if parser == "html.parser" else f"bs4-{parser}"
+
+    def board_entries(self, html):
+        soup = BeautifulSoup(html, self.parser)
+        table = soup.find('table', {'class': 'type2'})
+        if not table:
+            return None
+
+        entries = []
+        for row in table.find_all('tr'):
+            title_td = row.find('td', {'class': 'title'})
+            if not title_td:
+                continue
+            link_tag = title_td.find('a')
+            if not link_tag:
+                continue
+            tds = row.find_all('td')
+            if len(tds) < 6:
+                continue
+
+            entries.append(_entry(
+                date=tds[0].get_text(strip=True),
+                title=link_tag.get_text(strip=True),
+                title_attr=link_tag.get('title'),
+                href=link_tag['href'],
+                views=tds[3].get_text(strip=True),
+                good=tds[4].get_text(strip=True),
+                bad=tds[5].get_text(strip=True),
+                hover='onmouseover' in row.attrs,
+            ))
+        return entries
+
+    def post_content(self, html):
+        # 게시글 화면(table.view)이 아니면 None (차단/캡차 안내 페이지),
+        # 게시글인데 글 본문이 없으면 "" (이미지만 있는 글 등 - 다시 요청해도 같음)
+        soup = BeautifulSoup(html, self.parser)
+        content = None
+
+        # 1. 스마트 에디터 (최신 글)
+        smart_editor = soup.find('div', {'class': 'se-main-container'})
+        if smart_editor:
+            content = smart_editor.get_text(separator=" ", strip=True)
+
+        # 2. 일반 HTML 본문 (구형)
+        if not content:
+            body_tag = soup.find('div', {'id': 'body'})
+            if body_tag:
+                for script in body_tag(['script', 'style']):
+                    script.decompose()
+                content = body_tag.get_text(separator=" ", strip=True)
+
+        # 3. 구형 글 (scr01)
+        if not content:
+            scr01 = soup.find('div', {'class': 'scr01'})
+            if scr01:
+                content = scr01.get_text(separator=" ", strip=True)
+
+        if content is None and soup.find('table', {'class': 'view'}):
+            content = ""
+        return content
+
+
+# ==========================================
+# 2. lxml 백엔드
+# ==========================================
+def _class_xpath(tag, cls):
+    return f'//{tag}[contains(concat(" ", normalize-space(@class), " "), " {cls} ")]'
+
+
+def _strings(el):
+    # BeautifulSoup get_text() 와 같은 순서로 텍스트 조각을 돌려줌 (주석/스크립트 제외)
+    if el.text:
+        yield el.text
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in SKIP_TEXT_TAGS:
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _text(el, separator=""):
+    return separator.join(s for s in (t.strip() for t in _strings(el)) if s)
+
+
+class LxmlExtractor:
+    name = "lxml"
+
+    def _parse(self, html):
+        return lxml.html.document_fromstring(html)
+
+    def board_entries(self, html):
+        doc = self._parse(html)
+        tables = doc.xpath(_class_xpath('table', 'type2'))
+        if not tables:
+            return None
+
+        entries = []
+        for row in tables[0].iter('tr'):
+            tds = list(row.iter('td'))
+            title_td = next((td for td in tds if 'title' in td.get('class', '').split()), None)
+            if title_td is None:
+                continue
+            link_tag = next(title_td.iter('a'), None)
+            if link_tag is None:
+                continue
+            if len(tds) < 6:
+                continue
+
+            entries.append(_entry(
+                date=_text(tds[0]),
+                title=_text(link_tag),
+                title_attr=link_tag.get('title'),
+                href=link_tag.get('href'),
+                views=_text(tds[3]),
+                good=_text(tds[4]),
+                bad=_text(tds[5]),
+                hover='onmouseover' in row.attrib,
+            ))
+        return entries
+
+    def post_content(self, html):
+        doc = self._parse(html)
+        content = None
+
+        for xpath in (_class_xpath('div', 'se-main-container'),
+                      '//div[@id="body"]',
+                      _class_xpath('div', 'scr01')):
+            found = doc.xpath(xpath)
+            if found:
+                content = _text(found[0], " ")
+            if content:
+                break
+
+        if content is None and doc.xpath(_class_xpath('table', 'view')):
+            content = ""
+        return content
+
+
+EXTRACTORS = {
+    "bs4": lambda: Bs4Extractor("html.parser"),
+    "bs4-lxml": lambda: Bs4Extractor("lxml"),
+    "lxml": LxmlExtractor,
+}
+
+
+def available_extractors():
+    return [name for name in EXTRACTORS if lxml or "lxml" not in name]
+
+
+def get_extractor(name=None):
+    name = name or DEFAULT_EXTRACTOR
+    if name not in available_extractors():
+        raise ValueError(f"사용할 수 없는 추출기: {name} (가능: {available_extractors()})")
+    return EXTRACTORS[name]()
@@ -0,0 +1,175 @@
+"""
+KR-FinBert-SC 를 ONNX 그래프로 내보내고 int8 동적 양자화해서 ONNX Runtime(CPU)으로 추론하는 백엔드.
+
+라벨링은 전부 CPU 에서 돌고(device=-1), transformers pipeline(fp32)이 가장 비싼 단계입니다.
+  - export_model: transformers 모델 -> model.onnx (배치/길이 가변) + 토크나이저/설정 저장
+  - quantize_model: Linear(MatMul) 가중치를 int8 로 동적 양자화 -> model.int8.onnx
+  - OnnxClassifier: pipeline 과 같은 호출 방식/반환값({"label", "score"})이라
+    sentiment.predict_batches / classify_texts 를 그대로 씀
+  - parity_report: 같은 샘플에서 기존 pipeline 과 라벨 일치율 / 점수 차이 / 처리 속도 비교
+
+onnx, onnxruntime 은 이 백엔드를 쓸 때만 필요합니다 (pip install onnx onnxruntime).
+내보낸 모델은 onnx_models/<모델 이름>/ 에 한 번만 만들고 재사용합니다.
+
+    classifier = sentiment.load_classifier(backend="onnx-int8")
+"""
+import os
+import time
+
+import numpy as np
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_DIR = "onnx_models"
+OPSET = 17
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+
+
+def model_dir(model_name, root=ONNX_DIR):
+    # 로컬 경로든 허브 이름(snunlp/KR-FinBert-SC)이든 폴더 이름 하나로
+    return os.path.join(root, model_name.strip("/\\").replace("/", "__").replace("\\", "__"))
+
+
+# ==========================================
+# 1. 내보내기 / 양자화
+# ==========================================
+def export_model(model_name, out_dir, opset=OPSET):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["내보내기용 예시 문장", "짧은 글"], padding=True, return_tensors="pt")
+    input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in sample]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic["logits"] = {0: "batch"}
+
+    path = os.path.join(out_dir, FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[k] for k in input_names), path,
+            input_names=input_names, output_names=["logits"],
+            dynamic_axes=dynamic, opset_version=opset, dynamo=False,
+        )
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+    return path
+
+
+def quantize_model(out_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    src = os.path.join(out_dir, FP32_FILE)
+    dst = os.path.join(out_dir, INT8_FILE)
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+    return dst
+
+
+def ensure_exported(model_name, root=ONNX_DIR, quantized=True):
+    """필요하면 내보내기/양자화 후 모델 폴더 경로 반환"""
+    out_dir = model_dir(model_name, root)
+    if not os.path.exists(os.path.join(out_dir, FP32_FILE)):
+        print(f"   - ONNX 내보내기: {model_name} -> {out_dir}")
+        export_model(model_name, out_dir)
+    if quantized and not os.path.exists(os.path.join(out_dir, INT8_FILE)):
+        print(f"   - int8 양자화: {out_dir}/{INT8_FILE}")
+        quantize_model(out_dir)
+    return out_dir
+
+
+# ==========================================
+# 2. 추론
+# ==========================================
+class OnnxClassifier:
+    """transformers pipeline("sentiment-analysis") 대신 쓰는 ONNX Runtime 분류기"""
+
+    def __init__(self, out_dir, quantized=True, num_threads=None):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+        path = os.path.join(out_dir, INT8_FILE if quantized else FP32_FILE)
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(out_dir)
+        config = AutoConfig.from_pretrained(out_dir)
+        self.id2label = {int(k): v for k, v in config.id2label.items()}
+        self.quantized = quantized
+
+    def predict(self, texts, truncation=True):
+        enc = self.tokenizer(list(texts), padding=True, truncation=truncation, return_tensors="np")
+        logits = self.session.run(["logits"], {k: enc[k].astype(np.int64) for k in self.input_names})[0]
+        # pipeline 과 같은 softmax -> 최댓값
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return [{"label": self.id2label[int(i)], "score": float(probs[r, i])} for r, i in enumerate(best)]
+
+    def __call__(self, inputs, batch_size=None, truncation=True, **kwargs):
+        if isinstance(inputs, str):
+            return self.predict([inputs], truncation)
+        inputs = list(inputs)
+        batch_size = batch_size or len(inputs) or 1
+        out = []
+        for i in range(0, len(inputs), batch_size):
+            out.extend(self.predict(inputs[i:i + batch_size], truncation))
+        return out
+
+
+def load_onnx_classifier(model_name, quantized=True, num_threads=None, root=ONNX_DIR):
+    return OnnxClassifier(ensure_exported(model_name, root, quantized), quantized, num_threads)
+
+
+# ==========================================
+# 3. 기존 pipeline 과 비교
+# ==========================================
+def parity_report(reference, candidate, texts, batch_size=32):
+    """
+    같은 문장들을 두 분류기로 추론해서 비교.
+    score_drift: 라벨이 같은 문장에서 |점수 차이| (평균 / 최대)
+    """
+    import sentiment
+
+    texts = list(dict.fromkeys(texts))
+    order = sentiment.length_sorted(reference, texts) if texts else []
+    texts = [texts[i] for i in order]
+
+    t0 = time.perf_counter()
+    ref_labels, ref_scores = sentiment.predict_batches(reference, texts, batch_size)
+    ref_sec = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    cand_labels, cand_scores = sentiment.predict_batches(candidate, texts, batch_size)
+    cand_sec = time.perf_counter() - t0
+
+    ref_labels, cand_labels = np.array(ref_labels), np.array(cand_labels)
+    same = ref_labels == cand_labels
+    drift = np.abs(np.array(ref_scores) - np.array(cand_scores))[same]
+    n = len(texts)
+    return {
+        "samples": n,
+        "agreement": float(same.mean()) if n else float("nan"),
+        "mismatches": int((~same).sum()),
+        "score_drift_mean": float(drift.mean()) if len(drift) else float("nan"),
+        "score_drift_max": float(drift.max()) if len(drift) else float("nan"),
+        "reference_titles_per_sec": n / ref_sec if ref_sec > 0 else 0.0,
+        "candidate_titles_per_sec": n / cand_sec if cand_sec > 0 else 0.0,
+        "speedup": ref_sec / cand_sec if cand_sec > 0 else float("nan"),
+        "examples": [(texts[i], ref_labels[i], cand_labels[i]) for i in np.flatnonzero(~same)[:5]],
+    }
+
+
+def print_parity(report, name="onnx-int8"):
+    print(f"   - 샘플 {report['samples']}건: 라벨 일치 {report['agreement']:.2%} "
+          f"(불일치 {report['mismatches']}건) / 점수 차이 평균 {report['score_drift_mean']:.4f}, "
+          f"최대 {report['score_drift_max']:.4f}")
+    print(f"   - torch {report['reference_titles_per_sec']:.1f} -> {name} "
+          f"{report['candidate_titles_per_sec']:.1f} titles/sec ({report['speedup']:.2f}x)")
+    for text, ref, cand in report["examples"]:
+        print(f"       · {text[:40]!r}: {ref} -> {cand}")
@@ -0,0 +1,298 @@
+"""
+전체 파이프라인 실행기 (수집 -> 라벨링 -> Topic / 정확도 분석).
+
+스크립트들을 단계(stage) DAG 로 묶어서 한 번에 실행합니다.
+
+    crawl  (data_crawling.py community) ──> label (Labeling) ──┬──> topic (Version1_Topic_Modeling)
+    prices (data_crawling.py prices) ─────────────────────────┴──> accuracy (accuracy_modeling.py)
+
+  - 단계마다 키 = sha256(명령 + 스크립트/모듈 소스 + 입력 파일 내용) 를 계산해서
+    (입력이 폴더면 - data/ 아래 Parquet 테이블 - 파일 목록의 이름/크기/수정 시각)
+    지난 성공 실행과 키가 같고 출력 파일도 그대로면 건너뜀 (.pipeline/state.json)
+  - 입력이 "내용" 기준이라 앞 단계가 다시 돌아도 출력이 같으면 뒤 단계는 건너뜀
+  - 서로 의존하지 않는 단계(crawl / prices)는 동시에 실행
+  - 단계별 실행 시간과 상태를 표로 출력, 로그는 .pipeline/logs/<단계>.log
+  - 각 스크립트의 계측 기록(run_logs/*.jsonl, run_metrics.py)에 이 실행 ID 가 parent 로 남음
+
+수집 단계는 외부 데이터라서 캐시하지 않고 매번 실행합니다 (--skip crawl prices 로 생략).
+
+    python pipeline.py                        # 바뀐 단계만 실행
+    python pipeline.py --skip crawl prices    # 이미 있는 CSV 로 뒤 단계만
+    python pipeline.py --force label          # label 을 강제로 다시 (출력이 바뀌면 뒤 단계도)
+    python pipeline.py --dry-run              # 무엇을 실행/건너뛸지만 출력
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import pandas as pd
+
+import run_metrics
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = ".pipeline"   # ROOT 기준: state.json, logs/<단계>.log
+
+COMMUNITY_CSV = "stock_community_data_top80.csv"
+PRICE_CSV = "stock_price_data_top80.csv"
+LABELED_CSV = "stock_community_labeled.csv"
+# CSV 말고 뒤 단계가 실제로 읽는 데이터: (날짜, 종목) 집계 저장소(daily_agg.py), Parquet 테이블(dataset_store.py)
+AGG_STORE = "daily_sentiment_agg.csv"
+AGG_STATE = "daily_sentiment_agg.state.json"
+LABELED_TABLE = "data/labeled"
+PRICE_TABLE = "data/price"
+
+# 끝난 것으로 보는 상태 (뒤 단계 실행 가능)
+DONE = ("ran", "cached", "skipped")
+
+
+class Stage:
+    """
+    command: ROOT 기준 스크립트 경로 + 인자
+    sources: 키에 넣을 소스 파일 (스크립트 설정값이 바뀌면 다시 실행되도록)
+    inputs / outputs: ROOT 기준 데이터 파일 (inputs 는 폴더도 가능)
+    cache=False 면 항상 실행 (외부에서 데이터를 받아오는 단계)
+    """
+
+    def __init__(self, name, command, deps=(), sources=(), inputs=(), outputs=(), cache=True):
+        self.name = name
+        self.command = list(command)
+        self.deps = tuple(deps)
+        self.sources = tuple(sources) or (command[0],)
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.cache = cache
+
+
+STAGES = [
+    Stage("crawl", ["data_crawling.py", "community"],
+          sources=["data_crawling.py", "crawl_state.py", "naver_extract.py", "rate_control.py"],
+          outputs=[COMMUNITY_CSV], cache=False),
+    Stage("prices", ["data_crawling.py", "prices"],
+          sources=["data_crawling.py", "price_service.py"],
+          outputs=[PRICE_CSV], cache=False),
+    Stage("label", ["Labeling"], deps=["crawl"],
+          sources=["Labeling", "dedup.py", "sentiment.py", "label_stream.py", "sentiment_cache.py",
+                   "onnx_backend.py", "daily_agg.py"],
+          inputs=[COMMUNITY_CSV], outputs=[LABELED_CSV]),
+    Stage("topic", ["Topic_Modeling/Version1_Topic_Modeling"], deps=["label"],
+          sources=["Topic_Modeling/Version1_Topic_Modeling", "popularity.py", "daily_agg.py"],
+          inputs=[LABELED_CSV, LABELED_TABLE, AGG_STORE, AGG_STATE],
+          outputs=["daily_results.csv", "top5_last7days.csv"]),
+    Stage("accuracy", ["accuracy_modeling.py"], deps=["label", "prices"],
+          sources=["accuracy_modeling.py", "threshold_sweep.py", "walk_forward.py", "intraday_align.py",
+                   "daily_agg.py"],
+          inputs=[LABELED_CSV, PRICE_CSV, LABELED_TABLE, PRICE_TABLE, AGG_STORE, AGG_STATE],
+          outputs=["prediction_result_report.csv", "accuracy_summary_report.csv",
+                   "threshold_curve_report.csv", "threshold_curve_by_stock.csv"]),
+]
+
+
+# ==========================================
+# 1. 내용 해시 / 상태 파일
+# ==========================================
+def dir_hash(full):
+    """폴더 아래 파일 목록(상대 경로, 크기, 수정 시각)의 sha256 - Parquet 테이블은 다시 쓰면 파일 이름/시각이 바뀜"""
+    h = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(full):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            h.update(f"{os.path.relpath(path, full)}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+
+def file_hash(path, memo=None, root=ROOT):
+    """파일 sha256. memo(dict) 에 (크기, 수정 시각) 이 같으면 다시 읽지 않음. 없으면 None, 폴더면 dir_hash"""
+    full = os.path.join(root, path)
+    if not os.path.exists(full):
+        return None
+    if os.path.isdir(full):
+        return dir_hash(full)
+    st = os.stat(full)
+    stamp = [st.st_size, st.st_mtime_ns]
+    if memo is not None and path in memo and memo[path][0] == stamp:
+        return memo[path][1]
+    h = hashlib.sha256()
+    with open(full, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    if memo is not None:
+        memo[path] = [stamp, digest]
+    return digest
+
+
+def stage_key(stage, memo=None, root=ROOT):
+    h = hashlib.sha256()
+    h.update(json.dumps(stage.command).encode())
+    for group in (stage.sources, stage.inputs):
+        for path in group:
+            h.update(f"{path}={file_hash(path, memo, root)};".encode())
+    return h.hexdigest()
+
+
+def state_path(root=ROOT, *parts):
+    return os.path.join(root, STATE_DIR, *parts)
+
+
+def load_state(root=ROOT):
+    path = state_path(root, "state.json")
+    if not os.path.exists(path):
+        return {"stages": {}, "files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, root=ROOT):
+    path = state_path(root, "state.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def up_to_date(stage, key, state, root=ROOT):
+    """키가 지난 성공 실행과 같고, 그때 만든 출력이 그대로 있는지"""
+    prev = state["stages"].get(stage.name)
+    if not stage.cache or not prev or prev.get("key") != key:
+        return False
+    memo = state["files"]
+    return all(file_hash(path, memo, root) == digest and digest is not None
+               for path, digest in prev.get("outputs", {}).items())
+
+
+# ==========================================
+# 2. 실행
+# ==========================================
+def run_stage(stage, root=ROOT):
+    """스크립트를 별도 프로세스로 실행 (출력은 로그 파일로). 반환: (성공 여부, 초)"""
+    os.makedirs(state_path(root, "logs"), exist_ok=True)
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    env[run_metrics.PARENT_ENV] = run_metrics.current().run_id
+    t0 = time.perf_counter()
+    with open(state_path(root, "logs", f"{stage.name}.log"), "w", encoding="utf-8") as log:
+        proc = subprocess.run([sys.executable] + stage.command, cwd=root, env=env,
+                              stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode == 0, time.perf_counter() - t0
+
+
+def log_tail(name, n=15, root=ROOT):
+    path = state_path(root, "logs", f"{name}.log")
+    if not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-n:])
+
+
+def run_pipeline(stages=STAGES, skip=(), force=(), dry_run=False, max_parallel=None, root=ROOT):
+    """
+    의존 단계가 끝난 단계부터 실행. 실패한 단계 뒤는 blocked.
+    root: 스크립트/데이터 파일 기준 폴더 (상태 파일은 root/.pipeline)
+    반환: 단계별 [이름, 상태, 초, 키 앞 12자리] DataFrame
+    상태: ran / cached(건너뜀, 최신) / skipped(--skip) / failed / blocked / (dry-run) would-run
+    """
+    unknown = (set(skip) | set(force)) - {s.name for s in stages}
+    if unknown:
+        raise ValueError(f"알 수 없는 단계: {sorted(unknown)}")
+
+    state = load_state(root)
+    memo = state["files"]
+    status, seconds, keys = {}, {}, {}
+    pending = list(stages)
+    running = {}
+    t_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_parallel or len(stages)) as executor:
+        while pending or running:
+            progressed = False
+            for stage in list(pending):
+                dep_status = [status.get(d) for d in stage.deps]
+                if any(s in ("failed", "blocked") for s in dep_status):
+                    status[stage.name] = "blocked"
+                elif all(s in DONE + ("would-run",) for s in dep_status):
+                    if stage.name in skip:
+                        status[stage.name] = "skipped"
+                    else:
+                        # 앞 단계 출력이 다 나온 뒤라 입력 해시가 확정됨
+                        keys[stage.name] = key = stage_key(stage, memo, root)
+                        if dry_run:
+                            # 앞 단계가 다시 돌면 입력이 바뀔 수 있으므로 뒤 단계도 실행 예정으로 표시
+                            fresh = stage.name not in force and "would-run" not in dep_status \
+                                and up_to_date(stage, key, state, root)
+                            status[stage.name] = "cached" if fresh else "would-run"
+                        elif stage.name not in force and up_to_date(stage, key, state, root):
+                            status[stage.name] = "cached"
+                        else:
+                            print(f">> [{stage.name}] 실행: {' '.join(stage.command)}")
+                            running[executor.submit(run_stage, stage, root)] = stage
+                            status[stage.name] = "running"
+                else:
+                    continue
+                pending.remove(stage)
+                progressed = True
+
+            if not running:
+                if pending and not progressed:
+                    raise ValueError(f"의존 단계를 찾을 수 없음: {[s.name for s in pending]}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage = running.pop(fut)
+                ok, sec = fut.result()
+                seconds[stage.name] = sec
+                if not ok:
+                    status[stage.name] = "failed"
+                    run_metrics.warn(f"[{stage.name}] 실패", echo=False, stage=stage.name, seconds=round(sec, 3))
+                    print(f"!! [{stage.name}] 실패 ({sec:.1f}초), 로그: {state_path(root, 'logs', stage.name + '.log')}")
+                    print(log_tail(stage.name, root=root))
+                    continue
+                status[stage.name] = "ran"
+                run_metrics.record_stage(stage.name, sec, log=True)
+                print(f"   [{stage.name}] 완료 ({sec:.1f}초)")
+                state["stages"][stage.name] = {
+                    "key": keys[stage.name],
+                    "outputs": {path: file_hash(path, memo, root) for path in stage.outputs},
+                    "seconds": round(sec, 3),
+                    "finished": datetime.now().isoformat(timespec="seconds"),
+                }
+                # 단계가 끝날 때마다 저장 (중간에 멈춰도 끝난 단계는 다음에 건너뜀)
+                save_state(state, root)
+
+    if not dry_run:
+        save_state(state, root)
+    report = pd.DataFrame([(s.name, status[s.name], seconds.get(s.name, 0.0), keys.get(s.name, "")[:12])
+                           for s in stages], columns=["stage", "status", "seconds", "key"])
+    report.attrs["wall_seconds"] = time.perf_counter() - t_start
+    return report
+
+
+def print_report(report):
+    print("\n[파이프라인 요약]")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    total = report["seconds"].sum()
+    print(f"   - 전체 {report.attrs['wall_seconds']:.1f}초 (단계 합계 {total:.1f}초)")
+
+
+if __name__ == "__main__":
+    names = [s.name for s in STAGES]
+    parser = argparse.ArgumentParser(description="수집 -> 라벨링 -> 분석 파이프라인")
+    parser.add_argument("--skip", nargs="+", default=[], choices=names, help="실행하지 않을 단계")
+    parser.add_argument("--force", nargs="+", default=[], choices=names, help="최신이어도 다시 실행할 단계")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--max-parallel", type=int, default=None)
+    args = parser.parse_args()
+
+    run_metrics.start_run("pipeline")
+    report = run_pipeline(skip=args.skip, force=args.force, dry_run=args.dry_run, max_parallel=args.max_parallel)
+    print_report(report)
+    run_metrics.finish_run(show=False)
+    if report["status"].isin(["failed", "blocked"]).any():
+        sys.exit(1)
@@ -0,0 +1,207 @@
+"""
+Topic_Modeling 인기도(popularity) 계산 엔진 - 종목별 롤링 상태를 들고 하루씩 갱신.
+
+기존 compute_growth 는 groupby('Code').transform(lambda s: s.rolling(...)) 로 종목마다
+파이썬 콜백을 돌고, run_pipeline 은 매번 전체 게시글부터 다시 계산했습니다.
+여기서는 종목별로
+  - 최근 ROLL_WINDOW 개 관측치의 mentions (링 버퍼) 와 그 합
+  - 직전 관측치의 mentions
+만 들고 있다가, 하루치 (Code, mentions, engagement) 가 들어오면 그날 나온 종목만
+배열 연산으로 갱신합니다 (하루 O(종목 수)).
+
+정의는 기존 스크립트와 완전히 같습니다 (daily_results.csv 와 비트 단위로 일치):
+  - 롤링/직전 값은 "그 종목이 언급된 날" 기준 (언급 없는 날은 건너뜀)
+  - mentions_7d_ma = 최근 7개 관측치 평균 (관측치가 적으면 있는 만큼)
+  - daily_growth   = (오늘 - 직전) / (직전 + 1e-9), 첫 관측치는 NaN
+  - weekly_growth  = (오늘 - 7d_ma) / (7d_ma + 1e-9)
+  - popularity     = (0.6 * daily_growth + 0.4 * weekly_growth) * log1p(mentions) + 0.4 * log1p(engagement)
+
+이미 저장된 daily_results 로부터 상태를 복원할 수 있어서(from_results), 새 날짜나
+값이 바뀐 날짜부터만 다시 계산하면 됩니다(update_results).
+"""
+import numpy as np
+import pandas as pd
+
+ROLL_WINDOW = 7
+MIN_POSTS = 3
+W_DAILY = 0.6
+W_WEEKLY = 0.4
+W_ENGAGEMENT = 0.4
+
+RESULT_COLS = ['Date', 'Code', 'mentions', 'engagement', 'mentions_7d_ma', 'daily_growth',
+               'weekly_growth', 'log_weight', 'popularity', 'valid']
+KEY_COLS = ['Date', 'Code', 'mentions', 'engagement']
+
+
+def safe_log(x):
+    return np.log1p(np.maximum(x, 0))
+
+
+class PopularityEngine:
+    def __init__(self, window=ROLL_WINDOW, min_posts=MIN_POSTS,
+                 w_daily=W_DAILY, w_weekly=W_WEEKLY, w_engagement=W_ENGAGEMENT):
+        self.window = window
+        self.min_posts = min_posts
+        self.w_daily, self.w_weekly, self.w_engagement = w_daily, w_weekly, w_engagement
+        self.last_date = None
+        self.code_ids = {}
+        self.buf = np.zeros((0, window), dtype=np.int64)   # 종목별 최근 window 개 mentions
+        self.head = np.zeros(0, dtype=np.int64)            # 다음에 쓸 칸
+        self.count = np.zeros(0, dtype=np.int64)           # 버퍼에 든 관측치 수 (<= window)
+        self.total = np.zeros(0, dtype=np.int64)           # 버퍼 합
+        self.prev = np.zeros(0, dtype=np.float64)          # 직전 관측치 (없으면 NaN)
+
+    def __len__(self):
+        return len(self.code_ids)
+
+    def _ids(self, codes):
+        ids = np.fromiter((self.code_ids.setdefault(c, len(self.code_ids)) for c in codes),
+                          dtype=np.int64, count=len(codes))
+        grow = len(self.code_ids) - len(self.head)
+        if grow > 0:
+            self.buf = np.vstack([self.buf, np.zeros((grow, self.window), dtype=np.int64)])
+            self.head = np.concatenate([self.head, np.zeros(grow, dtype=np.int64)])
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+            self.total = np.concatenate([self.total, np.zeros(grow, dtype=np.int64)])
+            self.prev = np.concatenate([self.prev, np.full(grow, np.nan)])
+        return ids
+
+    def update(self, date, codes, mentions, engagement):
+        """하루치 갱신. codes 는 그날 안에서 중복 없음. 반환: 지표 dict (입력 순서)"""
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"날짜는 증가해야 합니다: {date} <= {self.last_date}")
+        ids = self._ids(codes)
+        m = np.asarray(mentions, dtype=np.int64)
+        eng = np.asarray(engagement, dtype=np.float64)
+
+        prev = self.prev[ids]
+        head = self.head[ids]
+        # 버퍼가 차 있으면 가장 오래된 값(head 칸)을 빼고 새 값으로 교체
+        dropped = np.where(self.count[ids] >= self.window, self.buf[ids, head], 0)
+        self.total[ids] += m - dropped
+        self.buf[ids, head] = m
+        self.head[ids] = (head + 1) % self.window
+        self.count[ids] = np.minimum(self.count[ids] + 1, self.window)
+        self.prev[ids] = m
+        self.last_date = date
+
+        ma = self.total[ids] / self.count[ids]
+        daily_growth = (m - prev) / (prev + 1e-9)
+        weekly_growth = (m - ma) / (ma + 1e-9)
+        log_weight = safe_log(m)
+        rate_score = self.w_daily * daily_growth + self.w_weekly * weekly_growth
+        popularity = (rate_score * log_weight) + self.w_engagement * safe_log(eng)
+        return {
+            'mentions_7d_ma': ma,
+            'daily_growth': daily_growth,
+            'weekly_growth': weekly_growth,
+            'log_weight': log_weight,
+            'popularity': popularity,
+            'valid': m >= self.min_posts,
+        }
+
+    def process(self, daily):
+        """(Date, Code) 일별 집계 전체를 날짜 순으로 흘려보내고 지표 컬럼을 붙여서 반환 (행 순서 유지)"""
+        out = {c: np.empty(len(daily), dtype=bool if c == 'valid' else np.float64)
+               for c in RESULT_COLS[4:]}
+        codes = daily['Code'].to_numpy()
+        mentions = daily['mentions'].to_numpy()
+        engagement = daily['engagement'].to_numpy()
+        for date, pos in sorted(daily.groupby('Date', sort=False).indices.items()):
+            day = self.update(date, codes[pos], mentions[pos], engagement[pos])
+            for c, v in day.items():
+                out[c][pos] = v
+        return daily.assign(**out)
+
+    @classmethod
+    def from_results(cls, results, **kwargs):
+        """저장된 daily_results(Date, Code, mentions) 로 마지막 날짜 기준 상태 복원"""
+        engine = cls(**kwargs)
+        if results.empty:
+            return engine
+        w = engine.window
+        code_pos, codes = pd.factorize(results['Code'])
+        day_pos, _ = pd.factorize(results['Date'], sort=True)
+        order = np.lexsort((day_pos, code_pos))
+        code_pos = code_pos[order]
+        m = results['mentions'].to_numpy(dtype=np.int64)[order]
+
+        # 종목별 마지막 행 위치 -> 뒤에서 몇 번째 관측치인지
+        n_obs = np.bincount(code_pos, minlength=len(codes))
+        group_end = np.cumsum(n_obs) - 1
+        from_end = group_end[code_pos] - np.arange(len(code_pos))
+        tail = from_end < w
+        filled = np.minimum(n_obs, w)
+
+        # 최근 관측치 n 개를 버퍼 0..n-1 칸에 오래된 순으로 배치, 다음 쓸 칸은 n % window
+        ids = engine._ids(codes)
+        slot = filled[code_pos[tail]] - 1 - from_end[tail]
+        engine.buf[ids[code_pos[tail]], slot] = m[tail]
+        engine.count[ids] = filled
+        engine.head[ids] = filled % w
+        engine.total[ids] = engine.buf[ids].sum(axis=1)
+        engine.prev[ids] = m[group_end]
+        engine.last_date = results['Date'].max()
+        return engine
+
+
+def compute_all(daily, **kwargs):
+    """일별 집계 전체 계산 (compute_growth + compute_popularity + apply_valid_filter 와 동일)"""
+    return PopularityEngine(**kwargs).process(daily)[RESULT_COLS]
+
+
+def _day_fingerprints(df):
+    """날짜별 (행 수, 행 해시 합). 같은 날짜의 (Code, mentions, engagement) 집합이 같으면 같음"""
+    h = pd.util.hash_pandas_object(df[KEY_COLS[1:]], index=False).to_numpy()
+    day_pos, days = pd.factorize(df['Date'])
+    sums = np.zeros(len(days), dtype=np.uint64)
+    np.add.at(sums, day_pos, h)
+    counts = np.bincount(day_pos, minlength=len(days))
+    return dict(zip(days, zip(counts.tolist(), sums.tolist())))
+
+
+def first_changed_date(daily, previous):
+    """previous(저장된 결과) 와 (Date, Code, mentions, engagement) 가 다른 가장 이른 날짜. 같으면 None
+
+    전체 행을 merge 하지 않고 날짜별 해시 합만 비교합니다."""
+    new, old = _day_fingerprints(daily), _day_fingerprints(previous)
+    changed = [d for d in new.keys() | old.keys() if new.get(d) != old.get(d)]
+    return min(changed) if changed else None
+
+
+def _sort_code_date(df):
+    code_pos, _ = pd.factorize(df['Code'], sort=True)
+    day_pos, _ = pd.factorize(df['Date'], sort=True)
+    return df.take(np.lexsort((day_pos, code_pos))).reset_index(drop=True)
+
+
+def update_results(daily, previous, **kwargs):
+    """
+    저장된 결과(previous)를 재사용해서 바뀐 날짜부터만 다시 계산.
+    반환: (결과, 다시 계산한 첫 날짜 또는 None)
+    """
+    start = first_changed_date(daily, previous)
+    if start is None:
+        return previous[RESULT_COLS], None
+    keep = previous[previous['Date'] < start]
+    engine = PopularityEngine.from_results(keep, **kwargs)
+    fresh = engine.process(daily[daily['Date'] >= start])
+    result = pd.concat([keep[RESULT_COLS], fresh[RESULT_COLS]], ignore_index=True)
+    return _sort_code_date(result), start
+
+
+# ================================
+# 날짜별 TOP N
+# ================================
+def top_n_per_day(daily, n=5, dates=None):
+    """날짜별 valid 종목 중 popularity 상위 n 개 (날짜 오름차순, 점수 내림차순, NaN 은 뒤)"""
+    df = daily[daily['valid'] == True]
+    if dates is not None:
+        df = df[df['Date'].isin(dates)]
+    df = df.sort_values(['Date', 'popularity'], ascending=[True, False], kind='stable', na_position='last')
+    return df.groupby('Date', sort=False).head(n).reset_index(drop=True)
+
+
+def last_dates(daily, k=7):
+    dates = np.sort(daily['Date'].unique())
+    return dates[-k:]
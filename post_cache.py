@@ -0,0 +1,62 @@
+"""
+게시글 본문 디스크 캐시.
+
+본문은 한 번 받으면 바뀌지 않으므로 nid(없으면 URL)를 키로 SQLite 파일에
+저장해두고, 다음 실행부터는 네트워크 요청 없이 캐시에서 꺼내 씁니다.
+"""
+import sqlite3
+
+import crawl_state
+
+CACHE_FILE = "post_content_cache.sqlite"
+
+
+def cache_key(url):
+    nid = crawl_state.extract_nid(url)
+    return f"nid:{nid}" if nid is not None else f"url:{url}"
+
+
+class PostContentCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS post_content ("
+            " key TEXT PRIMARY KEY,"
+            " content TEXT NOT NULL,"
+            " fetched_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        self.conn.commit()
+
+    def get_many(self, urls):
+        """{url: content} - 캐시에 있는 것만 반환"""
+        keys = {cache_key(u): u for u in urls}
+        found = {}
+        key_list = list(keys)
+        # SQLite 변수 개수 제한 때문에 나눠서 조회
+        for i in range(0, len(key_list), 500):
+            chunk = key_list[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for key, content in self.conn.execute(
+                f"SELECT key, content FROM post_content WHERE key IN ({marks})", chunk
+            ):
+                found[keys[key]] = content
+        return found
+
+    def put_many(self, contents):
+        """contents: {url: content}"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO post_content (key, content) VALUES (?, ?)",
+            [(cache_key(u), c) for u, c in contents.items()],
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,359 @@
+"""
+여러 종목 시간봉(OHLCV)을 한 번에 받아오는 주가 서비스 + 로컬 캐시.
+
+기존에는 종목마다 yf.download / Ticker.history 를 따로 호출해서 매번 7일(또는 1달)
+전체 구간을 다시 받았습니다. 여기서는
+  - (종목코드, 시각) 단위로 시간봉을 SQLite 에 저장해두고
+  - 종목별로 "이미 받아둔 구간"을 기록해서 빠진 구간만 요청하고
+  - 빠진 구간이 같은 종목끼리 묶어서 한 번의 요청으로 여러 종목을 받고
+  - 결과는 항상 같은 모양의 DataFrame 하나로 돌려줍니다
+    (Date[UTC], Stock, Code, Open, High, Low, Close, Volume)
+
+데이터 제공자(provider)는 바꿔 끼울 수 있습니다. fetch(tickers, start, end, interval) 가
+Date(UTC)/Ticker/Open/High/Low/Close/Volume 컬럼의 DataFrame 을 돌려주면 됩니다.
+기본은 YFinanceProvider 이고, 벤치마크에서는 benchmarks/fixtures.py 의 가짜 제공자를 씁니다.
+
+    service = PriceService()
+    df = service.get_prices(kr_list, period="7d")
+"""
+import sqlite3
+import time
+
+import pandas as pd
+
+CACHE_FILE = "price_cache.sqlite"
+INTERVAL = "1h"
+BATCH_SIZE = 20          # 요청 한 번에 묶을 종목 수
+KRX_SUFFIX = ".KS"
+
+OHLCV_COLS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLS = ['Date', 'Stock', 'Code'] + OHLCV_COLS
+
+_INTERVAL_SECONDS = {"1h": 3600, "60m": 3600, "30m": 1800, "15m": 900, "1d": 86400}
+
+
+def interval_seconds(interval):
+    if interval not in _INTERVAL_SECONDS:
+        raise ValueError(f"지원하지 않는 간격: {interval} (가능: {', '.join(_INTERVAL_SECONDS)})")
+    return _INTERVAL_SECONDS[interval]
+
+
+def to_epoch(ts):
+    """문자열/datetime/Timestamp/epoch 초 -> UTC epoch 초 (tz 없는 값은 UTC 로 간주)"""
+    if isinstance(ts, (int, float)):
+        return int(ts)
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.timestamp())
+
+
+def epoch_seconds(dates):
+    """날짜 Series -> UTC epoch 초 (datetime 해상도와 무관)"""
+    dates = pd.to_datetime(dates, utc=True)
+    return ((dates - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).astype("int64")
+
+
+def period_range(period, now=None):
+    """'7d', '1mo' 같은 yfinance period -> (start, end) epoch 초"""
+    now = to_epoch(pd.Timestamp.now(tz="UTC") if now is None else now)
+    if period.endswith("mo"):
+        delta = pd.DateOffset(months=int(period[:-2]))
+    else:
+        delta = pd.Timedelta(period)
+    start = pd.Timestamp(now, unit="s", tz="UTC") - delta
+    return int(start.timestamp()), now
+
+
+def stock_fields(stock, suffix=KRX_SUFFIX):
+    """data_crawling({'Code','Name'}) / crawling({'code','name','ticker'}) 양쪽 형식 지원"""
+    code = stock.get('Code', stock.get('code'))
+    name = stock.get('Name', stock.get('name', code))
+    ticker = stock.get('ticker') or f"{code}{suffix}"
+    return code, name, ticker
+
+
+# ==========================================
+# 구간 계산
+# ==========================================
+def merge_ranges(ranges):
+    """[start, end) 구간 목록을 정렬해서 겹치거나 붙어있는 구간을 합침"""
+    merged = []
+    for s, e in sorted(ranges):
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return [tuple(r) for r in merged]
+
+
+def missing_ranges(covered, start, end):
+    """[start, end) 중에서 covered 에 포함되지 않는 구간들"""
+    gaps = []
+    cur = start
+    for s, e in merge_ranges(covered):
+        if e <= cur:
+            continue
+        if s >= end:
+            break
+        if s > cur:
+            gaps.append((cur, s))
+        cur = max(cur, e)
+    if cur < end:
+        gaps.append((cur, end))
+    return gaps
+
+
+# ==========================================
+# 데이터 제공자
+# ==========================================
+class YFinanceProvider:
+    """yf.download 한 번에 여러 종목을 받아서 긴(long) 형태로 정리"""
+
+    def __init__(self, threads=True):
+        self.threads = threads
+
+    def fetch(self, tickers, start, end, interval=INTERVAL):
+        import yfinance as yf
+
+        df = yf.download(
+            list(tickers),
+            start=pd.Timestamp(start, unit="s", tz="UTC"),
+            end=pd.Timestamp(end, unit="s", tz="UTC"),
+            interval=interval,
+            group_by="column",
+            progress=False,
+            threads=self.threads,
+        )
+        return normalize_download(df, tickers)
+
+
+def normalize_download(df, tickers):
+    """yf.download 결과(단일/다중 종목, MultiIndex 여부 무관) -> Date/Ticker/OHLCV long 형태"""
+    cols = ['Date', 'Ticker'] + OHLCV_COLS
+    if df is None or df.empty:
+        return pd.DataFrame(columns=cols)
+
+    if isinstance(df.columns, pd.MultiIndex):
+        # 컬럼이 (Price, Ticker) 2단 -> Ticker 를 행으로 내림
+        ticker_level = 1 if set(df.columns.get_level_values(1)) & set(tickers) else 0
+        df = df.stack(level=ticker_level, future_stack=True)
+        df.index.names = ['Date', 'Ticker']
+        df = df.reset_index()
+    else:
+        df = df.reset_index()
+        df['Ticker'] = tickers[0]
+
+    df = df.loc[:, ~df.columns.duplicated()]
+    for alias in ('Datetime', 'index'):
+        if alias in df.columns and 'Date' not in df.columns:
+            df = df.rename(columns={alias: 'Date'})
+
+    # 여러 종목을 묶으면 시각 인덱스가 합집합이 되므로, 해당 종목 봉이 없는 행은 제거
+    df = df.dropna(subset=['Open', 'High', 'Low', 'Close'], how='all')
+    for c in OHLCV_COLS:
+        if c not in df.columns:
+            df[c] = float('nan')
+    return df[cols]
+
+
+# ==========================================
+# 캐시
+# ==========================================
+class PriceCache:
+    """(종목코드, 간격, 시각) 단위 시간봉 + 종목별로 이미 받아둔 구간 기록"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ohlcv ("
+            " code TEXT NOT NULL, interval TEXT NOT NULL, ts INTEGER NOT NULL,"
+            " open REAL, high REAL, low REAL, close REAL, volume REAL,"
+            " PRIMARY KEY (code, interval, ts))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            " code TEXT NOT NULL, interval TEXT NOT NULL,"
+            " start INTEGER NOT NULL, end INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS coverage_code ON coverage (code, interval)")
+        self.conn.commit()
+
+    def covered(self, codes, interval):
+        """{code: [(start, end), ...]}"""
+        out = {c: [] for c in codes}
+        for code, s, e in self.conn.execute(
+            "SELECT code, start, end FROM coverage WHERE interval = ?", (interval,)
+        ):
+            if code in out:
+                out[code].append((s, e))
+        return out
+
+    def put(self, df, interval, ranges):
+        """df: Code/ts/OHLCV 시간봉, ranges: {code: (start, end)} 새로 받아둔 구간"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO ohlcv VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(df['Code'], [interval] * len(df), df['ts'].tolist(),
+                    *(df[c].tolist() for c in OHLCV_COLS)),
+            )
+            for code, (s, e) in ranges.items():
+                rows = self.conn.execute(
+                    "SELECT start, end FROM coverage WHERE code = ? AND interval = ?", (code, interval)
+                ).fetchall()
+                self.conn.execute("DELETE FROM coverage WHERE code = ? AND interval = ?", (code, interval))
+                self.conn.executemany(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                    [(code, interval, a, b) for a, b in merge_ranges(rows + [(s, e)])],
+                )
+
+    def load(self, codes, interval, start, end):
+        """Code/ts/OHLCV DataFrame (시각 오름차순)"""
+        frames = []
+        codes = list(codes)
+        for i in range(0, len(codes), 500):
+            chunk = codes[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            frames.append(pd.read_sql_query(
+                f"SELECT code AS Code, ts, open AS Open, high AS High, low AS Low, close AS Close, volume AS Volume"
+                f" FROM ohlcv WHERE interval = ? AND ts >= ? AND ts < ? AND code IN ({marks})",
+                self.conn, params=[interval, start, end] + chunk,
+            ))
+        if not frames:
+            return pd.DataFrame(columns=['Code', 'ts'] + OHLCV_COLS)
+        return pd.concat(frames, ignore_index=True)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==========================================
+# 서비스
+# ==========================================
+class PriceService:
+    def __init__(self, provider=None, cache=None, interval=INTERVAL, batch_size=BATCH_SIZE, suffix=KRX_SUFFIX):
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.cache = cache if cache is not None else PriceCache()
+        self.interval = interval
+        self.step = interval_seconds(interval)
+        self.batch_size = batch_size
+        self.suffix = suffix
+        self.stats = {}
+
+    def _plan(self, codes, start, end):
+        """빠진 구간이 같은 종목끼리 묶음 -> {(start, end): [code, ...]}
+
+        한 종목에 빈 구간이 여러 개면 그 사이를 한 번에 받는 편이 요청 수가 적으므로
+        첫 빈 구간 시작 ~ 마지막 빈 구간 끝을 한 구간으로 요청합니다."""
+        plan = {}
+        for code, covered in self.cache.covered(codes, self.interval).items():
+            gaps = missing_ranges(covered, start, end)
+            if gaps:
+                plan.setdefault((gaps[0][0], gaps[-1][1]), []).append(code)
+        return plan
+
+    def _fetch(self, plan, tickers, now):
+        requests_made = 0
+        bars = 0
+        failed = []
+        # 아직 끝나지 않은 마지막 봉은 다음 실행에서 다시 받도록 커버 구간에서 제외
+        last_closed = (now // self.step) * self.step
+        for (s, e), codes in plan.items():
+            for i in range(0, len(codes), self.batch_size):
+                batch = codes[i:i + self.batch_size]
+                batch_tickers = [tickers[c] for c in batch]
+                try:
+                    raw = self.provider.fetch(batch_tickers, s, e, self.interval)
+                except Exception as ex:
+                    print(f"   - [주가] 요청 실패 ({len(batch)}종목): {ex}")
+                    failed.extend(batch)
+                    continue
+                finally:
+                    requests_made += 1
+
+                code_of = {t: c for c, t in zip(batch, batch_tickers)}
+                raw = raw[raw['Ticker'].isin(code_of)]
+                df = pd.DataFrame({
+                    'Code': raw['Ticker'].map(code_of).values,
+                    'ts': epoch_seconds(raw['Date']).values,
+                })
+                for c in OHLCV_COLS:
+                    df[c] = pd.to_numeric(raw[c], errors="coerce").values
+                df = df[(df['ts'] >= s) & (df['ts'] < e)]
+
+                # 봉이 하나도 안 온 종목은 실패로 보고 구간을 기록하지 않음 (다음 실행에서 다시 요청)
+                got = set(df['Code'])
+                failed.extend(c for c in batch if c not in got)
+                covered_end = min(e, last_closed)
+                ranges = {c: (s, covered_end) for c in got if covered_end > s}
+                self.cache.put(df, self.interval, ranges)
+                bars += len(df)
+        return requests_made, bars, failed
+
+    def get_prices(self, stocks, start=None, end=None, period=None, now=None):
+        """stocks 의 [start, end) 시간봉을 캐시 + 빠진 구간 요청으로 채워서 반환
+
+        start/end 대신 period('7d', '1mo') 를 주면 지금 기준 최근 구간"""
+        t0 = time.perf_counter()
+        now = to_epoch(pd.Timestamp.now(tz="UTC") if now is None else now)
+        if period is not None:
+            start, end = period_range(period, now)
+        start, end = to_epoch(start), to_epoch(end if end is not None else now)
+        # 봉 경계에 맞춤
+        start = (start // self.step) * self.step
+        end = -(-end // self.step) * self.step
+
+        names, tickers = {}, {}
+        for stock in stocks:
+            code, name, ticker = stock_fields(stock, self.suffix)
+            names[code], tickers[code] = name, ticker
+        codes = list(names)
+
+        plan = self._plan(codes, start, end)
+        requests_made, bars, failed = self._fetch(plan, tickers, now)
+
+        df = self.cache.load(codes, self.interval, start, end)
+        df['Date'] = pd.to_datetime(df['ts'], unit="s", utc=True)
+        df['Stock'] = df['Code'].map(names)
+        # 입력 종목 순서 -> 시각 순
+        order = {c: i for i, c in enumerate(codes)}
+        df = df.assign(_o=df['Code'].map(order)).sort_values(['_o', 'ts'], kind="stable")
+        df = df[PRICE_COLS].reset_index(drop=True)
+        df[OHLCV_COLS[:-1]] = df[OHLCV_COLS[:-1]].astype(float)
+        df['Volume'] = df['Volume'].astype(float).fillna(0).astype("int64")
+
+        self.stats = {
+            'stocks': len(codes),
+            'stale_stocks': sum(len(v) for v in plan.values()),
+            'requests': requests_made,
+            'fetched_bars': bars,
+            'failed': sorted(set(failed)),
+            'rows': len(df),
+            'seconds': time.perf_counter() - t0,
+        }
+        return df
+
+    def close(self):
+        self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def print_stats(stats):
+    print(f"   - 종목 {stats['stocks']}개 중 {stats['stale_stocks']}개 갱신 / "
+          f"요청 {stats['requests']}회 / 새 시간봉 {stats['fetched_bars']}개 / "
+          f"{stats['seconds']:.1f}초")
+    if stats['failed']:
+        print(f"   - 데이터 없음(다음 실행에서 재요청): {', '.join(stats['failed'])}")
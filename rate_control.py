@@ -0,0 +1,261 @@
+"""
+네이버 게시판 수집 속도 조절 / 재시도 / 종목별 수집 완료율.
+
+고정 딜레이(0.05초) 대신 AIMD 방식으로 초당 요청 수를 조절합니다.
+  - 정상 응답이 이어지면 초당 요청 수를 조금씩 올리고 (정상 응답 1초 분량마다 +INCREASE)
+  - 차단 신호가 오면 DECREASE 배로 줄임 (동시에 날아간 요청들이 한꺼번에 여러 번 줄이지 않도록 COOLDOWN 초에 한 번)
+차단 신호: type2 테이블 없는 페이지, 429/403 등 오류 응답, 예외(타임아웃), 지연 급증(평소 지연의 LATENCY_SPIKE 배 이상).
+
+실패한 페이지는 RetryQueue 에 넣고 전체 순회가 끝난 뒤 지수 백오프(RETRY_DELAY, 2배씩, 지터)로 다시 요청하고,
+Completeness 가 종목별로 목표 페이지 중 몇 장을 받았는지(재시도로 살린 페이지 / 끝내 못 받은 페이지)를 모읍니다.
+못 받은 페이지가 있는 종목은 빈틈 없이 받은 구간까지만 워터마크를 올리도록 safe_nid 도 같이 계산합니다.
+(crawl_state.gap_free_rows 참고)
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+import run_metrics
+
+INITIAL_RATE = 10.0     # 시작 초당 요청 수
+MIN_RATE = 1.0
+MAX_RATE = 50.0
+INCREASE = 2.0          # 정상 응답 1초 분량마다 올리는 초당 요청 수
+DECREASE = 0.5          # 차단 신호 때 곱하는 값
+COOLDOWN = 1.0          # 줄인 뒤 이 시간(초) 안에 온 신호는 같은 차단으로 봄
+
+LATENCY_SPIKE = 3.0     # 평소 지연(EWMA)의 몇 배부터 지연 급증으로 볼지
+LATENCY_FLOOR = 0.2     # 이보다 짧은 지연은 급증으로 보지 않음 (초)
+LATENCY_WARMUP = 20     # 평소 지연을 믿기 전에 필요한 정상 응답 수
+LATENCY_ALPHA = 0.1
+
+RETRY_ATTEMPTS = 4      # 페이지당 최대 요청 횟수 (첫 요청 포함)
+RETRY_DELAY = 1.0       # 첫 재시도 대기 (초), 이후 2배씩
+RETRY_MAX_DELAY = 30.0
+
+
+def failure_reason(status=None, error=None, empty=False):
+    """페이지 요청 결과 -> 실패(차단) 사유, 정상이면 None"""
+    if error is not None:
+        return "error"
+    if status is not None and not 200 <= int(status) < 300:
+        return f"http_{int(status)}"
+    if empty:
+        return "no_table"
+    return None
+
+
+class AimdThrottle:
+    """
+    초당 요청 수 조절기. 요청 전에 wait() (asyncio 에서는 await wait_async()),
+    응답마다 observe(지연, 실패 사유) 를 부름. 스레드 여러 개에서 같이 써도 됨.
+    """
+
+    def __init__(self, rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE, increase=INCREASE,
+                 decrease=DECREASE, cooldown=COOLDOWN, spike=LATENCY_SPIKE):
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.spike = spike
+
+        self.lock = threading.Lock()
+        self._next = 0.0            # 다음 요청을 보내도 되는 시각
+        self._last_cut = -float("inf")
+        self._baseline = None       # 정상 응답 지연 EWMA (초)
+        self._samples = 0
+
+        self.ok = 0
+        self.cuts = 0
+        self.signals = Counter()
+        self.low = self.high = self.rate
+
+    def _reserve(self):
+        """다음 요청 자리를 잡고 그때까지 기다릴 시간(초)을 반환"""
+        with self.lock:
+            now = time.perf_counter()
+            start = max(self._next, now)
+            self._next = start + 1.0 / self.rate
+            return start - now
+
+    def wait(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _is_spike(self, latency):
+        return (self._samples >= LATENCY_WARMUP and latency > LATENCY_FLOOR
+                and latency > self.spike * self._baseline)
+
+    def observe(self, latency=None, reason=None):
+        """
+        응답 하나 반영. reason: failure_reason() 결과 (정상이면 None).
+        반환: 최종 신호 (정상이지만 지연이 급증했으면 "latency")
+        """
+        with self.lock:
+            if reason is None and latency is not None:
+                if self._is_spike(latency):
+                    reason = "latency"
+                else:
+                    self._baseline = latency if self._baseline is None else \
+                        (1 - LATENCY_ALPHA) * self._baseline + LATENCY_ALPHA * latency
+                    self._samples += 1
+
+            if reason is None:
+                self.ok += 1
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+                self.high = max(self.high, self.rate)
+                return None
+
+            self.signals[reason] += 1
+            now = time.perf_counter()
+            if now - self._last_cut < self.cooldown:
+                return reason
+            self._last_cut = now
+            self.cuts += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.low = min(self.low, self.rate)
+            # 이미 잡아둔 자리도 한 칸 늦춤 (줄인 속도가 바로 적용되도록)
+            self._next = max(self._next, now) + 1.0 / self.rate
+            rate = self.rate
+
+        run_metrics.count("rate_cut")
+        run_metrics.log("rate_cut", reason=reason, rate=round(rate, 2), latency=latency)
+        return reason
+
+    def summary(self):
+        return {"rate": self.rate, "low": self.low, "high": self.high, "ok": self.ok, "cuts": self.cuts,
+                "signals": dict(self.signals)}
+
+
+class RetryQueue:
+    """
+    실패한 요청 대기열. push(항목, 지금까지 시도 횟수, 사유) -> 백오프 뒤에 pop_ready() 로 꺼냄.
+    시도 횟수가 max_attempts 에 이르면 넣지 않고 False 반환 (포기).
+    """
+
+    def __init__(self, max_attempts=RETRY_ATTEMPTS, base_delay=RETRY_DELAY, max_delay=RETRY_MAX_DELAY, seed=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = random.Random(seed)
+        self._heap = []
+        self._seq = itertools.count()
+        self.pushed = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def backoff(self, attempts):
+        # 1, 2, 4, ... 배에 0.5~1 지터 (여러 페이지가 같은 순간에 몰리지 않도록)
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * self.rng.uniform(0.5, 1.0)
+
+    def push(self, item, attempts, reason=None):
+        if attempts >= self.max_attempts:
+            return False
+        ready = time.perf_counter() + self.backoff(attempts)
+        heapq.heappush(self._heap, (ready, next(self._seq), item, attempts, reason))
+        self.pushed += 1
+        return True
+
+    def delay(self):
+        """가장 먼저 꺼낼 수 있는 항목까지 남은 시간 (초)"""
+        if not self._heap:
+            return 0.0
+        return max(0.0, self._heap[0][0] - time.perf_counter())
+
+    def pop_ready(self):
+        """지금 꺼낼 수 있는 항목 전부: [(항목, 지금까지 시도 횟수), ...]"""
+        now = time.perf_counter()
+        ready = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, item, attempts, _ = heapq.heappop(self._heap)
+            ready.append((item, attempts))
+        return ready
+
+
+class Completeness:
+    """
+    종목별 페이지 수집 결과. 페이지마다 최종 결과를 한 번 record()
+    성공한 페이지는 그 페이지의 최대 nid 도 넘기면 table() 의 safe_nid 를 계산함:
+      못 받은 페이지가 없으면 <NA> (제한 없음),
+      있으면 마지막으로 못 받은 페이지보다 뒤(더 오래된) 페이지들의 최대 nid (없으면 0)
+    게시판은 1페이지가 최신이므로, safe_nid 이하의 글은 빠진 페이지 없이 이어서 받은 것임
+    """
+
+    def __init__(self):
+        self.stocks = {}
+
+    def _entry(self, code):
+        entry = self.stocks.get(code)
+        if entry is None:
+            entry = self.stocks[code] = {"pages": 0, "ok": 0, "recovered": 0, "missing": [],
+                                         "reasons": Counter(), "nids": {}}
+        return entry
+
+    def record(self, code, page, attempts, reason=None, nid=None):
+        """reason=None 이면 수집 성공 (attempts > 1 이면 재시도로 살림), 아니면 끝내 실패. nid: 페이지의 최대 nid"""
+        entry = self._entry(code)
+        entry["pages"] += 1
+        if reason is None:
+            entry["ok"] += 1
+            entry["recovered"] += attempts > 1
+            if nid is not None:
+                entry["nids"][page] = nid
+        else:
+            entry["missing"].append(page)
+            entry["reasons"][reason] += 1
+
+    @staticmethod
+    def _safe_nid(entry):
+        if not entry["missing"]:
+            return None
+        last = max(entry["missing"])
+        return max((nid for page, nid in entry["nids"].items() if page > last), default=0)
+
+    def table(self):
+        rows = [(code, e["pages"], e["ok"], e["recovered"], len(e["missing"]),
+                 e["ok"] / e["pages"] if e["pages"] else 1.0,
+                 " ".join(map(str, sorted(e["missing"]))),
+                 " ".join(f"{r}:{n}" for r, n in e["reasons"].most_common()),
+                 self._safe_nid(e))
+                for code, e in self.stocks.items()]
+        table = pd.DataFrame(rows, columns=["stock", "pages", "ok", "recovered", "missing", "completeness",
+                                            "missing_pages", "reasons", "safe_nid"])
+        table["safe_nid"] = table["safe_nid"].astype("Int64")
+        return table
+
+    def log(self):
+        for code, e in self.stocks.items():
+            run_metrics.log("completeness", stock=code, pages=e["pages"], ok=e["ok"], recovered=e["recovered"],
+                            missing=sorted(e["missing"]), reasons=dict(e["reasons"]))
+
+
+def print_report(table, throttle=None):
+    if table.empty:
+        return
+    pages, ok, recovered = table["pages"].sum(), table["ok"].sum(), table["recovered"].sum()
+    print(f"   - 수집 완료율: {ok}/{pages} 페이지 ({ok / pages:.1%}) / 재시도로 살림 {recovered}장 / "
+          f"100% 미만 종목 {int((table['completeness'] < 1).sum())}개")
+    if throttle is not None:
+        s = throttle.summary()
+        signals = ", ".join(f"{k} {v}" for k, v in sorted(s["signals"].items())) or "없음"
+        print(f"   - 속도 조절: 초당 {s['rate']:.1f}건 (최저 {s['low']:.1f} / 최고 {s['high']:.1f}), "
+              f"감속 {s['cuts']}회 · 차단 신호 {signals}")
+    incomplete = table[table["completeness"] < 1]
+    if not incomplete.empty:
+        print(incomplete.to_string(index=False, float_format=lambda x: f"{x:.1%}"))
@@ -0,0 +1,361 @@
+"""
+실행 단위 계측 (수집 / 라벨링 / 분석 스크립트 공통).
+
+스크립트마다 start_run() 으로 실행 기록을 열면
+  - HTTP 요청: 종목별 요청 수, 상태 코드별 건수, 예외, 빈 페이지(type2 테이블 없음 등), 지연 히스토그램
+  - 단계(stage / section): 호출 수, 걸린 시간, 처리 건수(items/sec) - 파싱, 추론, pandas 단계 등
+  - 경고/예외: 그동안 print 만 하거나 삼키던 것들 (차단 의심, except: continue)
+를 모아서 run_logs/<실행 ID>.jsonl 에 한 줄에 하나씩(JSON) 기록하고,
+finish_run() 때 요약 표를 출력하고 요약도 JSONL 에 남깁니다.
+
+start_run() 전에 불린 계측은 메모리에만 쌓이고 파일에는 쓰지 않습니다 (모듈을 가져다 쓰는 벤치마크 등).
+
+프로파일링 (기본 꺼짐): 환경 변수 PROFILE_STAGES 에 단계 이름(쉼표 구분) 또는 all 을 주면
+그 단계를 cProfile 로 감싸서 run_logs/<실행 ID>.<단계>.prof 로 저장하고 상위 함수를 출력합니다.
+
+    PROFILE_STAGES=classify python Labeling
+    python -m pstats run_logs/<실행 ID>.classify.prof
+"""
+import bisect
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+LOG_DIR = "run_logs"
+PROFILE_ENV = "PROFILE_STAGES"
+PARENT_ENV = "RUN_METRICS_PARENT"   # pipeline.py 가 자식 스크립트에 넘기는 실행 ID
+PROFILE_TOP = 15
+
+# 지연 히스토그램 구간 상한 (ms), 마지막 구간은 그 이상
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _bucket_labels():
+    bounds = [f"<{b}" for b in LATENCY_BUCKETS_MS]
+    return bounds + [f">={LATENCY_BUCKETS_MS[-1]}"]
+
+
+class RunMetrics:
+    """
+    실행 하나의 계측값. 스레드 여러 개(드라이버 풀, 본문 워커)에서 같이 써도 되도록 잠금 사용.
+    log_dir=None 이면 파일 없이 메모리에만 모음.
+    """
+
+    def __init__(self, script, log_dir=LOG_DIR, profile=None):
+        self.script = script
+        self.run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{script}-{os.getpid()}"
+        self.lock = threading.Lock()
+        self.t0 = time.perf_counter()
+
+        self.stages = {}                # 이름 -> [호출 수, 초, 처리 건수]
+        self.http = {}                  # 종목 -> 통계 dict (_http_entry)
+        self.counters = Counter()
+        self.warnings = 0
+        self.errors = 0
+        self._section = None            # (이름, 시작 시각, 프로파일러)
+
+        if profile is None:
+            profile = os.environ.get(PROFILE_ENV, "")
+        self.profile = {p.strip() for p in profile.split(",") if p.strip()} if isinstance(profile, str) \
+            else set(profile)
+
+        self.log_dir = log_dir
+        self._file = None
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self.path = os.path.join(log_dir, f"{self.run_id}.jsonl")
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.path = None
+
+    # ------------------------------------------
+    # JSONL 기록
+    # ------------------------------------------
+    def log(self, kind, **fields):
+        if self._file is None:
+            return
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "run": self.run_id, "kind": kind}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    # ------------------------------------------
+    # HTTP
+    # ------------------------------------------
+    def _http_entry(self, stock):
+        entry = self.http.get(stock)
+        if entry is None:
+            entry = self.http[stock] = {"requests": 0, "status": Counter(), "errors": 0, "empty": 0,
+                                        "seconds": 0.0, "hist": [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+        return entry
+
+    def observe_http(self, stock, seconds, status=None, error=None, url=None):
+        """
+        요청 하나. status 는 응답 코드(예외로 끝났으면 None), error 는 예외.
+        seconds 는 연결 풀 대기를 뺀 요청 시간으로 넘겨야 지연 히스토그램이 서버 응답 시간을 나타냄.
+        """
+        bucket = bisect.bisect_right(LATENCY_BUCKETS_MS, seconds * 1000)
+        with self.lock:
+            entry = self._http_entry(stock)
+            entry["requests"] += 1
+            entry["seconds"] += seconds
+            entry["hist"][bucket] += 1
+            if status is not None:
+                entry["status"][int(status)] += 1
+            if error is not None:
+                entry["errors"] += 1
+        if error is not None or (status is not None and not 200 <= int(status) < 300):
+            self.log("http", stock=stock, url=url, status=status, ms=round(seconds * 1000, 1),
+                     error=f"{type(error).__name__}: {error}" if error is not None else None)
+
+    def observe_empty(self, stock, url=None, reason="no_table"):
+        """응답은 왔지만 내용(게시글 표, 본문)이 없는 페이지"""
+        with self.lock:
+            self._http_entry(stock)["empty"] += 1
+        self.log("empty", stock=stock, url=url, reason=reason)
+
+    # ------------------------------------------
+    # 경고 / 예외 / 카운터
+    # ------------------------------------------
+    def warn(self, message, echo=True, **fields):
+        with self.lock:
+            self.warnings += 1
+        self.log("warn", message=message, **fields)
+        if echo:
+            print(f"[WARN] {message}")
+
+    def error(self, where, error, **fields):
+        """삼키던 예외를 기록 (흐름은 호출한 쪽에서 그대로 계속)"""
+        with self.lock:
+            self.errors += 1
+            self.counters[f"error:{where}"] += 1
+        self.log("error", where=where, error=f"{type(error).__name__}: {error}", **fields)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    # ------------------------------------------
+    # 단계 시간
+    # ------------------------------------------
+    def record_stage(self, name, seconds, items=0, log=False, **fields):
+        """이미 잰 시간을 단계에 더함 (반복 호출되는 파싱 등은 log=False 로 합계만)"""
+        with self.lock:
+            entry = self.stages.setdefault(name, [0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += items or 0
+        if log:
+            rate = items / seconds if items and seconds > 0 else None
+            self.log("stage", stage=name, seconds=round(seconds, 4), items=items, items_per_sec=rate, **fields)
+
+    def _start_profile(self, name):
+        if name not in self.profile and "all" not in self.profile:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 다른 프로파일러가 이미 켜져 있음 (바깥 단계를 프로파일링 중)
+            return None
+        return profiler
+
+    def _dump_profile(self, name, profiler):
+        profiler.disable()
+        out_dir = self.log_dir or "."
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{self.run_id}.{name}.prof")
+        profiler.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        print(f"\n[프로파일] {name} -> {path}")
+        print(text.getvalue())
+        self.log("profile", stage=name, path=path)
+
+    @contextmanager
+    def stage(self, name, items=None):
+        """
+        with metrics.stage("classify", items=len(texts)) as s:
+            ...
+            s["items"] = 처리 건수   (끝난 뒤에 알 수 있으면 여기서 지정)
+        """
+        info = {"items": items}
+        profiler = self._start_profile(name)
+        t0 = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - t0
+            if profiler is not None:
+                self._dump_profile(name, profiler)
+            self.record_stage(name, seconds, info["items"], log=True)
+
+    def section(self, name, items=None):
+        """
+        들여쓰기 없이 이어지는 스크립트용: 지금 단계를 끝내고(items 는 끝나는 단계의 건수) name 단계를 시작.
+        name=None 이면 끝내기만.
+        """
+        if self._section is not None:
+            prev, t0, profiler = self._section
+            seconds = time.perf_counter() - t0
+            if profiler is not None:
+                self._dump_profile(prev, profiler)
+            self.record_stage(prev, seconds, items, log=True)
+            self._section = None
+        if name is not None:
+            profiler = self._start_profile(name)
+            self._section = (name, time.perf_counter(), profiler)
+
+    # ------------------------------------------
+    # 요약
+    # ------------------------------------------
+    def stage_table(self):
+        rows = [(name, calls, sec, items, items / sec if items and sec > 0 else np.nan)
+                for name, (calls, sec, items) in self.stages.items()]
+        return pd.DataFrame(rows, columns=["stage", "calls", "seconds", "items", "items/sec"])
+
+    def http_table(self):
+        rows = []
+        for stock, e in self.http.items():
+            ok = sum(n for s, n in e["status"].items() if 200 <= s < 300)
+            other = " ".join(f"{s}:{n}" for s, n in sorted(e["status"].items()) if not 200 <= s < 300)
+            rows.append((stock, e["requests"], ok, other, e["errors"], e["empty"],
+                         e["seconds"] / e["requests"] * 1000 if e["requests"] else np.nan,
+                         _percentile(e["hist"], 0.5), _percentile(e["hist"], 0.95)))
+        return pd.DataFrame(rows, columns=["stock", "requests", "ok", "other_status", "errors", "empty",
+                                           "mean_ms", "p50_ms", "p95_ms"])
+
+    def latency_histogram(self):
+        hist = np.zeros(len(LATENCY_BUCKETS_MS) + 1, dtype=int)
+        for e in self.http.values():
+            hist += e["hist"]
+        return dict(zip(_bucket_labels(), hist.tolist()))
+
+    def summary(self):
+        http = self.http_table()
+        return {
+            "script": self.script,
+            "seconds": time.perf_counter() - self.t0,
+            "stages": self.stage_table().to_dict("records"),
+            "http": http.to_dict("records"),
+            "latency_ms": self.latency_histogram(),
+            "counters": dict(self.counters),
+            "warnings": self.warnings,
+            "errors": self.errors,
+        }
+
+    def close(self):
+        self.section(None)
+        self.log("summary", **self.summary())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _percentile(hist, q):
+    """히스토그램 구간 상한 기준 근사 백분위 (ms). 마지막 구간이면 inf"""
+    total = sum(hist)
+    if not total:
+        return np.nan
+    idx = int(np.searchsorted(np.cumsum(hist), q * total))
+    return float(LATENCY_BUCKETS_MS[idx]) if idx < len(LATENCY_BUCKETS_MS) else float("inf")
+
+
+def print_summary(metrics):
+    print(f"\n[실행 요약] {metrics.script} ({time.perf_counter() - metrics.t0:.1f}초)"
+          + (f" -> {metrics.path}" if metrics.path else ""))
+    stages = metrics.stage_table()
+    if not stages.empty:
+        print(stages.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+    http = metrics.http_table()
+    if not http.empty:
+        total = http[["requests", "ok", "errors", "empty"]].sum()
+        print(f"\n   - HTTP {total['requests']}건: 정상 {total['ok']} / 예외 {total['errors']} / "
+              f"빈 페이지 {total['empty']} (종목 {len(http)}개)")
+        print("   - 지연(ms): " + " ".join(f"{k}:{v}" for k, v in metrics.latency_histogram().items() if v))
+        # 문제가 있었던 종목만 (전부 정상이면 생략)
+        bad = http[(http["ok"] < http["requests"]) | (http["empty"] > 0)]
+        if not bad.empty:
+            print(bad.to_string(index=False, float_format=lambda x: f"{x:.0f}"))
+
+    if metrics.counters or metrics.warnings:
+        items = [f"{k} {v}" for k, v in sorted(metrics.counters.items())]
+        print(f"   - 경고 {metrics.warnings}건 / 예외 {metrics.errors}건" + (f" · {', '.join(items)}" if items else ""))
+
+
+# ==========================================
+# 현재 실행 (모듈 함수로 어디서나 기록)
+# ==========================================
+_current = RunMetrics("default", log_dir=None)
+
+
+def current():
+    return _current
+
+
+def start_run(script, log_dir=LOG_DIR, profile=None):
+    global _current
+    _current = RunMetrics(script, log_dir=log_dir, profile=profile)
+    _current.log("start", script=script, argv=sys.argv, pid=os.getpid(), parent=os.environ.get(PARENT_ENV),
+                 profile=sorted(_current.profile))
+    return _current
+
+
+def finish_run(show=True):
+    """요약 출력 + JSONL 에 요약 기록 후 닫음"""
+    metrics = _current
+    metrics.section(None)
+    if show:
+        print_summary(metrics)
+    metrics.close()
+    return metrics
+
+
+def log(kind, **fields):
+    _current.log(kind, **fields)
+
+
+def observe_http(stock, seconds, status=None, error=None, url=None):
+    _current.observe_http(stock, seconds, status, error, url)
+
+
+def observe_empty(stock, url=None, reason="no_table"):
+    _current.observe_empty(stock, url, reason)
+
+
+def warn(message, echo=True, **fields):
+    _current.warn(message, echo, **fields)
+
+
+def error(where, err, **fields):
+    _current.error(where, err, **fields)
+
+
+def count(name, n=1):
+    _current.count(name, n)
+
+
+def record_stage(name, seconds, items=0, log=False, **fields):
+    _current.record_stage(name, seconds, items, log, **fields)
+
+
+def stage(name, items=None):
+    return _current.stage(name, items)
+
+
+def section(name, items=None):
+    _current.section(name, items)
@@ -0,0 +1,154 @@
+"""
+KR-FinBert-SC 감성 분석 공통 모듈.
+
+Labeling 스크립트에서 쓰는 모델 로드와 배치 추론 로직입니다.
+  - 같은 제목은 한 번만 추론 (중복 제거)
+  - 토큰 길이 순으로 정렬해서 길이가 비슷한 문장끼리 배치 (패딩 최소화)
+  - 결과는 원래 행 순서대로 돌려줌
+"""
+import time
+
+import pandas as pd
+import torch
+from transformers import pipeline
+
+import run_metrics
+
+MODEL_NAME = "snunlp/KR-FinBert-SC"  # 한국어 금융 특화 모델
+
+UNKNOWN_LABEL = "unknown"
+
+
+def load_classifier(model_name=MODEL_NAME, device=None, num_threads=None, backend="torch", onnx_dir=None):
+    """
+    backend: "torch"(transformers pipeline, 기본) / "onnx" / "onnx-int8"
+    onnx 계열은 onnx_backend.OnnxClassifier (CPU 전용, 처음 한 번 내보내기/양자화)
+    """
+    if backend != "torch":
+        import onnx_backend
+        if backend not in onnx_backend.BACKENDS:
+            raise ValueError(f"알 수 없는 backend: {backend} (가능: {onnx_backend.BACKENDS})")
+        return onnx_backend.load_onnx_classifier(model_name, quantized=(backend == "onnx-int8"),
+                                                 num_threads=num_threads,
+                                                 root=onnx_dir or onnx_backend.ONNX_DIR)
+
+    if device is None:
+        device = 0 if torch.cuda.is_available() else -1
+    if num_threads:
+        # CPU 추론 스레드 수
+        torch.set_num_threads(num_threads)
+
+    return pipeline(
+        "sentiment-analysis",
+        model=model_name,
+        tokenizer=model_name,
+        device=device
+    )
+
+
+def cache_model_key(model_name=MODEL_NAME, backend="torch"):
+    """라벨 캐시 키. 양자화 모델 결과가 기존 캐시와 섞이지 않도록 backend 별로 분리"""
+    return model_name if backend == "torch" else f"{model_name}#{backend}"
+
+
+def length_sorted(classifier, texts):
+    """토큰 길이 오름차순으로 정렬한 인덱스"""
+    lengths = [len(ids) for ids in classifier.tokenizer(texts, truncation=True)["input_ids"]]
+    return sorted(range(len(texts)), key=lambda i: lengths[i])
+
+
+def predict_batches(classifier, texts, batch_size=32, errors=None):
+    """
+    texts 를 batch_size 개씩 추론해서 (labels, scores) 를 texts 순서대로 반환.
+    배치 하나가 실패하면 그 배치만 한 건씩 다시 시도하고, 그래도 실패한 문장은 unknown.
+    errors 리스트를 넘기면 실패한 (문장, 에러) 를 거기에 기록합니다.
+    """
+    labels, scores = [], []
+    for i in range(0, len(texts), batch_size):
+        batch = texts[i:i + batch_size]
+        try:
+            outs = classifier(batch, batch_size=len(batch), truncation=True)
+        except Exception as e:
+            run_metrics.error("predict_batch", e, size=len(batch))
+            outs = []
+            for t in batch:
+                try:
+                    outs.append(classifier(t, truncation=True)[0])
+                except Exception as e:
+                    outs.append({"label": UNKNOWN_LABEL, "score": 0.0})
+                    if errors is not None:
+                        errors.append((t, f"{type(e).__name__}: {e}"))
+
+        for out in outs:
+            labels.append(out["label"])
+            scores.append(float(out["score"]))
+    return labels, scores
+
+
+def classify_texts(classifier, texts, batch_size=32, cache=None, model_name=MODEL_NAME):
+    """
+    중복 제거 + 길이 버킷 배치 추론.
+    cache(SentimentCache) 가 주어지면 캐시에 없는 문장만 모델에 넣고 결과를 다시 저장합니다.
+    반환: (labels, scores, stats) - labels/scores 는 입력 texts 와 같은 순서
+    """
+    t0 = time.perf_counter()
+
+    unique = list(dict.fromkeys(texts))
+    result = cache.get_many(model_name, unique) if cache is not None else {}
+    misses = [t for t in unique if t not in result]
+
+    order = length_sorted(classifier, misses) if misses else []
+    sorted_texts = [misses[i] for i in order]
+
+    errors = []
+    t_infer = time.perf_counter()
+    sorted_labels, sorted_scores = predict_batches(classifier, sorted_texts, batch_size, errors)
+    run_metrics.record_stage("inference", time.perf_counter() - t_infer, len(sorted_texts))
+
+    predicted = {}
+    for text, label, score in zip(sorted_texts, sorted_labels, sorted_scores):
+        predicted[text] = (label, score)
+    result.update(predicted)
+
+    if cache is not None:
+        # 실패(unknown) 결과는 캐시에 남기지 않음
+        cache.put_many(model_name, {t: v for t, v in predicted.items() if v[0] != UNKNOWN_LABEL})
+
+    labels = [result[t][0] for t in texts]
+    scores = [result[t][1] for t in texts]
+
+    elapsed = time.perf_counter() - t0
+    stats = {
+        "rows": len(texts),
+        "unique": len(unique),
+        "cache_hits": len(unique) - len(misses),
+        "inferred": len(misses),
+        "failed": len(errors),
+        "errors": errors[:5],  # 원인 확인용 예시
+        "batch_size": batch_size,
+        "seconds": elapsed,
+        "titles_per_sec": len(misses) / elapsed if elapsed > 0 else 0.0,
+    }
+    return labels, scores, stats
+
+
+def throughput_report(classifier, texts, batch_sizes=(1, 8, 16, 32, 64)):
+    """
+    같은 샘플을 배치 크기별로 추론해서 초당 처리 문장 수를 표로 반환합니다.
+    """
+    unique = list(dict.fromkeys(texts))
+    order = length_sorted(classifier, unique) if unique else []
+    sorted_texts = [unique[i] for i in order]
+
+    rows = []
+    for bs in batch_sizes:
+        t0 = time.perf_counter()
+        predict_batches(classifier, sorted_texts, bs)
+        elapsed = time.perf_counter() - t0
+        rows.append({
+            "batch_size": bs,
+            "titles": len(sorted_texts),
+            "seconds": round(elapsed, 3),
+            "titles/sec": round(len(sorted_texts) / elapsed, 1) if elapsed > 0 else 0.0,
+        })
+    return pd.DataFrame(rows)
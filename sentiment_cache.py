@@ -0,0 +1,125 @@
+"""
+감성 분석 결과 디스크 캐시.
+
+(모델 이름, 문장) 해시를 키로 label/score 를 SQLite 파일에 저장합니다.
+한 번 분류한 문장은 다음 실행부터 모델을 거치지 않습니다.
+
+  - 여러 라벨링 작업이 동시에 같은 파일을 써도 되도록 WAL 모드 + busy timeout
+  - max_entries 를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+    (행 수는 마지막으로 센 값 + 그 뒤 넣은 행 수로 추정, 상한을 넘을 것 같거나
+     RECOUNT_ROWS 행을 넣은 뒤에만 COUNT(*) 로 다시 셈 - 다른 프로세스가 넣은 행은 그때 반영.
+     지울 때는 상한보다 EVICT_SLACK 만큼 더 지워서 상한 근처에서 매번 세고 지우지 않도록)
+"""
+import hashlib
+import sqlite3
+import time
+
+CACHE_FILE = "sentiment_cache.sqlite"
+MAX_ENTRIES = 2_000_000
+
+# SQLite 변수 개수 제한 때문에 나눠서 조회
+QUERY_CHUNK = 500
+
+# 이만큼 넣을 때마다 실제 행 수를 다시 셈 (다른 프로세스가 같은 파일에 넣은 만큼 상한을 넘을 수 있는 양)
+RECOUNT_ROWS = 50_000
+# 상한을 넘으면 max_entries 보다 max_entries * EVICT_SLACK 행 적게 남김
+EVICT_SLACK = 0.05
+
+
+def text_key(model_name, text):
+    return hashlib.sha1(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES, timeout=60):
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            " key TEXT PRIMARY KEY,"
+            " label TEXT NOT NULL,"
+            " score REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_last_used ON sentiment(last_used)")
+        self._count = None    # 마지막으로 센 행 수 (처음 evict 때 셈)
+        self._unchecked = 0   # 그 뒤 넣은 행 수 (INSERT OR REPLACE 라 실제보다 많을 수 있음)
+
+    def get_many(self, model_name, texts):
+        """{text: (label, score)} - 캐시에 있는 것만 반환"""
+        keys = {text_key(model_name, t): t for t in texts}
+        key_list = list(keys)
+        found = {}
+        for i in range(0, len(key_list), QUERY_CHUNK):
+            chunk = key_list[i:i + QUERY_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for key, label, score in self.conn.execute(
+                f"SELECT key, label, score FROM sentiment WHERE key IN ({marks})", chunk
+            ):
+                found[keys[key]] = (label, score)
+
+        if found:
+            self._touch([k for k in key_list if keys[k] in found])
+        return found
+
+    def put_many(self, model_name, results):
+        """results: {text: (label, score)}"""
+        if not results:
+            return
+        now = time.time()
+        rows = [(text_key(model_name, t), label, float(score), now) for t, (label, score) in results.items()]
+        self._write(
+            "INSERT OR REPLACE INTO sentiment (key, label, score, last_used) VALUES (?, ?, ?, ?)", rows
+        )
+        self._unchecked += len(rows)
+        self.evict()
+
+    def evict(self, force=False):
+        """
+        max_entries 를 넘으면 last_used 가 오래된 항목부터 상한의 EVICT_SLACK 만큼 더 삭제. 반환: 지운 행 수
+        추정 행 수가 상한 이하이고 RECOUNT_ROWS 만큼 넣지 않았으면 세지 않음 (force=True 면 항상 셈)
+        """
+        if not self.max_entries:
+            return 0
+        if not force and self._count is not None and self._unchecked < RECOUNT_ROWS \
+                and self._count + self._unchecked <= self.max_entries:
+            return 0
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()
+        excess = 0
+        if count > self.max_entries:
+            excess = count - self.max_entries + int(self.max_entries * EVICT_SLACK)
+            self._write(
+                "DELETE FROM sentiment WHERE key IN "
+                "(SELECT key FROM sentiment ORDER BY last_used LIMIT ?)", [(excess,)]
+            )
+        self._count, self._unchecked = count - excess, 0
+        return excess
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+
+    def _touch(self, keys):
+        now = time.time()
+        self._write("UPDATE sentiment SET last_used = ? WHERE key = ?", [(now, k) for k in keys])
+
+    def _write(self, sql, rows):
+        # BEGIN IMMEDIATE: 다른 프로세스와 쓰기가 겹치면 timeout 동안 기다렸다가 한 번에 기록
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(sql, rows)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
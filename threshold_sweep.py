@@ -0,0 +1,153 @@
+"""
+매수 추천 기준값(Positive_Ratio) 스윕 엔진.
+
+daily_stats 와 daily_price 를 한 번만 병합한 뒤 Positive_Ratio 로 정렬해 두고,
+모든 기준값의 추천 수/성공 수를 누적합 + searchsorted 로 한 번에 계산합니다.
+기준값 개수가 늘어나도 병합은 한 번뿐이라 1000개 이상도 바로 끝납니다.
+
+기존 루프(기준값마다 필터 -> merge)와 같은 정의를 씁니다:
+    추천 = Positive_Ratio > 기준값 인 (날짜, 종목)
+    정확도 = 추천 중 Is_Price_Up 비율
+"""
+import numpy as np
+import pandas as pd
+
+
+# ==========================================
+# 1. 종합 점수 함수 (accuracy, count 배열 -> score 배열)
+# ==========================================
+def score_accuracy_log_count(accuracy, count):
+    # 기존 기준: 정확도 x log10(추천수)
+    return accuracy * np.log10(count)
+
+
+def score_accuracy(accuracy, count):
+    return accuracy
+
+
+def score_edge_log_count(accuracy, count):
+    # 동전 던지기(50%) 대비 초과 정확도 x log10(추천수)
+    return (accuracy - 0.5) * np.log10(count)
+
+
+def score_wilson_lower(accuracy, count, z=1.96):
+    # 정확도 95% 신뢰구간 하한 (표본이 적으면 보수적으로)
+    n = np.asarray(count, dtype=float)
+    p = np.asarray(accuracy, dtype=float)
+    denom = 1 + z ** 2 / n
+    center = p + z ** 2 / (2 * n)
+    margin = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2))
+    return (center - margin) / denom
+
+
+SCORE_FUNCTIONS = {
+    "accuracy_log_count": score_accuracy_log_count,
+    "accuracy": score_accuracy,
+    "edge_log_count": score_edge_log_count,
+    "wilson_lower": score_wilson_lower,
+}
+
+
+def default_thresholds():
+    # 기존 스크립트와 같은 10% ~ 90%, 5% 간격
+    return np.round(np.arange(0.1, 0.95, 0.05), 2)
+
+
+# ==========================================
+# 2. 한 번만 병합
+# ==========================================
+def join_signals(daily_stats, daily_price):
+    return pd.merge(
+        daily_stats, daily_price,
+        left_on=['Code', 'Analysis_Date'], right_on=['Code', 'Price_Date'],
+        how='inner'
+    )
+
+
+# ==========================================
+# 3. 전체 스윕
+# ==========================================
+def _counts_above(sorted_ratio, suffix_success, thresholds):
+    # sorted_ratio 오름차순. ratio > th 인 개수 = n - searchsorted(th, right)
+    n = len(sorted_ratio)
+    pos = np.searchsorted(sorted_ratio, thresholds, side='right')
+    count = n - pos
+    success = suffix_success[pos]
+    return count, success
+
+
+def sweep_thresholds(merged, thresholds=None, score="accuracy_log_count"):
+    """
+    merged: join_signals 결과 (Positive_Ratio, Is_Price_Up 포함)
+    반환: threshold, count, success, accuracy, score 컬럼의 곡선 (추천 0건인 기준값은 제외)
+    """
+    thresholds = default_thresholds() if thresholds is None else np.asarray(thresholds, dtype=float)
+    score_fn = SCORE_FUNCTIONS[score] if isinstance(score, str) else score
+
+    ratio = merged['Positive_Ratio'].to_numpy(dtype=float)
+    up = merged['Is_Price_Up'].to_numpy(dtype=bool)
+
+    order = np.argsort(ratio, kind='stable')
+    sorted_ratio = ratio[order]
+    # suffix_success[i] = i 번째(정렬 기준) 이후의 성공 수 합
+    suffix_success = np.concatenate([np.cumsum(up[order][::-1])[::-1], [0]])
+
+    count, success = _counts_above(sorted_ratio, suffix_success, thresholds)
+
+    curve = pd.DataFrame({'threshold': thresholds, 'count': count, 'success': success})
+    curve = curve[curve['count'] > 0].reset_index(drop=True)
+    curve['accuracy'] = curve['success'] / curve['count']
+    curve['score'] = score_fn(curve['accuracy'].to_numpy(), curve['count'].to_numpy())
+    return curve
+
+
+def best_threshold(curve):
+    """점수가 가장 높은 기준값 행 (동점이면 낮은 기준값, 기존 루프와 동일)"""
+    if curve.empty:
+        return None
+    return curve.loc[curve['score'].idxmax()]
+
+
+# ==========================================
+# 4. 종목별 스윕
+# ==========================================
+def sweep_thresholds_by_stock(merged, thresholds=None, score="accuracy_log_count", key='Code'):
+    """
+    종목별 곡선을 한 번에 계산합니다.
+    각 행이 "몇 번째 기준값까지 넘는지"(ratio 보다 작은 기준값 개수)를 구해서
+    (종목, 구간) 히스토그램을 만든 뒤, 기준값 축으로 뒤에서부터 누적합을 하면
+    모든 (종목, 기준값) 쌍의 추천 수/성공 수가 나옵니다.
+    """
+    thresholds = default_thresholds() if thresholds is None else np.asarray(thresholds, dtype=float)
+    score_fn = SCORE_FUNCTIONS[score] if isinstance(score, str) else score
+
+    codes, code_idx = np.unique(merged[key].to_numpy(), return_inverse=True)
+    ratio = merged['Positive_Ratio'].to_numpy(dtype=float)
+    up = merged['Is_Price_Up'].to_numpy(dtype=bool)
+
+    n_codes, n_th = len(codes), len(thresholds)
+    th_order = np.argsort(thresholds, kind='stable')
+
+    # k = ratio 보다 작은 기준값 개수 -> 이 행은 정렬된 기준값 0 ~ k-1 에서 추천됨
+    k = np.searchsorted(thresholds[th_order], ratio, side='left')
+    flat = code_idx * (n_th + 1) + k
+    size = n_codes * (n_th + 1)
+    hist_n = np.bincount(flat, minlength=size).reshape(n_codes, n_th + 1)
+    hist_s = np.bincount(flat, weights=up, minlength=size).reshape(n_codes, n_th + 1)
+
+    # 기준값 j 의 추천 수 = k > j 인 행 수
+    count = np.empty((n_codes, n_th), dtype=np.int64)
+    success = np.empty((n_codes, n_th), dtype=np.int64)
+    count[:, th_order] = np.cumsum(hist_n[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    success[:, th_order] = np.cumsum(hist_s[:, ::-1], axis=1)[:, ::-1][:, 1:]
+
+    curve = pd.DataFrame({
+        key: np.repeat(codes, n_th),
+        'threshold': np.tile(thresholds, n_codes),
+        'count': count.ravel(),
+        'success': success.ravel(),
+    })
+    curve = curve[curve['count'] > 0].reset_index(drop=True)
+    curve['accuracy'] = curve['success'] / curve['count']
+    curve['score'] = score_fn(curve['accuracy'].to_numpy(), curve['count'].to_numpy())
+    return curve
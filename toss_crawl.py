@@ -0,0 +1,594 @@
+"""
+토스증권 커뮤니티 크롤러 (Selenium).
+
+Toss_Crawling_version 스크립트가 쓰는 드라이버 생성 / 대기 / 본문 추출 / 수집 로직입니다.
+
+crawl_toss_community 는 크롬 하나로 종목 -> 글을 순서대로 돌고, 페이지마다 readyState 뒤에
+1초를 고정으로 더 기다립니다 (글 하나당 최소 1초).
+crawl_toss_community_parallel 은
+  - 헤드리스 드라이버 여러 개(DriverPool)로 종목 목록 페이지와 글 페이지를 나눠 열고
+  - 고정 sleep 대신 실제 콘텐츠 요소(글 링크 / 본문 위 '팔로우' 버튼)가 나타날 때까지만 기다리고
+  - 드라이버 하나가 recycle_after 페이지를 열면 닫고 새로 띄워서 크롬 메모리가 계속 불어나지 않게 합니다.
+crawl_toss_community_http 는 브라우저 없이 HTTP 로 서버 렌더링된 HTML 을 받아
+'팔로우' 요소부터 바로 읽고(extract_toss_content_fast), 스크립트로만 그리는 페이지만 드라이버 풀로 넘깁니다.
+결과 행 순서는 모두 순차 버전과 같습니다 (종목 순 -> 목록에 나온 글 순).
+
+    df = crawl_toss_community_parallel(stocks, workers=4, recycle_after=50)
+    df = crawl_toss_community_http(stocks, stats=stats)     # stats['fallback_rate']
+"""
+import asyncio
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import partial
+from urllib.parse import urljoin
+
+import aiohttp
+import pandas as pd
+from tqdm import tqdm
+
+# Selenium 관련
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from bs4 import BeautifulSoup
+
+import run_metrics
+
+TOSS_BASE_URL = "https://www.tossinvest.com"
+
+# 페이지가 "다 그려졌다" 고 보는 요소
+POST_LINK_SELECTOR = "a[href*='/community/posts/']"        # 목록: 글 링크
+POST_READY_XPATH = "//*[normalize-space(text())='팔로우']"  # 글: extract_toss_content 의 본문 시작 기준
+
+RENDER_TIMEOUT = 8      # 요소가 안 나타나면 이만큼 기다린 뒤 있는 그대로 추출
+POLL_INTERVAL = 0.05    # WebDriverWait 기본값(0.5초)이면 렌더링이 끝나도 최대 0.5초를 더 기다림
+WORKERS = 4             # 동시에 띄우는 크롬 수
+RECYCLE_AFTER = 50      # 드라이버 하나로 이만큼 페이지를 열면 새로 띄움
+
+
+def community_url(code, base_url=TOSS_BASE_URL):
+    return f"{base_url}/stocks/A{code}/community"
+
+
+# ==========================================
+# 1. Selenium 유틸
+# ==========================================
+def make_driver(headless=True, chromedriver_path=None):
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--lang=ko-KR")
+    options.add_argument("--window-size=1200,1000")
+    options.add_argument("user-agent=Mozilla/5.0")
+    if chromedriver_path:
+        driver = webdriver.Chrome(service=Service(chromedriver_path), options=options)
+    else:
+        driver = webdriver.Chrome(options=options)
+    return driver
+
+
+def wait_for_render(driver, timeout=8):
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+    except:
+        run_metrics.count("render_timeout")
+    time.sleep(1.0)
+
+
+def wait_for_content(driver, locator, timeout=RENDER_TIMEOUT):
+    """readyState 가 complete 이고 locator((By, 값)) 요소가 생길 때까지 대기. 시간 초과면 False"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+                      and len(d.find_elements(*locator)) > 0
+        )
+        return True
+    except TimeoutException:
+        run_metrics.count("render_timeout")
+        return False
+
+
+# ================================================
+# 2. 토스 본문 추출 전용 함수 (중요)
+# ================================================
+def is_comment(line):
+    # 댓글 시작 패턴
+    if re.match(r".*시간 전$", line):
+        return True
+    if line == "주주":
+        return True
+    if line.startswith("@"):
+        return True
+    return False
+
+
+def extract_toss_content(html):
+    """
+    토스증권 게시글 페이지에서 본문만 추출하는 정제 로직.
+    전체 텍스트에서 '팔로우' 이후 ~ 댓글 시작 이전까지를 본문으로 판단.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.get_text("\n")
+
+    lines = [l.strip() for l in text.split("\n") if l.strip()]
+
+    # 1) 본문 시작 지점: '팔로우' 바로 아래
+    start = None
+    for i, line in enumerate(lines):
+        if line == "팔로우":
+            start = i + 1
+            break
+
+    if start is None:
+        return ""
+
+    # 2) 본문 수집
+    content_lines = []
+    for j in range(start, len(lines)):
+        if is_comment(lines[j]):
+            break
+        content_lines.append(lines[j])
+
+    return "\n".join(content_lines)
+
+
+def post_links(driver, max_posts):
+    """목록 페이지에 나온 게시글 URL (쿼리 제거, 중복 제거, 앞에서 max_posts 개)"""
+    anchors = driver.find_elements(By.CSS_SELECTOR, POST_LINK_SELECTOR)
+    hrefs = []
+    for a in anchors:
+        try:
+            href = a.get_attribute("href")
+            if href and "/community/posts/" in href:
+                hrefs.append(href.split("?")[0])
+        except Exception as e:
+            run_metrics.error("post_links", e)
+            continue
+
+    hrefs = list(dict.fromkeys(hrefs))
+    return hrefs[:max_posts]
+
+
+def post_row(stock, post_url, html=None, content=None):
+    """html 을 주면 extract_toss_content 로 본문 추출, content 를 주면 그대로 사용"""
+    if content is None:
+        t0 = time.perf_counter()
+        try:
+            content = extract_toss_content(html)
+        except Exception as e:
+            content = ""
+            print(f"[WARN] 본문 추출 실패: {post_url} | {e}")
+            run_metrics.error("extract_toss_content", e, url=post_url)
+        run_metrics.record_stage("parse", time.perf_counter() - t0, 1)
+
+    return {
+        "StockCode": stock["Code"],
+        "StockName": stock["Name"],
+        "PostURL": post_url,
+        "Content": content
+    }
+
+
+# ==========================================
+# 3. 토스 커뮤니티 크롤링 (드라이버 하나, 순차)
+# ==========================================
+def crawl_toss_community(stock_list, headless=True, max_posts_per_stock=30,
+                         base_url=TOSS_BASE_URL, chromedriver_path=None):
+    driver = make_driver(headless=headless, chromedriver_path=chromedriver_path)
+    results = []
+
+    try:
+        for stock in tqdm(stock_list, desc="TossCommunity"):
+            list_url = community_url(stock["Code"], base_url)
+
+            try:
+                driver.get(list_url)
+                wait_for_render(driver)
+            except Exception as e:
+                print(f"[WARN] 목록 페이지 불러오기 실패: {list_url} | {e}")
+                run_metrics.error("toss_list", e, stock=stock["Code"], url=list_url)
+                continue
+
+            # 게시글 URL 추출
+            hrefs = post_links(driver, max_posts_per_stock)
+
+            # 게시글 본문 크롤링
+            for post_url in hrefs:
+                try:
+                    driver.get(post_url)
+                    wait_for_render(driver)
+                except Exception as e:
+                    run_metrics.error("toss_post", e, stock=stock["Code"], url=post_url)
+                    continue
+
+                try:
+                    html = driver.page_source
+                except Exception as e:
+                    html = ""
+                    print(f"[WARN] 본문 추출 실패: {post_url} | {e}")
+                    run_metrics.error("page_source", e, url=post_url)
+
+                results.append(post_row(stock, post_url, html))
+
+    finally:
+        driver.quit()
+
+    return pd.DataFrame(results)
+
+
+# ==========================================
+# 4. 드라이버 풀 + 병렬 크롤링
+# ==========================================
+class DriverPool:
+    """
+    스레드들이 빌려 쓰는 크롬 드라이버 풀 (최대 size 개).
+
+    드라이버는 처음 필요할 때 띄우고, recycle_after 페이지를 열었거나 WebDriverException
+    (브라우저가 죽었거나 세션이 끊김)이 나면 닫은 뒤 다음 요청 때 새로 띄웁니다.
+
+        with pool.driver() as driver:
+            driver.get(url)
+    """
+
+    def __init__(self, factory, size=WORKERS, recycle_after=RECYCLE_AFTER):
+        self.factory = factory
+        self.recycle_after = recycle_after
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = queue.SimpleQueue()     # (드라이버, 지금까지 연 페이지 수)
+        self.lock = threading.Lock()
+        self.live = []
+        self.stats = {"started": 0, "recycled": 0, "broken": 0, "pages": 0}
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _quit(self, driver):
+        with self.lock:
+            self.live.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _release(self, driver, pages, broken):
+        self._count("pages")
+        if broken:
+            self._count("broken")
+            self._quit(driver)
+        elif pages >= self.recycle_after:
+            self._count("recycled")
+            self._quit(driver)
+        else:
+            self.idle.put((driver, pages))
+
+    @contextmanager
+    def driver(self):
+        with self.slots:
+            try:
+                driver, pages = self.idle.get_nowait()
+            except queue.Empty:
+                driver, pages = self.factory(), 0
+                with self.lock:
+                    self.live.append(driver)
+                self._count("started")
+
+            broken = False
+            try:
+                yield driver
+            except WebDriverException:
+                broken = True
+                raise
+            finally:
+                self._release(driver, pages + 1, broken)
+
+    def close(self):
+        with self.lock:
+            drivers, self.live = self.live, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_list(pool, stock, max_posts, base_url=TOSS_BASE_URL, timeout=RENDER_TIMEOUT):
+    with pool.driver() as driver:
+        t0 = time.perf_counter()
+        driver.get(community_url(stock["Code"], base_url))
+        wait_for_content(driver, (By.CSS_SELECTOR, POST_LINK_SELECTOR), timeout)
+        hrefs = post_links(driver, max_posts)
+        run_metrics.record_stage("browser_list", time.perf_counter() - t0, 1)
+        return hrefs
+
+
+def read_post(pool, post_url, timeout=RENDER_TIMEOUT):
+    with pool.driver() as driver:
+        t0 = time.perf_counter()
+        driver.get(post_url)
+        wait_for_content(driver, (By.XPATH, POST_READY_XPATH), timeout)
+        html = driver.page_source
+        run_metrics.record_stage("browser_post", time.perf_counter() - t0, 1)
+        return html
+
+
+def crawl_toss_community_parallel(stock_list, headless=True, max_posts_per_stock=30,
+                                  workers=WORKERS, recycle_after=RECYCLE_AFTER, timeout=RENDER_TIMEOUT,
+                                  base_url=TOSS_BASE_URL, chromedriver_path=None, driver_factory=None,
+                                  stats=None):
+    """
+    crawl_toss_community 와 같은 결과를 드라이버 workers 개로 병렬 수집.
+    목록 페이지가 끝나는 대로 그 종목의 글 페이지들을 바로 작업 큐에 넣습니다.
+    stats(dict) 를 넘기면 드라이버 풀 통계(started / recycled / broken / pages)를 채워줍니다.
+    """
+    factory = driver_factory or partial(make_driver, headless, chromedriver_path)
+
+    with DriverPool(factory, workers, recycle_after) as pool:
+        # 풀 크기만큼만 스레드를 돌려서 드라이버를 기다리며 노는 스레드가 없게
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            lists = {executor.submit(read_list, pool, s, max_posts_per_stock, base_url, timeout): i
+                     for i, s in enumerate(stock_list)}
+            posts = [[] for _ in stock_list]
+            for fut in tqdm(as_completed(lists), total=len(lists), desc="TossCommunity"):
+                i = lists[fut]
+                try:
+                    hrefs = fut.result()
+                except Exception as e:
+                    print(f"[WARN] 목록 페이지 불러오기 실패: "
+                          f"{community_url(stock_list[i]['Code'], base_url)} | {e}")
+                    run_metrics.error("toss_list", e, stock=stock_list[i]["Code"])
+                    continue
+                posts[i] = [(url, executor.submit(read_post, pool, url, timeout)) for url in hrefs]
+
+            results = []
+            for stock, entries in zip(stock_list, posts):
+                for post_url, fut in entries:
+                    try:
+                        html = fut.result()
+                    except Exception as e:
+                        run_metrics.error("toss_post", e, stock=stock["Code"], url=post_url)
+                        continue
+                    results.append(post_row(stock, post_url, html))
+
+        if stats is not None:
+            stats.update(pool.stats)
+
+    return pd.DataFrame(results)
+
+
+# ==========================================
+# 5. HTTP 모드 (브라우저 없이, 실패한 것만 Selenium)
+# ==========================================
+HTTP_CONCURRENCY = 16
+HTTP_TIMEOUT = 5
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": "ko-KR"}
+
+# BeautifulSoup get_text() 가 건너뛰는 태그 (naver_extract 와 같음)
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+def _skipped(text):
+    # lxml 텍스트 노드가 get_text() 에서 빠지는 태그 안에 있는지
+    el = text.getparent()
+    if text.is_tail:
+        el = el.getparent()
+    while el is not None:
+        if el.tag in SKIP_TEXT_TAGS:
+            return True
+        el = el.getparent()
+    return False
+
+
+def extract_toss_content_fast(html):
+    """
+    서버 렌더링된 글 HTML 에서 extract_toss_content 와 같은 본문을 추출.
+    페이지 전체를 텍스트로 바꾸지 않고 '팔로우' 요소를 XPath 로 바로 찾은 뒤,
+    그 뒤의 텍스트 노드만 댓글이 시작될 때까지 읽습니다.
+    '팔로우' 가 없으면(스크립트로만 그리는 페이지) None -> 브라우저로 다시 읽음.
+    """
+    import lxml.html
+
+    doc = lxml.html.document_fromstring(html)
+    found = doc.xpath(POST_READY_XPATH)
+    if not found:
+        return None
+
+    content_lines = []
+    for text in found[0].xpath("following::text()"):
+        if _skipped(text):
+            continue
+        for line in text.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if is_comment(line):
+                return "\n".join(content_lines)
+            content_lines.append(line)
+    return "\n".join(content_lines)
+
+
+def _payload_post_ids(doc):
+    # Next.js 페이지 데이터(__NEXT_DATA__)에 실린 글 번호 (나온 순서대로)
+    import json
+
+    scripts = doc.xpath('//script[@id="__NEXT_DATA__"]')
+    if not scripts or not scripts[0].text:
+        return []
+    ids = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "postId" in node:
+                ids.append(node["postId"])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    try:
+        walk(json.loads(scripts[0].text))
+    except ValueError:
+        return []
+    return ids
+
+
+def extract_toss_links(html, page_url, max_posts):
+    """
+    목록 HTML 에서 post_links 와 같은 글 URL 목록. 서버 렌더링된 링크가 없으면
+    페이지 데이터(__NEXT_DATA__)의 글 번호로 만들고, 둘 다 없으면 None.
+    """
+    import lxml.html
+
+    doc = lxml.html.document_fromstring(html)
+    hrefs = [urljoin(page_url, a.get("href")) for a in doc.xpath("//a[contains(@href, '/community/posts/')]")]
+    if not hrefs:
+        hrefs = [urljoin(page_url, f"/community/posts/{pid}") for pid in _payload_post_ids(doc)]
+    if not hrefs:
+        return None
+    hrefs = list(dict.fromkeys(h.split("?")[0] for h in hrefs))
+    return hrefs[:max_posts]
+
+
+async def _fetch_text(session, sem, url, code=None):
+    # 세마포어 = 연결 수 -> 시간은 연결 풀에서 기다린 뒤부터 (응답 지연만 잼)
+    async with sem:
+        t0 = time.perf_counter()
+        try:
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    run_metrics.observe_http(code, time.perf_counter() - t0, resp.status, url=url)
+                    return None
+                text = await resp.text()
+                run_metrics.observe_http(code, time.perf_counter() - t0, resp.status, url=url)
+                return text
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            run_metrics.observe_http(code, time.perf_counter() - t0, error=e, url=url)
+            return None
+
+
+def _extract_post(code, url, page):
+    t0 = time.perf_counter()
+    content = extract_toss_content_fast(page)
+    run_metrics.record_stage("parse", time.perf_counter() - t0, 1)
+    if content is None:
+        # 서버 렌더링된 본문 없음 -> 브라우저로 넘어감
+        run_metrics.observe_empty(code, url, reason="no_ssr")
+    return content
+
+
+async def _crawl_stock_http(session, sem, stock, max_posts, base_url):
+    """반환: [(글 URL, 본문 또는 None)] / 목록을 못 읽으면 None"""
+    code = stock["Code"]
+    list_url = community_url(code, base_url)
+    html = await _fetch_text(session, sem, list_url, code)
+    hrefs = extract_toss_links(html, list_url, max_posts) if html else None
+    if hrefs is None:
+        if html:
+            run_metrics.observe_empty(code, list_url, reason="no_links")
+        return None
+
+    pages = await asyncio.gather(*(_fetch_text(session, sem, url, code) for url in hrefs))
+    return [(url, _extract_post(code, url, page) if page else None) for url, page in zip(hrefs, pages)]
+
+
+async def _crawl_http(stock_list, max_posts, base_url, concurrency):
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    # total 은 연결 풀에서 기다리는 시간까지 포함해서, 글이 많으면 멀쩡한 요청도 시간 초과가 남
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=HTTP_TIMEOUT, sock_read=HTTP_TIMEOUT)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS, timeout=timeout) as session:
+        return await asyncio.gather(*(_crawl_stock_http(session, sem, s, max_posts, base_url) for s in stock_list))
+
+
+def crawl_toss_community_http(stock_list, headless=True, max_posts_per_stock=30,
+                              concurrency=HTTP_CONCURRENCY, fallback=True,
+                              workers=WORKERS, recycle_after=RECYCLE_AFTER, timeout=RENDER_TIMEOUT,
+                              base_url=TOSS_BASE_URL, chromedriver_path=None, driver_factory=None,
+                              stats=None):
+    """
+    브라우저 없이 HTTP(aiohttp 연결 풀)로 목록/글 HTML 을 받아서 바로 추출하고,
+    서버 렌더링된 내용이 없는 목록/글만 드라이버 풀(crawl_toss_community_parallel 과 같은 방식)로 다시 읽음.
+    결과는 crawl_toss_community 와 같은 컬럼/행 순서입니다.
+
+    fallback=False 면 브라우저를 띄우지 않고 HTTP 로 못 읽은 글은 빠집니다.
+    stats(dict) 에 lists / list_fallback / posts / http / fallback / failed / fallback_rate 를 채워줍니다.
+    """
+    per_stock = asyncio.run(_crawl_http(stock_list, max_posts_per_stock, base_url, concurrency))
+
+    list_misses = [i for i, entries in enumerate(per_stock) if entries is None]
+    post_misses = [(i, j) for i, entries in enumerate(per_stock) if entries
+                   for j, (_, content) in enumerate(entries) if content is None]
+    summary = {"lists": len(stock_list), "list_fallback": len(list_misses), "posts": 0, "http": 0,
+               "fallback": 0, "failed": 0}
+
+    browser = {}  # (종목 위치, 글 위치) -> html
+    if fallback and (list_misses or post_misses):
+        factory = driver_factory or partial(make_driver, headless, chromedriver_path)
+        with DriverPool(factory, workers, recycle_after) as pool, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            lists = {executor.submit(read_list, pool, stock_list[i], max_posts_per_stock, base_url, timeout): i
+                     for i in list_misses}
+            for fut in as_completed(lists):
+                i = lists[fut]
+                try:
+                    hrefs = fut.result()
+                except Exception as e:
+                    print(f"[WARN] 목록 페이지 불러오기 실패: {community_url(stock_list[i]['Code'], base_url)} | {e}")
+                    run_metrics.error("toss_list", e, stock=stock_list[i]["Code"])
+                    continue
+                per_stock[i] = [(url, None) for url in hrefs]
+                post_misses.extend((i, j) for j in range(len(hrefs)))
+
+            posts = {(i, j): executor.submit(read_post, pool, per_stock[i][j][0], timeout) for i, j in post_misses}
+            for (i, j), fut in posts.items():
+                try:
+                    browser[(i, j)] = fut.result()
+                except Exception as e:
+                    run_metrics.error("toss_post", e, stock=stock_list[i]["Code"], url=per_stock[i][j][0])
+                    continue
+
+    results = []
+    for i, (stock, entries) in enumerate(zip(stock_list, per_stock)):
+        for j, (post_url, content) in enumerate(entries or []):
+            summary["posts"] += 1
+            if content is not None:
+                summary["http"] += 1
+                results.append(post_row(stock, post_url, content=content))
+            elif (i, j) in browser:
+                summary["fallback"] += 1
+                results.append(post_row(stock, post_url, browser[(i, j)]))
+            else:
+                summary["failed"] += 1
+
+    summary["fallback_rate"] = summary["fallback"] / summary["posts"] if summary["posts"] else 0.0
+    if stats is not None:
+        stats.update(summary)
+    return pd.DataFrame(results)
+
+
+def print_http_stats(stats):
+    print(f"   - 글 {stats['posts']}건: HTTP {stats['http']} / 브라우저 대체 {stats['fallback']} "
+          f"({stats['fallback_rate']:.1%}) / 실패 {stats['failed']} · 목록 브라우저 대체 "
+          f"{stats['list_fallback']}/{stats['lists']}")
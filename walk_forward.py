@@ -0,0 +1,230 @@
+"""
+감성 매수 신호(Positive_Ratio > 기준값) 워크포워드 백테스트.
+
+accuracy_modeling.py 는 기준값을 고른 데이터로 정확도를 다시 재기 때문에 점수가
+부풀려지고, 같은 날 종가 vs 전일 종가만 봅니다. 여기서는
+  1) 신호(날짜, 종목)마다 "신호가 확정된 뒤 첫 시간봉"에 진입하고
+     horizon(1h / 1d / 3d) 뒤 첫 시간봉 종가로 청산한 수익률을 구하고
+  2) 학습 구간(train_days)에서 기준값을 고른 뒤
+  3) 바로 다음 test_days 동안(표본 외)에 그 기준값을 적용해서 성과를 잽니다.
+학습 구간은 test_days 씩 밀면서 반복합니다.
+
+시간 기준
+  - 신호 날짜(Analysis_Date)는 한국 날짜. 그날 글이 다 모인 다음날 00:00 KST 에 신호 확정 (lag)
+  - 시간봉 Date 는 봉 시작 시각(UTC). 진입/청산 가격은 해당 봉 종가
+  - 학습에는 청산 봉이 끝나서 결과를 알 수 있는 신호만 사용 (학습 구간 시작 이후 ~ 테스트 시작 전)
+
+모든 종목/구간/기준값은 배열 연산으로 한 번에 계산합니다:
+  - 진입/청산 봉 찾기: intraday_align.BarIndex ((종목, 시각) 합성 키 하나에 searchsorted)
+  - 구간별 기준값 곡선: (그룹, 구간, 기준값 칸) bincount + 기준값 축 역누적합
+"""
+import numpy as np
+import pandas as pd
+
+import intraday_align
+import threshold_sweep
+
+HORIZONS = ('1h', '1d', '3d')
+TRAIN_DAYS = 60
+TEST_DAYS = 5
+SIGNAL_LAG = '1D'
+BAR = '1h'
+MIN_TRAIN_COUNT = 5
+TIMEZONE = 'Asia/Seoul'
+
+_DAY = 86400
+
+
+def _epoch(ts):
+    return ((ts - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+
+
+def _seconds(delta):
+    return int(pd.Timedelta(delta).total_seconds())
+
+
+def _day_start(dates, tz=TIMEZONE):
+    """한국 날짜 -> 그날 00:00 KST 의 epoch 초"""
+    days = pd.to_datetime(pd.Series(dates)).dt.normalize()
+    if days.dt.tz is None:
+        days = days.dt.tz_localize(tz)
+    return _epoch(days)
+
+
+# ==========================================
+# 1. 신호별 진입/청산 수익률
+# ==========================================
+def forward_returns(signals, prices, horizons=HORIZONS, lag=SIGNAL_LAG):
+    """
+    signals: Analysis_Date(한국 날짜), Code, Positive_Ratio
+    prices: Date(UTC, 봉 시작), Code, Close 시간봉 (또는 intraday_align.BarIndex)
+    반환: 신호 한 행당 한 행. day_ts/entry_ts/entry_close 와 horizon 별
+          exit_ts_<h>, ret_<h> (청산 봉이 없으면 NaN)
+    """
+    sig = signals[['Analysis_Date', 'Code', 'Positive_Ratio']].copy()
+    sig['Code'] = sig['Code'].astype(str).str.zfill(6)
+
+    index = prices if isinstance(prices, intraday_align.BarIndex) else intraday_align.BarIndex(prices)
+    bar_ts, closes = index.ts, index.close
+    sig_code = index.code_index(sig['Code'])
+    day_ts = _day_start(sig['Analysis_Date'])
+
+    entry = index.next_bar(sig_code, day_ts + _seconds(lag))
+    has_entry = entry >= 0
+
+    out = sig.assign(
+        day_ts=day_ts,
+        entry_ts=np.where(has_entry, bar_ts[entry], -1),
+        entry_close=np.where(has_entry, closes[entry], np.nan),
+    )
+    for h in horizons:
+        exit_ = np.full(len(sig), -1)
+        exit_[has_entry] = index.next_bar(sig_code[has_entry], bar_ts[entry[has_entry]] + _seconds(h))
+        ok = exit_ >= 0
+        out[f'exit_ts_{h}'] = np.where(ok, bar_ts[exit_], -1)
+        out[f'ret_{h}'] = np.where(ok, closes[exit_] / out['entry_close'].to_numpy() - 1, np.nan)
+    return out[has_entry].reset_index(drop=True)
+
+
+# ==========================================
+# 2. 워크포워드
+# ==========================================
+def _window_starts(day_ts, train_days, test_days):
+    first = day_ts.min() + train_days * _DAY
+    n = (day_ts.max() - first) // (test_days * _DAY) + 1
+    return first + np.arange(max(n, 0)) * test_days * _DAY
+
+
+def _fit_thresholds(group, n_groups, known_ts, ratio_bin, up, starts, train, test, n_th):
+    """(그룹, 구간, 기준값) 학습 추천 수/성공 수
+
+    결과를 아는 시각 known_ts 가 (t0 - train, t0] 인 구간들은 연속이라
+    각 행을 해당 구간들로 복제한 뒤 (그룹, 구간, 칸) bincount 합니다."""
+    n_win = len(starts)
+    first = starts[0]
+    w_lo = np.clip(-((first - known_ts) // test), 0, n_win)               # t0 >= known
+    w_hi = np.clip(-((first - known_ts - train) // test) - 1, -1, n_win - 1)  # t0 < known + train
+    reps = np.maximum(w_hi - w_lo + 1, 0)
+
+    rows = np.repeat(np.arange(len(known_ts)), reps)
+    win = w_lo[rows] + (np.arange(len(rows)) - np.repeat(np.cumsum(reps) - reps, reps))
+    flat = (group[rows] * n_win + win) * (n_th + 1) + ratio_bin[rows]
+    size = n_groups * n_win * (n_th + 1)
+    hist_n = np.bincount(flat, minlength=size).reshape(n_groups, n_win, n_th + 1)
+    hist_s = np.bincount(flat, weights=up[rows], minlength=size).reshape(n_groups, n_win, n_th + 1)
+
+    # 기준값 j 에서 추천 = ratio_bin > j
+    count = np.cumsum(hist_n[..., ::-1], axis=2)[..., ::-1][..., 1:]
+    success = np.cumsum(hist_s[..., ::-1], axis=2)[..., ::-1][..., 1:].astype(np.int64)
+    return count, success
+
+
+def walk_forward(events, horizons=HORIZONS, thresholds=None, score="accuracy_log_count",
+                 train_days=TRAIN_DAYS, test_days=TEST_DAYS, per_stock=False,
+                 min_train_count=MIN_TRAIN_COUNT, bar=BAR):
+    """
+    events: forward_returns 결과
+    반환: (folds, summary)
+      folds   - horizon x (종목) x 테스트 구간 한 행: 학습에서 고른 기준값과 학습/표본 외 성과
+      summary - horizon 별 표본 외 합계 (test_base_rate: 기준값 없이 모든 신호에 매수했을 때)
+    """
+    thresholds = np.sort(threshold_sweep.default_thresholds() if thresholds is None
+                         else np.asarray(thresholds, dtype=float))
+    score_fn = threshold_sweep.SCORE_FUNCTIONS[score] if isinstance(score, str) else score
+    n_th = len(thresholds)
+    train, test = train_days * _DAY, test_days * _DAY
+
+    day_ts = events['day_ts'].to_numpy(np.int64)
+    starts = _window_starts(day_ts, train_days, test_days) if len(events) else np.array([], dtype=np.int64)
+    if per_stock:
+        group_names, group = np.unique(events['Code'].to_numpy(str), return_inverse=True)
+    else:
+        group_names, group = np.array(['ALL']), np.zeros(len(events), dtype=np.int64)
+    n_groups, n_win = len(group_names), len(starts)
+
+    ratio = events['Positive_Ratio'].to_numpy(float)
+    ratio_bin = np.searchsorted(thresholds, ratio, side='left')   # ratio 보다 작은 기준값 개수
+    # 테스트 구간: 신호 날짜 기준, 구간끼리 겹치지 않음
+    test_win = (day_ts - starts[0]) // test if n_win else np.full(len(events), -1)
+    in_test = (test_win >= 0) & (test_win < n_win)
+
+    folds, summary = [], []
+    for h in horizons:
+        ret = events[f'ret_{h}'].to_numpy(float)
+        valid = ~np.isnan(ret)
+        up = ret > 0
+        if n_win == 0 or not valid.any():
+            continue
+
+        # 결과를 아는 시각 = 청산 봉이 끝난 시각
+        known = events[f'exit_ts_{h}'].to_numpy(np.int64) + _seconds(bar)
+        v = np.flatnonzero(valid)
+        count, success = _fit_thresholds(group[v], n_groups, known[v], ratio_bin[v], up[v].astype(float),
+                                         starts, train, test, n_th)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            acc = success / count
+            score_grid = score_fn(acc, count)
+        score_grid = np.where((count >= max(min_train_count, 1)) & np.isfinite(score_grid), score_grid, -np.inf)
+        best = np.argmax(score_grid, axis=2)                          # 동점이면 낮은 기준값
+        fitted = np.take_along_axis(score_grid, best[..., None], axis=2)[..., 0] > -np.inf
+        best_th = np.where(fitted, thresholds[best], np.nan)
+        pick = lambda a: np.take_along_axis(a, best[..., None], axis=2)[..., 0]
+
+        # 표본 외 평가
+        t = np.flatnonzero(valid & in_test)
+        gw = group[t] * n_win + test_win[t]
+        rec = ratio[t] > best_th.ravel()[gw]                         # NaN 기준값 -> 추천 없음
+        size = n_groups * n_win
+        n_sig = np.bincount(gw, minlength=size)
+        n_rec = np.bincount(gw[rec], minlength=size)
+        n_succ = np.bincount(gw[rec], weights=up[t][rec], minlength=size).astype(np.int64)
+        ret_sum = np.bincount(gw[rec], weights=ret[t][rec], minlength=size)
+        base_up = np.bincount(gw, weights=up[t], minlength=size)
+
+        fold = pd.DataFrame({
+            'horizon': h,
+            'group': np.repeat(group_names, n_win),
+            'train_start': pd.to_datetime(np.tile(starts - train, n_groups), unit='s', utc=True)
+                .tz_convert(TIMEZONE).date,
+            'test_start': pd.to_datetime(np.tile(starts, n_groups), unit='s', utc=True)
+                .tz_convert(TIMEZONE).date,
+            'test_end': pd.to_datetime(np.tile(starts + test - _DAY, n_groups), unit='s', utc=True)
+                .tz_convert(TIMEZONE).date,
+            'threshold': best_th.ravel(),
+            'train_count': np.where(fitted, pick(count), 0).ravel(),
+            'train_accuracy': np.where(fitted, pick(acc), np.nan).ravel(),
+            'train_score': np.where(fitted, pick(score_grid), np.nan).ravel(),
+            'test_signals': n_sig,
+            'test_count': n_rec,
+            'test_success': n_succ,
+        })
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fold['test_accuracy'] = np.where(n_rec > 0, n_succ / n_rec, np.nan)
+            fold['test_mean_return'] = np.where(n_rec > 0, ret_sum / n_rec, np.nan)
+            fold['test_base_rate'] = np.where(n_sig > 0, base_up / n_sig, np.nan)
+        folds.append(fold)
+
+        total_rec = int(n_rec.sum())
+        summary.append({
+            'horizon': h,
+            'folds': int(fitted.sum()),
+            'test_signals': int(n_sig.sum()),
+            'test_count': total_rec,
+            'test_success': int(n_succ.sum()),
+            'test_accuracy': n_succ.sum() / total_rec if total_rec else np.nan,
+            'test_mean_return': ret_sum.sum() / total_rec if total_rec else np.nan,
+            'test_base_rate': base_up.sum() / n_sig.sum() if n_sig.sum() else np.nan,
+        })
+
+    folds = pd.concat(folds, ignore_index=True) if folds else pd.DataFrame()
+    if per_stock and not folds.empty:
+        folds = folds.rename(columns={'group': 'Code'})
+    elif not folds.empty:
+        folds = folds.drop(columns='group')
+    return folds, pd.DataFrame(summary)
+
+
+def backtest(signals, prices, horizons=HORIZONS, **kwargs):
+    """forward_returns + walk_forward"""
+    events = forward_returns(signals, prices, horizons, lag=kwargs.pop('lag', SIGNAL_LAG))
+    return walk_forward(events, horizons, **kwargs)